@@ -0,0 +1,242 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import requests
+
+from trading_bot.metrics import registry
+
+logger = logging.getLogger("trading_bot")
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+DIGEST_SEPARATOR = "\n\n— — —\n\n"
+
+ALERTS = registry.counter(
+    "trading_bot_alerts_total",
+    "Alerts by result (sent, failed, dropped or deduplicated).",
+    ["result"],
+)
+
+Sender = Callable[[str], bool]
+
+
+class TelegramSender:
+    """Sends a message to a Telegram chat through the Bot API."""
+
+    def __init__(self, token: str, chat_id: str, timeout: float = 10.0):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+
+    def __call__(self, text: str) -> bool:
+        response = requests.post(
+            self.url,
+            data={"chat_id": self.chat_id, "text": text, "parse_mode": "HTML"},
+            timeout=self.timeout,
+        )
+        return response.status_code == 200
+
+
+class AlertDispatcher:
+    """
+    Delivers alerts from a background thread so raising one never blocks the caller.
+
+    ``submit`` only appends to a bounded queue. The worker thread waits up to
+    ``batch_seconds`` after the first queued alert and sends everything that
+    arrived meanwhile as a digest, split into several messages at alert
+    boundaries when it would exceed Telegram's length limit. Alerts repeating a key seen
+    within ``dedup_seconds`` are suppressed and counted; the count is reported
+    with the next alert for that key. When the queue is full, ``drop_policy``
+    decides whether the oldest queued alert or the new one is discarded.
+    """
+
+    def __init__(
+        self,
+        sender: Sender,
+        maxsize: int = 100,
+        batch_seconds: float = 2.0,
+        max_batch: int = 20,
+        dedup_seconds: float = 300.0,
+        drop_policy: str = DROP_OLDEST,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            sender: Callable delivering one message, returning True on success
+            maxsize: Maximum number of queued alerts
+            batch_seconds: How long to collect alerts into one digest
+            max_batch: Maximum number of alerts in one digest
+            dedup_seconds: Window within which alerts with the same key are suppressed
+            drop_policy: ``drop_oldest`` or ``drop_newest`` when the queue is full
+            clock: Monotonic time source for deduplication
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy!r}, expected one of {DROP_POLICIES}")
+        self.sender = sender
+        self.maxsize = maxsize
+        self.batch_seconds = batch_seconds
+        self.max_batch = max_batch
+        self.dedup_seconds = dedup_seconds
+        self.drop_policy = drop_policy
+        self.clock = clock
+        self.dropped = 0
+        self.suppressed = 0
+        self._queue: Deque[str] = deque()
+        # Key -> (time of the last alert let through, repeats suppressed since)
+        self._seen: Dict[str, Tuple[float, int]] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = 0
+        self._flushing = False
+        self._stopping = False
+
+    def submit(self, text: str, key: Optional[str] = None) -> bool:
+        """
+        Queue an alert without blocking.
+
+        Args:
+            text: Message text
+            key: Deduplication key; defaults to the text itself
+
+        Returns:
+            True if the alert was queued, False if it was suppressed or dropped
+        """
+        key = text if key is None else key
+        now = self.clock()
+        with self._cond:
+            if self._stopping:
+                return False
+            last, repeats = self._seen.get(key, (None, 0))
+            if last is not None and now - last < self.dedup_seconds:
+                self._seen[key] = (last, repeats + 1)
+                self.suppressed += 1
+                ALERTS.inc(result="deduplicated")
+                return False
+            if repeats:
+                text = f"{text}\n\n<i>Repeated {repeats} more times since the last alert</i>"
+            self._seen[key] = (now, 0)
+            self._prune(now)
+
+            if len(self._queue) >= self.maxsize:
+                self.dropped += 1
+                ALERTS.inc(result="dropped")
+                if self.drop_policy == DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+            self._queue.append(text)
+            self._ensure_started()
+            self._cond.notify_all()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send queued alerts now; returns False if they were not delivered within ``timeout``."""
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+            finally:
+                self._flushing = False
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Deliver what is queued and stop the worker thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._thread.start()
+
+    def _prune(self, now: float) -> None:
+        """Forget keys whose dedup window has passed, once the table grows."""
+        if len(self._seen) <= 4 * self.maxsize:
+            return
+        self._seen = {
+            key: seen for key, seen in self._seen.items()
+            if now - seen[0] < self.dedup_seconds or seen[1]
+        }
+
+    def _next_batch(self) -> Optional[List[str]]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self._stopping)
+            if not self._queue:
+                return None
+            deadline = time.monotonic() + self.batch_seconds
+            while len(self._queue) < self.max_batch and not (self._stopping or self._flushing):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._deliver(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _deliver(self, batch: List[str]) -> None:
+        for text, count in digests(batch):
+            try:
+                sent = self.sender(text)
+            except Exception as e:
+                logger.error(f"Failed to send alert: {str(e)}")
+                sent = False
+            ALERTS.inc(count, result="sent" if sent else "failed")
+
+
+def digests(alerts: List[str]) -> List[Tuple[str, int]]:
+    """
+    Combine alerts into as few messages as fit Telegram's length limit.
+
+    Messages are only split between alerts, so HTML markup is never cut. An
+    alert too long to send on its own is reduced to plain text and shortened.
+
+    Returns:
+        List of (message, number of alerts in it)
+    """
+    messages: List[Tuple[str, int]] = []
+    group: List[str] = []
+    for alert in alerts:
+        if len(alert) > MAX_MESSAGE_LENGTH:
+            alert = _shorten(alert)
+        if group and len(_render(group + [alert])) > MAX_MESSAGE_LENGTH:
+            messages.append((_render(group), len(group)))
+            group = []
+        group.append(alert)
+    if group:
+        messages.append((_render(group), len(group)))
+    return messages
+
+
+def _render(alerts: List[str]) -> str:
+    if len(alerts) == 1:
+        return alerts[0]
+    return f"📦 <b>{len(alerts)} alerts</b>{DIGEST_SEPARATOR}" + DIGEST_SEPARATOR.join(alerts)
+
+
+def _shorten(alert: str) -> str:
+    """Strip tags and cut to the limit without leaving a partial entity."""
+    text = re.sub(r"<[^>]*>", "", alert)
+    if len(text) > MAX_MESSAGE_LENGTH:
+        text = re.sub(r"&[^;\s]*$", "", text[:MAX_MESSAGE_LENGTH - 1]) + "…"
+    return text
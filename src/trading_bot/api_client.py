@@ -1,77 +1,133 @@
 # Improved api_client.py
+import json
 import requests
 import logging
 import time
 import random
 
+from trading_bot.circuit_breaker import endpoint_class
+from trading_bot.latency import RequestStats, normalize_endpoint
+
 logger = logging.getLogger("trading_bot")
 
+DATA_URL = "https://data.alpaca.markets"
+
 
 def exponential_backoff(retry_count):
     return min(60, (2**retry_count) + random.uniform(0, 1))
 
 
 class AlpacaAPIClient:
-    def __init__(self, base_url, api_key, api_secret):
+    def __init__(self, base_url, api_key, api_secret, breakers=None, data_url=DATA_URL):
+        """
+        Args:
+            base_url: Trading API base URL
+            api_key: Alpaca API key id
+            api_secret: Alpaca API secret key
+            breakers: Optional CircuitBreakerRegistry; requests are then
+                guarded by the breaker of their endpoint class
+            data_url: Market data API base URL
+        """
         self.base_url = base_url
+        self.data_url = data_url
+        self.breakers = breakers
         self.headers = {
             "accept": "application/json",
             "content-type": "application/json",
             "APCA-API-KEY-ID": api_key,
             "APCA-API-SECRET-KEY": api_secret,
         }
+        self.stats = RequestStats()
+        # Called as listener(endpoint, success, response_time) after every attempt
+        self.request_listeners = []
 
-    def get(self, endpoint, url_part='v2', params=None, retries=3, base="paper"):
-        base_url = self.base_url if base == "paper" else "https://data.alpaca.markets"
+    def add_request_listener(self, listener):
+        self.request_listeners.append(listener)
+
+    def _request(self, method, url, endpoint, retries, base="paper", **kwargs):
+        """
+        Send a request with retries, recording latency, status codes, bytes
+        transferred, retries and backoff time per endpoint.
+
+        With circuit breakers configured, a request to an endpoint class whose
+        breaker is open returns None without touching the network. Server
+        errors, rate limiting, connection failures and unexpected exceptions
+        count against the breaker; other client errors do not.
+        """
+        breaker = self.breakers.get(endpoint_class(endpoint, base)) if self.breakers is not None else None
+        if breaker is not None and not breaker.allow():
+            logger.warning(f"{method} {endpoint} rejected: circuit breaker {breaker.name} is OPEN")
+            return None
+        # An unexpected exception still settles the call, so a half-open probe slot is never leaked
+        service_failure = True
+        try:
+            result, service_failure = self._attempt(method, url, endpoint, retries, **kwargs)
+        finally:
+            if breaker is not None:
+                if service_failure:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+        return result
+
+    def _attempt(self, method, url, endpoint, retries, **kwargs):
+        """Run the retry loop; returns the result and whether the service itself failed."""
+        label = normalize_endpoint(method, endpoint)
+        stats = self.stats.shard(label)
+        stats.calls += 1
+        service_failure = False
+        body = kwargs.get("json")
+        sent = len(json.dumps(body)) if body is not None else 0
         for attempt in range(retries):
+            stats.attempts += 1
+            stats.retries += attempt > 0
+            stats.bytes_sent += sent
+            started = time.perf_counter()
             try:
-                response = requests.get(
-                    f"{base_url}/{url_part}/{endpoint}", headers=self.headers, params=params
-                )
+                response = requests.request(method, url, headers=self.headers, **kwargs)
+                stats.status_codes[response.status_code] += 1
+                stats.bytes_received += len(response.content or b"")
                 response.raise_for_status()
-                return response.json()
+                result = response.json()
             except requests.RequestException as e:
+                self._record(stats, label, False, time.perf_counter() - started)
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                service_failure = status is None or status >= 500 or status == 429
                 wait_time = exponential_backoff(attempt)
                 logger.warning(
-                    f"GET request failed ({attempt + 1}/{retries}): {e}. Retrying in {wait_time:.2f} seconds..."
+                    f"{method} request failed ({attempt + 1}/{retries}): {e}. Retrying in {wait_time:.2f} seconds..."
                 )
+                stats.backoff_seconds += wait_time
                 time.sleep(wait_time)
             except ValueError as e:
+                self._record(stats, label, False, time.perf_counter() - started)
                 logger.error(f"Failed to parse JSON response: {e}")
-        return None
+                service_failure = True
+            else:
+                self._record(stats, label, True, time.perf_counter() - started)
+                return result, False
+        return None, service_failure
+
+    def _record(self, stats, label, success, elapsed):
+        stats.latency.record(elapsed)
+        stats.errors += not success
+        for listener in self.request_listeners:
+            listener(label, success, elapsed)
+
+    def get(self, endpoint, url_part='v2', params=None, retries=3, base="paper"):
+        base_url = self.base_url if base == "paper" else self.data_url
+        url = f"{base_url}/{url_part}/{endpoint}"
+        return self._request("GET", url, endpoint, retries, base=base, params=params)
 
     def post(self, endpoint, payload, retries=3, url_part="v2"):
-        for attempt in range(retries):
-            try:
-                full_url = f"{self.base_url}/{url_part}{endpoint}"
-                response = requests.post(full_url, headers=self.headers, json=payload)
-                response.raise_for_status()
-                return response.json()
-            except requests.RequestException as e:
-                wait_time = exponential_backoff(attempt)
-                logger.warning(
-                    f"POST request failed ({attempt + 1}/{retries}): {e}. Retrying in {wait_time:.2f} seconds..."
-                )
-                time.sleep(wait_time)
-            except ValueError as e:
-                logger.error(f"Failed to parse JSON response: {e}")
-        return None
+        url = f"{self.base_url}/{url_part}{endpoint}"
+        return self._request("POST", url, endpoint, retries, json=payload)
+
+    def patch(self, endpoint, payload, retries=3, url_part="v2"):
+        url = f"{self.base_url}/{url_part}{endpoint}"
+        return self._request("PATCH", url, endpoint, retries, json=payload)
 
     def delete(self, endpoint, retries=3, url_part="v2", base="paper"):
-        base_url = self.base_url if base == "paper" else "https://data.alpaca.markets"
-        for attempt in range(retries):
-            try:
-                full_url = f"{base_url}/{url_part}{endpoint}"
-                response = requests.delete(full_url, headers=self.headers)
-                response.raise_for_status()
-                return response.json()
-            except requests.RequestException as e:
-                wait_time = exponential_backoff(attempt)
-                logger.warning(
-                    f"DELETE request failed ({attempt + 1}/{retries}): {e}. Retrying in {wait_time:.2f} seconds..."
-                )
-                time.sleep(wait_time)
-            except ValueError as e:
-                logger.error(f"Failed to parse JSON response: {e}")
-        return None
-    
+        base_url = self.base_url if base == "paper" else self.data_url
+        url = f"{base_url}/{url_part}{endpoint}"
+        return self._request("DELETE", url, endpoint, retries, base=base)
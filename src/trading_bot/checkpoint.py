@@ -0,0 +1,108 @@
+import datetime as dt
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("trading_bot")
+
+DEFAULT_CHECKPOINT_DIR = os.path.join("data", "checkpoints")
+
+# Stages of a daily trade cycle, in order
+CANDIDATES = "candidates"  # Spreads to execute are chosen
+EXECUTED = "executed"      # Execution finished; filled spreads await the close
+CLOSED = "closed"          # Positions were closed
+
+
+class CheckpointStore:
+    """
+    Durable state of each daily trade cycle, one JSON file per trading day.
+
+    A cycle's checkpoint holds its stage, the spreads chosen for execution,
+    every submitted order and the orders whose positions still have to be
+    closed. Each update rewrites the file atomically (write, fsync, rename),
+    so a crash at any point leaves either the previous or the new checkpoint
+    on disk, never a torn one.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path(self, day: dt.date) -> str:
+        """Checkpoint file of the cycle trading on ``day``."""
+        return os.path.join(self.directory, f"cycle_{day:%Y%m%d}.json")
+
+    def load(self, day: dt.date) -> Optional[Dict[str, Any]]:
+        """The checkpoint of a day's cycle, or None if it has none."""
+        with self._lock:
+            return self._read(self.path(day))
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """The most recent cycle's checkpoint, unless that cycle is closed."""
+        with self._lock:
+            files = self._files()
+            if not files:
+                return None
+            checkpoint = self._read(os.path.join(self.directory, files[-1]))
+        if checkpoint is None or checkpoint.get("stage") == CLOSED:
+            return None
+        return checkpoint
+
+    def update(self, day: dt.date, **fields: Any) -> Dict[str, Any]:
+        """
+        Merge fields into a day's checkpoint and persist it.
+
+        Returns:
+            The updated checkpoint
+        """
+        with self._lock:
+            path = self.path(day)
+            checkpoint = self._read(path) or {"day": day.isoformat(), "orders": {}}
+            checkpoint.update(fields)
+            self._write(path, checkpoint)
+            return checkpoint
+
+    def record_order(self, day: dt.date, ticker: str, order: Dict[str, Any]) -> None:
+        """Persist a submitted order of a day's cycle under its ticker."""
+        with self._lock:
+            path = self.path(day)
+            checkpoint = self._read(path) or {"day": day.isoformat(), "orders": {}}
+            checkpoint.setdefault("orders", {})[ticker] = order
+            self._write(path, checkpoint)
+
+    def prune(self, keep: int = 30) -> int:
+        """Delete all but the ``keep`` most recent checkpoints; returns the number deleted."""
+        with self._lock:
+            stale = self._files()[:-keep] if keep > 0 else self._files()
+            for name in stale:
+                os.remove(os.path.join(self.directory, name))
+        return len(stale)
+
+    def _files(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name for name in os.listdir(self.directory) if name.startswith("cycle_") and name.endswith(".json")
+        )
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to read checkpoint {path}: {str(e)}")
+            return None
+
+    def _write(self, path: str, checkpoint: Dict[str, Any]) -> None:
+        checkpoint["updated_at"] = dt.datetime.now(dt.timezone.utc).isoformat()
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -1,69 +1,306 @@
+import threading
 import time
 from enum import Enum
-from typing import Callable, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import logging
+from trading_bot import events
+from trading_bot.metrics import registry
 
 logger = logging.getLogger('trading_bot')
 
+CIRCUIT_STATE = registry.gauge(
+    "trading_bot_circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", ["breaker"]
+)
+CIRCUIT_REJECTIONS = registry.counter(
+    "trading_bot_circuit_breaker_rejections_total", "Calls rejected by an open circuit breaker.", ["breaker"]
+)
+
+DEFAULT_BREAKER = "default"
+
+# First path segment of a trading API endpoint -> breaker guarding it
+ENDPOINT_CLASSES = {
+    "orders": "orders",
+    "positions": "positions",
+    "account": "account",
+    "calendar": "calendar",
+    "clock": "calendar",
+    "options": "contracts",
+}
+
+
+def endpoint_class(endpoint: str, base: str = "paper") -> str:
+    """Breaker name for an Alpaca endpoint; all market data shares one breaker."""
+    if base != "paper":
+        return "market_data"
+    # "orders:by_client_order_id" is an orders endpoint too
+    return ENDPOINT_CLASSES.get(endpoint.strip("/").split("/")[0].split(":")[0], DEFAULT_BREAKER)
+
+
 class CircuitState(Enum):
     CLOSED = "CLOSED"  # Normal operation
     OPEN = "OPEN"      # Failing, rejecting requests
     HALF_OPEN = "HALF_OPEN"  # Testing if service is back
 
+STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+# Called with (breaker name, previous state, new state, window failure count, window failure rate)
+TransitionListener = Callable[[str, CircuitState, CircuitState, int, float], None]
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected by an open circuit breaker."""
+
+
 class CircuitBreaker:
+    """
+    Thread-safe circuit breaker over a sliding window of call outcomes.
+
+    Outcomes are counted in time buckets covering the last ``window_seconds``.
+    The breaker opens once the window holds at least ``failure_threshold``
+    failures and its failure rate reaches ``failure_rate_threshold``. After
+    ``recovery_timeout`` seconds it lets up to ``half_open_max_calls`` probe
+    calls through; it closes when they all succeed and re-opens on any failure.
+
+    All state is guarded by a lock held only for bookkeeping, never while the
+    protected call runs, so one breaker can be shared by thread pools and
+    coroutines alike.
+    """
+
     def __init__(
         self,
         failure_threshold: int = 5,
-        recovery_timeout: int = 60,
-        half_open_timeout: int = 30
+        recovery_timeout: float = 60,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 60,
+        bucket_seconds: float = 5,
+        half_open_max_calls: int = 3,
+        name: str = DEFAULT_BREAKER,
+        clock: Callable[[], float] = time.monotonic,
     ):
+        """
+        Args:
+            failure_threshold: Minimum failures in the window before the breaker can open
+            recovery_timeout: Seconds the breaker stays open before probing
+            failure_rate_threshold: Failure rate in the window that opens the breaker
+            window_seconds: Length of the sliding window
+            bucket_seconds: Resolution of the sliding window
+            half_open_max_calls: Probe calls allowed while half-open
+            name: Name reported in transition events and metrics
+            clock: Monotonic time source
+        """
+        self.name = name
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
-        self.half_open_timeout = half_open_timeout
-        self.failure_count = 0
-        self.last_failure_time = 0
-        self.state = CircuitState.CLOSED
-
-    def _can_execute(self) -> bool:
-        if self.state == CircuitState.CLOSED:
-            return True
-        
-        if self.state == CircuitState.OPEN:
-            if time.time() - self.last_failure_time > self.recovery_timeout:
-                self.state = CircuitState.HALF_OPEN
-                return True
-            return False
-        
-        if self.state == CircuitState.HALF_OPEN:
-            if time.time() - self.last_failure_time > self.half_open_timeout:
-                return True
-            return False
-        
-        return False
-
-    def _on_success(self):
-        if self.state == CircuitState.HALF_OPEN:
-            self.state = CircuitState.CLOSED
-            self.failure_count = 0
-            logger.info("Circuit breaker reset to CLOSED state")
-
-    def _on_failure(self):
-        self.failure_count += 1
-        self.last_failure_time = time.time()
-        
-        if self.failure_count >= self.failure_threshold:
-            self.state = CircuitState.OPEN
-            logger.error(f"Circuit breaker opened after {self.failure_count} failures")
+        self.failure_rate_threshold = failure_rate_threshold
+        self.bucket_seconds = bucket_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self.listeners: List[TransitionListener] = []
+        self._bucket_count = max(1, int(round(window_seconds / bucket_seconds)))
+        # Each bucket is [epoch, calls, failures]
+        self._buckets = [[-1, 0, 0] for _ in range(self._bucket_count)]
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(0, breaker=name)
 
-    def execute(self, func: Callable, *args, **kwargs) -> Any:
-        if not self._can_execute():
-            logger.warning("Circuit breaker is OPEN, request rejected")
-            raise Exception("Circuit breaker is OPEN")
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    @property
+    def failure_count(self) -> int:
+        """Failures in the current window."""
+        with self._lock:
+            return self._totals(self.clock())[1]
+
+    def _totals(self, now: float) -> Tuple[int, int]:
+        epoch = int(now // self.bucket_seconds)
+        calls = failures = 0
+        for bucket_epoch, bucket_calls, bucket_failures in self._buckets:
+            if 0 <= epoch - bucket_epoch < self._bucket_count:
+                calls += bucket_calls
+                failures += bucket_failures
+        return calls, failures
+
+    def _count(self, now: float, failed: bool) -> None:
+        epoch = int(now // self.bucket_seconds)
+        bucket = self._buckets[epoch % self._bucket_count]
+        if bucket[0] != epoch:
+            bucket[:] = [epoch, 0, 0]
+        bucket[1] += 1
+        bucket[2] += failed
+
+    def _set_state(self, state: CircuitState, now: float):
+        """Change state; returns the transition to announce once the lock is released."""
+        previous, self._state = self._state, state
+        if state == CircuitState.OPEN:
+            self._opened_at = now
+        elif state == CircuitState.HALF_OPEN:
+            self._probes = self._probe_successes = 0
+        else:
+            self._buckets = [[-1, 0, 0] for _ in range(self._bucket_count)]
+        calls, failures = self._totals(now)
+        return previous, state, failures, failures / calls if calls else 0.0
+
+    def _announce(self, transition) -> None:
+        if transition is None:
+            return
+        previous, state, failures, failure_rate = transition
+        CIRCUIT_STATE.set(STATE_VALUES[state], breaker=self.name)
+        log = logger.error if state == CircuitState.OPEN else logger.info
+        log(f"Circuit breaker {self.name} {previous.value} -> {state.value} "
+            f"({failures} failures, {failure_rate:.0%} failure rate)")
+        events.publish(events.CIRCUIT_BREAKER, {
+            "breaker": self.name,
+            "from": previous.value,
+            "to": state.value,
+            "failure_count": failures,
+            "failure_rate": failure_rate,
+        })
+        for listener in self.listeners:
+            try:
+                listener(self.name, previous, state, failures, failure_rate)
+            except Exception as e:
+                logger.error(f"Circuit breaker listener failed: {str(e)}")
 
+    def allow(self) -> bool:
+        """
+        Ask permission for a call.
+
+        Every permitted call must report its outcome with ``record_success``
+        or ``record_failure``; while half-open a permit is a probe slot.
+        """
+        transition = None
+        with self._lock:
+            now = self.clock()
+            if self._state == CircuitState.OPEN and now - self._opened_at >= self.recovery_timeout:
+                transition = self._set_state(CircuitState.HALF_OPEN, now)
+            if self._state == CircuitState.CLOSED:
+                allowed = True
+            elif self._state == CircuitState.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                allowed = True
+            else:
+                allowed = False
+        self._announce(transition)
+        if not allowed:
+            CIRCUIT_REJECTIONS.inc(breaker=self.name)
+        return allowed
+
+    def record_success(self) -> None:
+        transition = None
+        with self._lock:
+            now = self.clock()
+            if self._state == CircuitState.HALF_OPEN:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    transition = self._set_state(CircuitState.CLOSED, now)
+            elif self._state == CircuitState.CLOSED:
+                self._count(now, failed=False)
+        self._announce(transition)
+
+    def record_failure(self) -> None:
+        transition = None
+        with self._lock:
+            now = self.clock()
+            if self._state == CircuitState.HALF_OPEN:
+                transition = self._set_state(CircuitState.OPEN, now)
+            elif self._state == CircuitState.CLOSED:
+                self._count(now, failed=True)
+                calls, failures = self._totals(now)
+                if failures >= self.failure_threshold and failures / calls >= self.failure_rate_threshold:
+                    transition = self._set_state(CircuitState.OPEN, now)
+        self._announce(transition)
+
+    def _reject(self) -> None:
+        logger.warning(f"Circuit breaker {self.name} is OPEN, request rejected")
+        raise CircuitOpenError(f"Circuit breaker {self.name} is OPEN")
+
+    def execute(self, func: Callable, *args, **kwargs) -> Any:
+        if not self.allow():
+            self._reject()
         try:
             result = func(*args, **kwargs)
-            self._on_success()
-            return result
-        except Exception as e:
-            self._on_failure()
-            raise e 
\ No newline at end of file
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    async def execute_async(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await ``func(*args, **kwargs)`` under the breaker."""
+        if not self.allow():
+            self._reject()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+class CircuitBreakerRegistry:
+    """
+    One circuit breaker per endpoint class, created on first use.
+
+    Failures of one class (say market data) never open the breaker of another
+    (say orders). Per-class settings override the registry defaults.
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, Dict[str, Any]]] = None, **defaults: Any):
+        """
+        Args:
+            overrides: Breaker settings by endpoint class
+            **defaults: ``CircuitBreaker`` settings shared by all classes
+        """
+        self.defaults = defaults
+        self.overrides = overrides or {}
+        self.listeners: List[TransitionListener] = []
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CircuitBreakerRegistry":
+        """Build a registry from the ``circuit_breaker`` config section."""
+        settings = ("failure_threshold", "recovery_timeout", "failure_rate_threshold",
+                    "window_seconds", "bucket_seconds", "half_open_max_calls")
+        return cls(
+            overrides=config.get("endpoints", {}),
+            **{key: config[key] for key in settings if key in config},
+        )
+
+    def get(self, name: str) -> CircuitBreaker:
+        """The breaker for an endpoint class."""
+        breaker = self._breakers.get(name)
+        if breaker is not None:
+            return breaker
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name=name, **{**self.defaults, **self.overrides.get(name, {})})
+                breaker.listeners.append(self._notify)
+                self._breakers[name] = breaker
+            return breaker
+
+    def _notify(self, *transition) -> None:
+        for listener in self.listeners:
+            listener(*transition)
+
+    def add_listener(self, listener: TransitionListener) -> None:
+        """Call ``listener`` on every state transition of any breaker."""
+        self.listeners.append(listener)
+
+    def execute(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` under the breaker named by its ``breaker`` attribute (default: its name)."""
+        return self.get(getattr(func, "breaker", func.__name__)).execute(func, *args, **kwargs)
+
+    def states(self) -> Dict[str, str]:
+        """State of every breaker created so far."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.state.value for name, breaker in sorted(breakers.items())}
@@ -0,0 +1,194 @@
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("trading_bot")
+
+DEFAULT_CONFIG_PATH = "config.json"
+
+REQUIRED_CONFIG = ["api_key", "api_secret", "base_url", "market_close_time", "market_open_time", "default_limit_price"]
+
+
+class ConfigError(Exception):
+    """Raised when the configuration file is missing, malformed or incomplete."""
+
+
+def load_config(path: str = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Read and validate the configuration file.
+
+    Raises:
+        ConfigError: If the file is missing, is not valid JSON or lacks a required key
+    """
+    try:
+        with open(path, "r") as config_file:
+            config = json.load(config_file)
+    except FileNotFoundError:
+        raise ConfigError(f"{path} not found")
+    except json.JSONDecodeError:
+        raise ConfigError(f"Invalid JSON in {path}")
+    for key in REQUIRED_CONFIG:
+        if key not in config:
+            raise ConfigError(f"Missing required configuration: {key}")
+    return config
+
+
+class AppContext:
+    """
+    Configuration and the long-lived objects built from it: API client,
+    circuit breakers, market calendar, monitors, ledger, spread store,
+    cycle checkpoints, order book and streams.
+
+    Modules that need these are imported here rather than at the top of the
+    file, so importing the package stays cheap until a context is built.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        from trading_bot.api_client import DATA_URL, AlpacaAPIClient
+        from trading_bot.checkpoint import DEFAULT_CHECKPOINT_DIR, CheckpointStore
+        from trading_bot.circuit_breaker import CircuitBreakerRegistry
+        from trading_bot.ledger import DEFAULT_LEDGER_PATH, get_ledger
+        from trading_bot.market_calendar import MarketCalendar
+        from trading_bot.monitoring import APIMonitor, Monitoring, TradeMonitor
+        from trading_bot.order_book import OrderBook
+        from trading_bot.orders import InFlightOrders
+        from trading_bot.reconciliation import ReconciliationEngine
+        from trading_bot.spread_store import DEFAULT_STORE_PATH, SpreadStore
+        from trading_bot.streaming import (
+            OPTION_STREAM_URL, STOCK_STREAM_URL, QuoteStream, TradeUpdateStream, trade_stream_url,
+        )
+
+        self.config = config
+        self.warmup_config = config.get("warmup", {})
+        self.streaming_config = config.get("streaming", {})
+
+        # API client with one circuit breaker per endpoint class
+        self.circuit_breaker = CircuitBreakerRegistry.from_config(config.get("circuit_breaker", {}))
+        self.api_client = AlpacaAPIClient(
+            config["base_url"],
+            config["api_key"],
+            config["api_secret"],
+            breakers=self.circuit_breaker,
+            data_url=config.get("data_url", DATA_URL),
+        )
+        self.api_monitor = APIMonitor(self.api_client)
+        # Client order ids submitted by this process, so retries never duplicate an order
+        self.in_flight_orders = InFlightOrders()
+        # Trading sessions, cached locally and refreshed in bulk from /calendar
+        self.market_calendar = MarketCalendar.from_config(self.api_client, config)
+        # Alerts are queued and sent from a background thread, off the order path
+        self.monitoring = Monitoring(config)
+        self.circuit_breaker.add_listener(self.alert_circuit_transition)
+
+        self.trade_ledger = get_ledger(config.get("ledger", {}).get("path", DEFAULT_LEDGER_PATH))
+        self.trade_monitor = TradeMonitor()
+        self.spread_store = SpreadStore(config.get("spread_store", {}).get("path", DEFAULT_STORE_PATH))
+        self.checkpoints = CheckpointStore(config.get("checkpoint", {}).get("dir", DEFAULT_CHECKPOINT_DIR))
+        self.reconciliation_engine = ReconciliationEngine(self.api_client, self.trade_ledger, self.trade_monitor)
+
+        # Streaming quote tables; only connected when streaming is enabled in config
+        self.stock_quotes = QuoteStream(
+            self.streaming_config.get("stock_url", STOCK_STREAM_URL), config["api_key"], config["api_secret"]
+        )
+        self.option_quotes = QuoteStream(
+            self.streaming_config.get("option_url", OPTION_STREAM_URL), config["api_key"], config["api_secret"],
+            use_msgpack=True,
+        )
+        # Orders and positions, seeded from the API and kept current by the trade updates stream
+        self.order_book = OrderBook(self.api_client)
+        self.trade_updates = TradeUpdateStream(
+            self.streaming_config.get("trade_url", trade_stream_url(config["base_url"])),
+            config["api_key"],
+            config["api_secret"],
+            on_update=self.order_book.apply,
+            on_connected=self.order_book.seed,
+            on_disconnected=self.order_book.invalidate,
+        )
+
+    def alert_circuit_transition(self, name: str, previous, state, failures: int, failure_rate: float) -> None:
+        """Alert when an endpoint class's circuit breaker opens."""
+        if state.value == "OPEN":
+            self.monitoring.alert_circuit_breaker(
+                f"{name} requests failing ({failures} failures, {failure_rate:.0%} failure rate)"
+            )
+
+
+_context: Optional[AppContext] = None
+_lock = threading.Lock()
+
+
+def bootstrap(config_path: str = DEFAULT_CONFIG_PATH, config: Optional[Dict[str, Any]] = None) -> AppContext:
+    """
+    Build the application context, configuring logging first.
+
+    Idempotent: once built, the existing context is returned.
+
+    Args:
+        config_path: Configuration file to read
+        config: Configuration to use instead of reading ``config_path``
+
+    Raises:
+        ConfigError: If the configuration cannot be loaded
+    """
+    global _context
+    with _lock:
+        if _context is None:
+            from trading_bot.logging_config import setup_logging
+
+            config = config if config is not None else load_config(config_path)
+            setup_logging(config.get("logging", {}))
+            _context = AppContext(config)
+        return _context
+
+
+def get_context() -> AppContext:
+    """The application context, bootstrapped from ``config.json`` on first use."""
+    return _context if _context is not None else bootstrap()
+
+
+class LazyProxy:
+    """
+    Stand-in for an object that is only created when first used.
+
+    Attribute access, item access, iteration and membership are forwarded to
+    ``factory()``. Because the proxy itself is an ordinary module attribute,
+    tests can still replace it with ``unittest.mock.patch``.
+    """
+
+    __slots__ = ("_factory",)
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._factory(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._factory(), name, value)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._factory()[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._factory()[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self._factory()[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._factory()
+
+    def __iter__(self):
+        return iter(self._factory())
+
+    def __len__(self) -> int:
+        return len(self._factory())
+
+    def __repr__(self) -> str:
+        return f"LazyProxy({self._factory()!r})"
+
+
+def context_attribute(name: str) -> LazyProxy:
+    """Lazy proxy for an attribute of the application context."""
+    return LazyProxy(lambda: getattr(get_context(), name))
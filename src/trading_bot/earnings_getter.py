@@ -1,24 +1,31 @@
 # Improved earnings_getter.py
-import pandas as pd
-import yfinance as yf
 import datetime as dt
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 import pytz
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from trading_bot.utils import get_spx_tickers
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 logger = logging.getLogger("trading_bot")
 
 
-def get_upcoming_earnings(tickers: List[str], days: int = 1) -> pd.DataFrame:
+def get_upcoming_earnings(
+    tickers: List[str], days: int = 1, after: Optional[dt.datetime] = None
+) -> "pd.DataFrame":
     ticker_earnings = (
         []
     )  # Store data as a list to avoid expensive DataFrame concatenation
-    now = dt.datetime.now(dt.timezone.utc)
+    # The window starts at `after` (e.g. the upcoming trade execution time) or now
+    now = after.astimezone(dt.timezone.utc) if after else dt.datetime.now(dt.timezone.utc)
     future_limit = now + dt.timedelta(days=days)
     ny_tz = pytz.timezone("America/New_York")
+    # Deferred: pandas and yfinance are slow to import and only needed when scanning
+    import pandas as pd
+    import yfinance as yf
 
     def fetch_earnings(ticker):
         try:
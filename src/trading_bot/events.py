@@ -0,0 +1,131 @@
+import datetime as dt
+import itertools
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("trading_bot")
+
+# Topics published by the trader
+HEALTH = "health"
+FILL = "fill"
+ORDER_STATUS = "order_status"
+CIRCUIT_BREAKER = "circuit_breaker"
+POSITION = "position"
+
+Event = Dict[str, Any]
+
+
+class Subscription:
+    """A subscriber's bounded event queue; the oldest events are dropped when it is full."""
+
+    def __init__(self, bus: "EventBus", topics: Optional[Iterable[str]], maxsize: int):
+        self.bus = bus
+        self.topics = set(topics) if topics else None
+        self.dropped = 0
+        self._queue: "queue.Queue[Event]" = queue.Queue(maxsize)
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def put(self, event: Event) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, or None if none arrived within ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventBus:
+    """
+    In-process publish/subscribe bus.
+
+    Publishers never block: every subscriber has its own bounded queue. The
+    last ``history`` events are kept so a reconnecting subscriber can resume
+    after the last event id it saw.
+    """
+
+    def __init__(self, history: int = 500):
+        self._subscribers: List[Subscription] = []
+        self._history: Deque[Event] = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, topics: Optional[Iterable[str]] = None, maxsize: int = 1000, after_id: Optional[int] = None
+    ) -> Subscription:
+        """
+        Subscribe to events.
+
+        Args:
+            topics: Topics to receive (all if None)
+            maxsize: Queue size before the oldest undelivered events are dropped
+            after_id: Replay retained events with a greater id first
+
+        Returns:
+            Subscription to read events from; close it when done
+        """
+        subscription = Subscription(self, topics, maxsize)
+        with self._lock:
+            if after_id is not None:
+                for event in self._history:
+                    if event["id"] > after_id and subscription.wants(event["topic"]):
+                        subscription.put(event)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, topic: str, data: Dict[str, Any]) -> Event:
+        """Deliver an event to every subscriber of ``topic``."""
+        with self._lock:
+            event = {
+                "id": next(self._ids),
+                "topic": topic,
+                "timestamp": dt.datetime.now().isoformat(),
+                "data": data,
+            }
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.wants(topic):
+                subscription.put(event)
+        return event
+
+
+bus = EventBus()
+
+
+def publish(topic: str, data: Dict[str, Any]) -> Optional[Event]:
+    """Publish to the process-wide bus; never raises into the publisher."""
+    try:
+        return bus.publish(topic, data)
+    except Exception as e:
+        logger.error(f"Failed to publish {topic} event: {str(e)}")
+        return None
@@ -0,0 +1,327 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+from trading_bot import events
+from trading_bot.logging_config import log_context
+from trading_bot.metrics import registry
+
+logger = logging.getLogger("trading_bot")
+
+FILLED_STATUS = "filled"
+DEAD_STATUSES = {"canceled", "expired", "rejected", "done_for_day", "stopped", "suspended"}
+REPLACED_STATUS = "replaced"
+
+ORDER_SUBMIT_SECONDS = registry.histogram(
+    "trading_bot_order_submit_seconds", "Latency of the initial spread order submission."
+)
+ORDER_FILL_SECONDS = registry.histogram(
+    "trading_bot_order_fill_seconds",
+    "Time from submission to fill of walked spread orders.",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0),
+)
+ORDER_OUTCOMES = registry.counter(
+    "trading_bot_orders_total", "Walked spread orders by outcome (filled, unfilled, unsubmitted).", ["outcome"]
+)
+ORDER_STEPS = registry.histogram(
+    "trading_bot_order_price_steps", "Limit price steps taken per walked order.", buckets=(0, 1, 2, 3, 5, 8, 13)
+)
+
+
+def summarize_executions(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compute execution KPIs for a batch of walked orders.
+
+    Args:
+        results: Results returned by ExecutionEngine.execute_batch
+
+    Returns:
+        Dict with fill rate, time-to-fill and slippage statistics
+    """
+    submitted = [r for r in results if r.get("order")]
+    filled = [r for r in submitted if r["filled"]]
+    times = sorted(r["time_to_fill"] for r in filled)
+    slippage = [r["limit_price"] - r["mid_price"] for r in filled]
+    return {
+        "submitted": len(submitted),
+        "filled": len(filled),
+        "fill_rate": len(filled) / len(submitted) if submitted else 0.0,
+        "avg_time_to_fill": sum(times) / len(times) if times else None,
+        "median_time_to_fill": times[len(times) // 2] if times else None,
+        "avg_slippage": sum(slippage) / len(slippage) if slippage else None,
+    }
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ExecutionEngine:
+    """
+    Adaptive limit-price walker for calendar spread orders.
+
+    Each spread is submitted at the mid price and its status polled every
+    ``poll_interval`` seconds. If it has not filled after ``step_interval``
+    seconds the limit is replaced ``step`` closer to the natural price, until
+    it fills or the price would exceed ``mid + max_slippage`` (or the natural
+    price, whichever is lower), at which point the order is cancelled. An
+    order replaced behind the walker's back (say a replace that timed out
+    after the server accepted it) is followed to its replacement, and the
+    walk is cancelled after ``max_replace_failures`` replaces in a row fail.
+    """
+
+    def __init__(
+        self,
+        api_client,
+        submit_order: Callable[..., Optional[Dict[str, Any]]],
+        get_quotes: Callable[[str, str], Optional[Dict[str, float]]],
+        config: Optional[Dict[str, Any]] = None,
+        on_submit: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            api_client: AlpacaAPIClient used to poll, replace and cancel orders
+            submit_order: Callable placing the initial order, called as
+                ``submit_order(long_symbol=..., short_symbol=..., qty=..., limit_price=...,
+                client_order_id=...)``
+            get_quotes: Callable returning ``{"mid": ..., "natural": ...}`` for a spread
+            config: Bot configuration; settings are read from its ``execution`` section
+            on_submit: Called with ``(spread, order)`` as soon as an order is accepted,
+                before its price is walked
+        """
+        settings = (config or {}).get("execution", {})
+        self.api_client = api_client
+        self.submit_order = submit_order
+        self.get_quotes = get_quotes
+        self.on_submit = on_submit
+        self.step = float(settings.get("step", 0.05))
+        self.step_interval = float(settings.get("step_interval", 5.0))
+        self.poll_interval = float(settings.get("poll_interval", 0.5))
+        self.max_slippage = float(settings.get("max_slippage", 0.25))
+        self.max_workers = int(settings.get("max_workers", 10))
+        self.max_replace_failures = int(settings.get("max_replace_failures", 3))
+
+    def _get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch an order, following replacements to the order that superseded it."""
+        order = self.api_client.get(f"orders/{order_id}", retries=1)
+        while order and order.get("status") == REPLACED_STATUS and order.get("replaced_by"):
+            replacement = self.api_client.get(f"orders/{order['replaced_by']}", retries=1)
+            if not replacement:
+                break
+            order = replacement
+        return order
+
+    def _replace_order(self, order_id: str, limit_price: float) -> Optional[Dict[str, Any]]:
+        return self.api_client.patch(
+            f"/orders/{order_id}", payload={"limit_price": f"{limit_price:.2f}"}, retries=1
+        )
+
+    def _cancel_order(self, order_id: str) -> None:
+        self.api_client.delete(f"/orders/{order_id}", retries=1)
+
+    def _publish_status(self, order: Dict[str, Any], ticker: Optional[str]) -> None:
+        events.publish(events.ORDER_STATUS, {
+            "order_id": order.get("id"),
+            "ticker": ticker,
+            "status": order.get("status"),
+            "limit_price": order.get("limit_price"),
+        })
+
+    def _wait_for_fill(self, order: Dict[str, Any], deadline: float, ticker: Optional[str] = None) -> Dict[str, Any]:
+        """Poll an order at least once, until it fills, dies or the deadline passes."""
+        while True:
+            time.sleep(self.poll_interval)
+            latest = self._get_order(order["id"])
+            if latest:
+                if latest.get("status") != order.get("status"):
+                    self._publish_status(latest, ticker)
+                order = latest
+            if order.get("status") == FILLED_STATUS or order.get("status") in DEAD_STATUSES:
+                return order
+            if time.monotonic() >= deadline:
+                return order
+
+    def walk(self, spread: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a single spread, tagging its log records with the ticker. See ``_walk``."""
+        with log_context(ticker=spread.get("ticker")):
+            return self._walk(spread)
+
+    def _walk(self, spread: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a single spread by walking its limit price.
+
+        Args:
+            spread: Dict with ``ticker``, ``long_symbol``, ``short_symbol`` and ``qty``
+
+        Returns:
+            Dict describing the outcome: final order, fill flag, quantity filled
+            (which may be non-zero for an unfilled, cancelled order), limit/mid
+            prices, number of price steps taken and time to fill in seconds
+        """
+        result = {
+            **spread,
+            "order": None,
+            "filled": False,
+            "filled_qty": 0,
+            "mid_price": None,
+            "limit_price": None,
+            "steps": 0,
+            "time_to_fill": None,
+        }
+        quotes = self.get_quotes(spread["long_symbol"], spread["short_symbol"])
+        if not quotes:
+            logger.error("No quotes for %s, spread not submitted", spread.get("ticker"))
+            return result
+
+        mid = round(quotes["mid"], 2)
+        bound = round(min(quotes["natural"], mid + self.max_slippage), 2)
+        limit_price = mid
+        result["mid_price"] = mid
+
+        started = time.monotonic()
+        with ORDER_SUBMIT_SECONDS.time():
+            order = self.submit_order(
+                long_symbol=spread["long_symbol"],
+                short_symbol=spread["short_symbol"],
+                qty=spread["qty"],
+                limit_price=limit_price,
+                client_order_id=spread.get("client_order_id"),
+            )
+        if not order:
+            ORDER_OUTCOMES.inc(outcome="unsubmitted")
+            return result
+        self._publish_status(order, spread.get("ticker"))
+        if self.on_submit is not None:
+            try:
+                self.on_submit(spread, order)
+            except Exception as e:
+                logger.error(f"Submit callback failed for {spread.get('ticker')}: {str(e)}")
+
+        failed_replaces = 0
+        while True:
+            order = self._wait_for_fill(order, time.monotonic() + self.step_interval, spread.get("ticker"))
+            # A replace reported as failed may still have been accepted
+            working_price = _number(order.get("limit_price"))
+            if working_price is not None and working_price > limit_price:
+                limit_price = round(working_price, 2)
+                result["steps"] += 1
+
+            status = order.get("status")
+            if status == FILLED_STATUS:
+                result["filled"] = True
+                result["time_to_fill"] = time.monotonic() - started
+                break
+            if status in DEAD_STATUSES:
+                logger.warning("Order %s for %s ended as %s", order["id"], spread.get("ticker"), status)
+                break
+
+            next_price = round(min(limit_price + self.step, bound), 2)
+            if next_price <= limit_price or failed_replaces >= self.max_replace_failures:
+                if next_price <= limit_price:
+                    logger.info(
+                        "Order %s for %s reached slippage bound %.2f unfilled, cancelling",
+                        order["id"],
+                        spread.get("ticker"),
+                        bound,
+                    )
+                else:
+                    logger.warning(
+                        "Order %s for %s could not be replaced %d times in a row, cancelling",
+                        order["id"],
+                        spread.get("ticker"),
+                        failed_replaces,
+                    )
+                if status == REPLACED_STATUS and order.get("replaced_by"):
+                    self._cancel_order(order["replaced_by"])
+                    order = self._get_order(order["replaced_by"]) or order
+                else:
+                    self._cancel_order(order["id"])
+                    order = self._get_order(order["id"]) or order
+                if order.get("status") == FILLED_STATUS:
+                    result["filled"] = True
+                    result["time_to_fill"] = time.monotonic() - started
+                break
+
+            replaced = self._replace_order(order["id"], next_price)
+            if replaced:
+                order = replaced
+                limit_price = next_price
+                failed_replaces = 0
+                result["steps"] += 1
+                logger.info(
+                    "Walked %s limit to %.2f (mid %.2f, bound %.2f)",
+                    spread.get("ticker"),
+                    limit_price,
+                    mid,
+                    bound,
+                )
+            else:
+                # Replacement is rejected once the order has filled, died or been replaced.
+                failed_replaces += 1
+                order = self._get_order(order["id"]) or order
+
+        filled_qty = _number(order.get("filled_qty")) or 0
+        if result["filled"] and not filled_qty:
+            filled_qty = spread.get("qty") or 0
+        result["filled_qty"] = int(filled_qty)
+        if result["filled_qty"] and not result["filled"]:
+            logger.warning(
+                "Order %s for %s partially filled: %d of %s",
+                order["id"],
+                spread.get("ticker"),
+                result["filled_qty"],
+                spread.get("qty"),
+            )
+        result["order"] = order
+        result["limit_price"] = limit_price
+        ORDER_OUTCOMES.inc(outcome="filled" if result["filled"] else "unfilled")
+        ORDER_STEPS.observe(result["steps"])
+        if result["filled"]:
+            ORDER_FILL_SECONDS.observe(result["time_to_fill"])
+            events.publish(events.FILL, {
+                "order_id": order.get("id"),
+                "ticker": spread.get("ticker"),
+                "qty": spread.get("qty"),
+                "limit_price": limit_price,
+                "mid_price": mid,
+                "steps": result["steps"],
+                "time_to_fill": result["time_to_fill"],
+            })
+        return result
+
+    def execute_batch(self, spreads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Walk all spreads concurrently.
+
+        Args:
+            spreads: Spreads as accepted by ``walk``
+
+        Returns:
+            List of per-spread results
+        """
+        if not spreads:
+            return []
+
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(spreads))) as executor:
+            futures = {executor.submit(self.walk, spread): spread for spread in spreads}
+            for future in as_completed(futures):
+                spread = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error executing spread for {spread.get('ticker')}: {str(e)}")
+
+        kpis = summarize_executions(results)
+        logger.info(
+            "Execution batch: %d/%d filled (fill rate %.0f%%), median time to fill %s",
+            kpis["filled"],
+            kpis["submitted"],
+            kpis["fill_rate"] * 100,
+            f"{kpis['median_time_to_fill']:.1f}s" if kpis["median_time_to_fill"] is not None else "n/a",
+        )
+        return results
@@ -0,0 +1,179 @@
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Log-linear buckets: values below 2**SUB_BUCKET_BITS microseconds get one
+# bucket each, every higher power of two is split into 2**SUB_BUCKET_BITS
+# linear sub-buckets, bounding the relative error to about 3%.
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 32
+BUCKET_COUNT = SUB_BUCKETS + MAX_EXPONENT * SUB_BUCKETS
+
+PERCENTILES = (50, 95, 99)
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[\w-]{10,}$")
+
+
+def bucket_index(microseconds: int) -> int:
+    """Histogram bucket of a latency in microseconds."""
+    if microseconds < SUB_BUCKETS:
+        return max(microseconds, 0)
+    exponent = min(microseconds.bit_length() - SUB_BUCKET_BITS - 1, MAX_EXPONENT - 1)
+    mantissa = min(microseconds >> exponent, 2 * SUB_BUCKETS - 1)
+    return SUB_BUCKETS + exponent * SUB_BUCKETS + mantissa - SUB_BUCKETS
+
+
+def bucket_value(index: int) -> float:
+    """Midpoint of a bucket, in microseconds."""
+    if index < SUB_BUCKETS:
+        return float(index)
+    exponent, mantissa = divmod(index - SUB_BUCKETS, SUB_BUCKETS)
+    low = (SUB_BUCKETS + mantissa) << exponent
+    return low + ((1 << exponent) - 1) / 2
+
+
+def normalize_endpoint(method: str, endpoint: str) -> str:
+    """Metric label for a request, with ids and option symbols collapsed to ``{id}``."""
+    segments = [
+        "{id}" if _ID_SEGMENT.match(segment) else segment
+        for segment in endpoint.strip("/").split("/")
+    ]
+    return f"{method} /{'/'.join(segments)}"
+
+
+class LatencyHistogram:
+    """Latency distribution with HDR-style log-linear buckets, recorded in microseconds."""
+
+    def __init__(self):
+        self.counts = np.zeros(BUCKET_COUNT, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bucket_index(int(seconds * 1_000_000))] += 1
+        self.total += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts += other.counts
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, percentiles: Iterable[float] = PERCENTILES) -> Dict[str, Optional[float]]:
+        """Latency percentiles in seconds, keyed ``p50``, ``p95``..."""
+        percentiles = list(percentiles)
+        if not self.total:
+            return {f"p{p:g}": None for p in percentiles}
+        cumulative = np.cumsum(self.counts)
+        result = {}
+        for p in percentiles:
+            rank = max(1, int(np.ceil(p / 100 * self.total)))
+            index = int(np.searchsorted(cumulative, rank))
+            result[f"p{p:g}"] = min(bucket_value(index) / 1_000_000, self.max)
+        return result
+
+
+class EndpointStats:
+    """Counters and latency histogram for one endpoint, as seen by one thread."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.errors = 0
+        self.backoff_seconds = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.status_codes: Counter = Counter()
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.latency.merge(other.latency)
+        self.calls += other.calls
+        self.attempts += other.attempts
+        self.retries += other.retries
+        self.errors += other.errors
+        self.backoff_seconds += other.backoff_seconds
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.status_codes.update(other.status_codes)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "errors": self.errors,
+            "backoff_seconds": self.backoff_seconds,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "status_codes": dict(self.status_codes),
+            "mean": self.latency.sum / self.latency.total if self.latency.total else None,
+            "max": self.latency.max if self.latency.total else None,
+            **self.latency.percentiles(),
+        }
+
+
+class RequestStats:
+    """
+    Per-endpoint request statistics without locks on the recording path.
+
+    Every thread records into its own shard, so concurrent requests never
+    contend; a lock is only taken the first time a thread sees an endpoint,
+    to register the new shard. Readers merge all shards into a snapshot.
+    Shards of threads that have exited are folded into per-endpoint totals
+    whenever a shard is registered or a snapshot taken, so short-lived
+    worker threads do not accumulate shards.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, str, EndpointStats]] = []
+        self._retired: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def shard(self, endpoint: str) -> EndpointStats:
+        """The calling thread's stats for ``endpoint``."""
+        shards = getattr(self._local, "shards", None)
+        if shards is None:
+            shards = self._local.shards = {}
+        stats = shards.get(endpoint)
+        if stats is None:
+            stats = shards[endpoint] = EndpointStats()
+            with self._lock:
+                self._retire()
+                self._shards.append((threading.current_thread(), endpoint, stats))
+        return stats
+
+    def _retire(self) -> None:
+        """Fold shards of exited threads into the totals. Caller holds the lock."""
+        live = []
+        for thread, endpoint, stats in self._shards:
+            if thread.is_alive():
+                live.append((thread, endpoint, stats))
+            else:
+                self._retired.setdefault(endpoint, EndpointStats()).merge(stats)
+        self._shards = live
+
+    def snapshot(self) -> Dict[str, EndpointStats]:
+        """Merged stats per endpoint."""
+        merged: Dict[str, EndpointStats] = {}
+        with self._lock:
+            self._retire()
+            shards = list(self._shards)
+            for endpoint, stats in self._retired.items():
+                merged.setdefault(endpoint, EndpointStats()).merge(stats)
+        for _, endpoint, stats in shards:
+            merged.setdefault(endpoint, EndpointStats()).merge(stats)
+        return merged
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint counters and p50/p95/p99 latency in seconds."""
+        return {endpoint: stats.summary() for endpoint, stats in sorted(self.snapshot().items())}
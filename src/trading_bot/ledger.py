@@ -0,0 +1,329 @@
+import argparse
+import csv
+import datetime as dt
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("trading_bot")
+
+DEFAULT_LEDGER_PATH = "trade_ledger.db"
+
+# Option contracts are quoted per share
+CONTRACT_MULTIPLIER = 100
+
+# Column layout of the legacy trade_log.csv
+CSV_COLUMNS = [
+    "timestamp",
+    "ticker",
+    "qty",
+    "short_symbol",
+    "short_expiry",
+    "short_strike",
+    "short_price",
+    "long_symbol",
+    "long_expiry",
+    "long_strike",
+    "long_price",
+    "recommendation",
+    "status",
+    "closed_timestamp",
+    "pnl",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    client_order_id TEXT,
+    ticker TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    recommendation TEXT,
+    status TEXT NOT NULL DEFAULT 'Opened',
+    opened_at TEXT NOT NULL,
+    closed_at TEXT,
+    pnl REAL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+CREATE INDEX IF NOT EXISTS idx_orders_ticker ON orders(ticker);
+CREATE INDEX IF NOT EXISTS idx_orders_opened_at ON orders(opened_at);
+CREATE INDEX IF NOT EXISTS idx_orders_client_order_id ON orders(client_order_id);
+
+CREATE TABLE IF NOT EXISTS legs (
+    order_id TEXT NOT NULL REFERENCES orders(order_id),
+    leg TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    expiry TEXT,
+    strike REAL,
+    price REAL,
+    PRIMARY KEY (order_id, leg)
+);
+CREATE INDEX IF NOT EXISTS idx_legs_symbol ON legs(symbol);
+
+CREATE TABLE IF NOT EXISTS closes (
+    close_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT NOT NULL REFERENCES orders(order_id),
+    closed_at TEXT NOT NULL,
+    long_price REAL,
+    short_price REAL,
+    pnl REAL
+);
+CREATE INDEX IF NOT EXISTS idx_closes_order_id ON closes(order_id);
+CREATE INDEX IF NOT EXISTS idx_closes_closed_at ON closes(closed_at);
+"""
+
+UPDATABLE_ORDER_FIELDS = {"client_order_id", "status", "closed_at", "pnl", "recommendation", "qty"}
+
+
+class TradeLedger:
+    """
+    Append-only trade ledger backed by SQLite in WAL mode.
+
+    Opened spreads go to ``orders`` with one row per leg in ``legs``; each close
+    is appended to ``closes`` and the order row is updated by primary key, so
+    writes cost the same however long the history grows. A single connection
+    is shared across threads behind a lock.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    def record_trades(self, trades: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert opened spreads in a single transaction.
+
+        Args:
+            trades: Dicts with ``order_id``, ``ticker``, ``qty`` and optionally
+                ``client_order_id``, ``recommendation``, ``opened_at`` and ``legs``
+                (dicts with ``leg``, ``symbol``, ``side``, ``expiry``, ``strike``, ``price``)
+
+        Returns:
+            Number of orders inserted
+        """
+        now = dt.datetime.now().isoformat()
+        orders, legs = [], []
+        for trade in trades:
+            orders.append((
+                trade["order_id"],
+                trade.get("client_order_id"),
+                trade["ticker"],
+                int(trade["qty"]),
+                trade.get("recommendation"),
+                trade.get("opened_at") or now,
+            ))
+            for leg in trade.get("legs", []):
+                legs.append((
+                    trade["order_id"],
+                    leg["leg"],
+                    leg["symbol"],
+                    leg.get("side"),
+                    leg.get("expiry"),
+                    _to_float(leg.get("strike")),
+                    _to_float(leg.get("price")),
+                ))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO orders "
+                "(order_id, client_order_id, ticker, qty, recommendation, opened_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                orders,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO legs "
+                "(order_id, leg, symbol, side, expiry, strike, price) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                legs,
+            )
+        return len(orders)
+
+    def update_order(self, order_id: str, **fields: Any) -> bool:
+        """
+        Update columns of a single order by id.
+
+        Returns:
+            True if the order exists
+        """
+        unknown = set(fields) - UPDATABLE_ORDER_FIELDS
+        if unknown:
+            raise ValueError(f"Cannot update order fields: {', '.join(sorted(unknown))}")
+        if not fields:
+            return False
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE orders SET {assignments} WHERE order_id = ?", (*fields.values(), order_id)
+            )
+        return cursor.rowcount > 0
+
+    def record_closes(self, closes: Iterable[Dict[str, Any]]) -> int:
+        """
+        Record closed spreads in a single transaction.
+
+        If a close has no ``pnl`` it is computed from the legs' open prices as
+        ``((long_close - long_open) - (short_close - short_open)) * qty * 100``.
+
+        Args:
+            closes: Dicts with ``order_id`` and optionally ``long_price``,
+                ``short_price``, ``pnl`` and ``closed_at``
+
+        Returns:
+            Number of closes recorded
+        """
+        now = dt.datetime.now().isoformat()
+        count = 0
+        with self._lock, self._conn:
+            for close in closes:
+                long_price = _to_float(close.get("long_price"))
+                short_price = _to_float(close.get("short_price"))
+                pnl = close.get("pnl")
+                if pnl is None:
+                    pnl = self._compute_pnl(close["order_id"], long_price, short_price)
+                closed_at = close.get("closed_at") or now
+                self._conn.execute(
+                    "INSERT INTO closes (order_id, closed_at, long_price, short_price, pnl) VALUES (?, ?, ?, ?, ?)",
+                    (close["order_id"], closed_at, long_price, short_price, pnl),
+                )
+                self._conn.execute(
+                    "UPDATE orders SET status = 'Closed', closed_at = ?, pnl = ? WHERE order_id = ?",
+                    (closed_at, pnl, close["order_id"]),
+                )
+                count += 1
+        return count
+
+    def _compute_pnl(self, order_id: str, long_close: Optional[float], short_close: Optional[float]) -> Optional[float]:
+        if long_close is None or short_close is None:
+            return None
+        row = self._conn.execute(
+            "SELECT o.qty, "
+            "MAX(CASE WHEN l.leg = 'long' THEN l.price END) AS long_open, "
+            "MAX(CASE WHEN l.leg = 'short' THEN l.price END) AS short_open "
+            "FROM orders o JOIN legs l ON l.order_id = o.order_id WHERE o.order_id = ? GROUP BY o.order_id",
+            (order_id,),
+        ).fetchone()
+        if row is None or row["long_open"] is None or row["short_open"] is None:
+            return None
+        return ((long_close - row["long_open"]) - (short_close - row["short_open"])) * row["qty"] * CONTRACT_MULTIPLIER
+
+    def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch an order with its legs, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+            if row is None:
+                return None
+            legs = self._conn.execute("SELECT * FROM legs WHERE order_id = ? ORDER BY leg", (order_id,)).fetchall()
+        return {**dict(row), "legs": [dict(leg) for leg in legs]}
+
+    def open_orders(self) -> List[Dict[str, Any]]:
+        """All orders not yet closed, with their legs."""
+        with self._lock:
+            orders = [dict(row) for row in self._conn.execute(
+                "SELECT * FROM orders WHERE status != 'Closed' ORDER BY opened_at"
+            )]
+            legs = self._conn.execute(
+                "SELECT l.* FROM legs l JOIN orders o ON o.order_id = l.order_id WHERE o.status != 'Closed'"
+            ).fetchall()
+        by_order: Dict[str, List[Dict[str, Any]]] = {}
+        for leg in legs:
+            by_order.setdefault(leg["order_id"], []).append(dict(leg))
+        for order in orders:
+            order["legs"] = by_order.get(order["order_id"], [])
+        return orders
+
+    def last_ids(self) -> Tuple[int, int]:
+        """
+        Latest order rowid and close id, as a cheap change marker.
+
+        Orders are never deleted, so the order rowid doubles as the order count.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT (SELECT IFNULL(MAX(rowid), 0) FROM orders), (SELECT IFNULL(MAX(close_id), 0) FROM closes)"
+            ).fetchone()
+        return row[0], row[1]
+
+    def orders_since(self, rowid: int = 0) -> List[Dict[str, Any]]:
+        """Orders recorded after order rowid ``rowid``, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM orders WHERE rowid > ? ORDER BY rowid", (rowid,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def closes_since(self, close_id: int = 0) -> List[Dict[str, Any]]:
+        """Closes recorded after ``close_id``, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM closes WHERE close_id > ? ORDER BY close_id", (close_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def export_csv(self, path: str = "trade_log.csv") -> int:
+        """
+        Export the ledger in the legacy trade_log.csv layout.
+
+        Returns:
+            Number of rows written
+        """
+        query = (
+            "SELECT o.opened_at, o.ticker, o.qty, "
+            "s.symbol, s.expiry, s.strike, s.price, "
+            "l.symbol, l.expiry, l.strike, l.price, "
+            "o.recommendation, o.status, o.closed_at, o.pnl "
+            "FROM orders o "
+            "LEFT JOIN legs s ON s.order_id = o.order_id AND s.leg = 'short' "
+            "LEFT JOIN legs l ON l.order_id = o.order_id AND l.leg = 'long' "
+            "ORDER BY o.opened_at"
+        )
+        count = 0
+        with self._lock, open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for row in self._conn.execute(query):
+                writer.writerow(["" if value is None else value for value in row])
+                count += 1
+        logger.info("Exported %d trades to %s", count, path)
+        return count
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+_ledgers: Dict[str, TradeLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_ledger(path: str = DEFAULT_LEDGER_PATH) -> TradeLedger:
+    """Shared ledger instance for a database path."""
+    with _ledgers_lock:
+        if path not in _ledgers:
+            _ledgers[path] = TradeLedger(path)
+        return _ledgers[path]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the trade ledger to the legacy CSV layout.")
+    parser.add_argument("--db", default=DEFAULT_LEDGER_PATH, help="Ledger database path")
+    parser.add_argument("--out", default="trade_log.csv", help="CSV file to write")
+    args = parser.parse_args()
+    TradeLedger(args.db).export_csv(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import datetime as dt
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("trading_bot")
+
+Point = Tuple[dt.datetime, Dict[str, Any]]
+
+
+class MetricsLogIndex:
+    """
+    Incremental index over a JSONL metrics log with a ``timestamp`` field.
+
+    New lines are tailed from a saved byte offset and kept in memory in
+    fixed-width time buckets covering the last ``window``; older buckets are
+    evicted as new ones arrive. Queries reaching further back than the ring
+    binary-search the file by timestamp, which relies on the log being
+    appended in time order. On first use only the last ``window`` of the file
+    is read, and a truncated or replaced file is re-indexed from scratch.
+
+    Queries refresh inline unless the background tailer has been started.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        window: dt.timedelta = dt.timedelta(hours=24),
+        bucket_seconds: int = 60,
+        poll_interval: float = 1.0,
+        now_fn: Callable[[], dt.datetime] = dt.datetime.now,
+    ):
+        self.path = path
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.poll_interval = poll_interval
+        self.now_fn = now_fn
+        self._buckets: Deque[Tuple[int, List[Point]]] = deque()
+        self._offset: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._covered_from: Optional[dt.datetime] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Tail the log on a daemon thread every ``poll_interval`` seconds."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"log-index-{os.path.basename(self.path)}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to index {self.path}: {str(e)}")
+            self._stop.wait(self.poll_interval)
+
+    def refresh(self) -> int:
+        """
+        Index lines appended since the last call.
+
+        Returns:
+            Number of new points indexed
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return 0
+            if self._offset is None or stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reset(stat.st_ino)
+            if stat.st_size == self._offset:
+                return 0
+
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(stat.st_size - self._offset)
+            # Leave a partially written last line for the next refresh
+            end = data.rfind(b"\n") + 1
+            self._offset += end
+            count = 0
+            for line in data[:end].splitlines():
+                point = _parse(line)
+                if point is not None:
+                    self._append(point)
+                    count += 1
+            self._evict()
+            return count
+
+    def _reset(self, inode: int) -> None:
+        self._buckets.clear()
+        self._inode = inode
+        self._covered_from = self.now_fn() - self.window
+        self._offset = self.find_offset(self._covered_from)
+
+    def _append(self, point: Point) -> None:
+        key = int(point[0].timestamp()) // self.bucket_seconds
+        if self._buckets and self._buckets[-1][0] >= key:
+            self._buckets[-1][1].append(point)
+        else:
+            self._buckets.append((key, [point]))
+
+    def _evict(self) -> None:
+        horizon = int((self.now_fn() - self.window).timestamp()) // self.bucket_seconds
+        while self._buckets and self._buckets[0][0] < horizon:
+            self._buckets.popleft()
+        # Every point from the oldest kept bucket onwards is still in memory
+        self._covered_from = max(self._covered_from, dt.datetime.fromtimestamp(horizon * self.bucket_seconds))
+
+    def since(self, start: dt.datetime, end: Optional[dt.datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Records with ``start < timestamp <= end``, from memory where possible.
+
+        Args:
+            start: Exclusive lower bound
+            end: Inclusive upper bound (no bound if None)
+
+        Returns:
+            Records in log order
+        """
+        return list(self.iter_range(start, end))
+
+    def iter_range(self, start: dt.datetime, end: Optional[dt.datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Like ``since``, but records older than the ring are streamed from the file."""
+        if not self.running:
+            self.refresh()
+        with self._lock:
+            if self._covered_from is None or start < self._covered_from:
+                return self._iter_file(start, end)
+            return iter([
+                record
+                for key, bucket in self._buckets
+                if (key + 1) * self.bucket_seconds > start.timestamp()
+                for ts, record in bucket
+                if ts > start and (end is None or ts <= end)
+            ])
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent record, or None if the ring is empty."""
+        if not self.running:
+            self.refresh()
+        with self._lock:
+            return self._buckets[-1][1][-1][1] if self._buckets else None
+
+    def read_range(self, start: dt.datetime, end: Optional[dt.datetime] = None) -> List[Dict[str, Any]]:
+        """Read records with ``start < timestamp <= end`` directly from the file."""
+        return list(self._iter_file(start, end))
+
+    def _iter_file(self, start: dt.datetime, end: Optional[dt.datetime]) -> Iterator[Dict[str, Any]]:
+        try:
+            offset = self.find_offset(start)
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                point = _parse(line)
+                if point is None or point[0] <= start:
+                    continue
+                if end is not None and point[0] > end:
+                    break
+                yield point[1]
+
+    def find_offset(self, start: dt.datetime) -> int:
+        """
+        Byte offset of the first line timestamped at or after ``start``.
+
+        Binary-searches byte positions, realigning each probe to the next line
+        start, so only O(log n) lines of the file are read.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return 0
+        with f:
+            lo, hi = 0, f.seek(0, os.SEEK_END)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                ts = _first_timestamp(f, mid)
+                if ts is None or ts >= start:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            return _line_start(f, lo)
+
+
+def _line_start(f: BinaryIO, position: int) -> int:
+    """Start of the first line beginning at or after ``position``."""
+    if position == 0:
+        return 0
+    f.seek(position - 1)
+    f.readline()
+    return f.tell()
+
+
+def _first_timestamp(f: BinaryIO, position: int) -> Optional[dt.datetime]:
+    f.seek(_line_start(f, position))
+    for line in f:
+        point = _parse(line)
+        if point is not None:
+            return point[0]
+    return None
+
+
+def _parse(line: bytes) -> Optional[Point]:
+    try:
+        record = json.loads(line)
+        return dt.datetime.fromisoformat(record["timestamp"]), record
+    except (ValueError, KeyError, TypeError):
+        return None
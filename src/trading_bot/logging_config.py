@@ -1,44 +1,183 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
 import logging.handlers
 import os
-from datetime import datetime
-
-def setup_logging():
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s'
-    )
-
-    # Create handlers
-    # File handler with rotation
-    file_handler = logging.handlers.RotatingFileHandler(
-        filename=f'logs/trading_bot_{datetime.now().strftime("%Y%m%d")}.log',
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
-    )
-    file_handler.setFormatter(file_formatter)
-    file_handler.setLevel(logging.INFO)
-
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(console_formatter)
-    console_handler.setLevel(logging.INFO)
-
-    # Setup root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
-
-    # Setup trading bot logger
-    trading_logger = logging.getLogger('trading_bot')
-    trading_logger.setLevel(logging.INFO)
-
-    return trading_logger 
\ No newline at end of file
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+LOG_DIR = 'logs'
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Identifies this process's run in aggregated logs
+RUN_ID = uuid.uuid4().hex[:12]
+
+# Context attached to every record logged from the current thread or task
+CONTEXT_FIELDS = ('run_id', 'cycle', 'ticker')
+_context: Dict[str, contextvars.ContextVar] = {
+    name: contextvars.ContextVar(name, default=RUN_ID if name == 'run_id' else None) for name in CONTEXT_FIELDS
+}
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', *CONTEXT_FIELDS}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+_settings: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """
+    Attach context fields (``cycle``, ``ticker``) to records logged inside the block.
+
+    Context lives in context variables, so it follows the current thread or
+    asyncio task and is restored when the block exits.
+    """
+    tokens = [(_context[name], _context[name].set(value)) for name, value in fields.items()]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the logging context of the thread that created them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, var in _context.items():
+            if not hasattr(record, name):
+                setattr(record, name, var.get())
+        return True
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records for the listener thread.
+
+    Only the message is rendered on the calling thread; the traceback is kept
+    apart from it so the JSON output can carry it as its own field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with context fields and any ``extra`` values."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _log_path(settings: Dict[str, Any]) -> str:
+    path = settings.get('file') or f'trading_bot_{datetime.now().strftime("%Y%m%d")}.log'
+    return path if os.path.dirname(path) else os.path.join(LOG_DIR, path)
+
+
+def setup_logging(settings: Optional[Dict[str, Any]] = None) -> logging.Logger:
+    """
+    Configure the process's single logging pipeline.
+
+    Loggers only enqueue records: a ``QueueHandler`` on the root logger is the
+    one handler in the process, and a ``QueueListener`` thread formats them
+    and writes JSON lines to a rotating file and text (or JSON) to the
+    console. Calling this again is a no-op, except in a forked child (such as
+    a gunicorn worker), where the listener thread is restarted.
+
+    Args:
+        settings: The ``logging`` config section (``level``, ``file``,
+            ``format``, ``console``); defaults to the settings of the
+            previous call
+
+    Returns:
+        The ``trading_bot`` logger
+    """
+    global _listener, _listener_pid, _settings
+    with _lock:
+        settings = _settings = settings if settings is not None else _settings
+        trading_logger = logging.getLogger('trading_bot')
+        if _listener is not None and _listener_pid == os.getpid():
+            return trading_logger
+
+        level = getattr(logging, str(settings.get('level', 'INFO')).upper(), logging.INFO)
+        path = _log_path(settings)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            filename=path,
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5
+        )
+        file_handler.setFormatter(JsonFormatter())
+        console_handler = logging.StreamHandler()
+        if settings.get('console', 'text') == 'json':
+            console_handler.setFormatter(JsonFormatter())
+        else:
+            console_handler.setFormatter(logging.Formatter(settings.get('format', TEXT_FORMAT)))
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = ContextQueueHandler(records)
+        queue_handler.addFilter(ContextFilter())
+
+        # Exactly one handler chain: drop whatever was attached before
+        root_logger = logging.getLogger()
+        for logger in (root_logger, trading_logger):
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+        root_logger.addHandler(queue_handler)
+        root_logger.setLevel(level)
+        trading_logger.setLevel(level)
+        trading_logger.propagate = True
+
+        _listener = logging.handlers.QueueListener(
+            records, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        _listener_pid = os.getpid()
+        return trading_logger
+
+
+def shutdown_logging() -> None:
+    """Drain queued records and stop the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,235 @@
+import datetime as dt
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytz
+
+logger = logging.getLogger("trading_bot")
+
+eastern = pytz.timezone("America/New_York")
+
+DEFAULT_CALENDAR_PATH = os.path.join("data", "market_calendar.json")
+
+Session = Tuple[dt.datetime, dt.datetime]
+
+
+class MarketCalendar:
+    """
+    Trading calendar cached from Alpaca's ``/calendar`` endpoint.
+
+    Sessions are fetched in bulk for ``horizon_days`` ahead and persisted to a
+    local JSON file, so a restart reads them from disk instead of the API.
+    Lookups are dictionary hits: every date in the cached range maps to its
+    session (if any) and to the index of the first session on or after it.
+    A date outside the cached range triggers one bulk refresh; if the calendar
+    cannot be fetched, weekdays are assumed to trade regular hours.
+    """
+
+    def __init__(
+        self,
+        api_client,
+        path: str = DEFAULT_CALENDAR_PATH,
+        horizon_days: int = 120,
+        max_age_hours: float = 24,
+        retry_seconds: float = 300,
+        regular_open: dt.time = dt.time(9, 30),
+        regular_close: dt.time = dt.time(16),
+        today_fn: Callable[[], dt.date] = lambda: dt.datetime.now(eastern).date(),
+    ):
+        """
+        Args:
+            api_client: Client used to fetch ``/calendar``
+            path: File the calendar is persisted to
+            horizon_days: Days ahead of today fetched in one refresh
+            max_age_hours: Age after which a persisted calendar is refetched
+            retry_seconds: Minimum delay between fetches after a failed one
+            regular_open: Assumed open when the calendar is unavailable
+            regular_close: Assumed close when the calendar is unavailable
+            today_fn: Current date in US/Eastern
+        """
+        self.api_client = api_client
+        self.path = path
+        self.horizon_days = horizon_days
+        self.max_age = dt.timedelta(hours=max_age_hours)
+        self.retry_seconds = retry_seconds
+        self.regular_open = regular_open
+        self.regular_close = regular_close
+        self.today_fn = today_fn
+        self.fetched_at: Optional[dt.datetime] = None
+        self._start: Optional[dt.date] = None
+        self._end: Optional[dt.date] = None
+        self._sessions: List[Tuple[dt.date, Session]] = []
+        self._by_date: Dict[dt.date, Session] = {}
+        self._next_index: Dict[dt.date, int] = {}
+        self._loaded = False
+        self._failed_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, api_client, config: Dict[str, Any]) -> "MarketCalendar":
+        """Build a calendar from the top-level config and its ``calendar`` section."""
+        settings = config.get("calendar", {})
+        return cls(
+            api_client,
+            path=settings.get("path", DEFAULT_CALENDAR_PATH),
+            horizon_days=settings.get("horizon_days", 120),
+            max_age_hours=settings.get("max_age_hours", 24),
+            regular_open=dt.time(config.get("market_open_time", 9), 30),
+            regular_close=dt.time(config.get("market_close_time", 16)),
+        )
+
+    def session(self, day: dt.date) -> Optional[Session]:
+        """
+        Market open and close for a day.
+
+        Returns:
+            Tuple of (open, close) datetimes in US/Eastern, or None if the market is closed
+        """
+        if self._ensure(day):
+            return self._by_date.get(day)
+        return self._regular_session(day)
+
+    def is_trading_day(self, day: dt.date) -> bool:
+        """Whether the market opens on ``day``."""
+        return self.session(day) is not None
+
+    def sessions_from(self, day: dt.date, count: int) -> List[Session]:
+        """Up to ``count`` sessions on or after ``day``, in order."""
+        if self._ensure(day):
+            index = self._next_index.get(day, len(self._sessions))
+            return [session for _, session in self._sessions[index:index + count]]
+        sessions = []
+        for offset in range(14):
+            session = self._regular_session(day + dt.timedelta(days=offset))
+            if session is not None:
+                sessions.append(session)
+                if len(sessions) == count:
+                    break
+        return sessions
+
+    def next_session(self, after: dt.date) -> Optional[Session]:
+        """First session strictly after ``after``."""
+        sessions = self.sessions_from(after + dt.timedelta(days=1), 1)
+        return sessions[0] if sessions else None
+
+    def refresh(self, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> bool:
+        """
+        Fetch sessions from ``start`` through ``end`` in one request.
+
+        Args:
+            start: First date to fetch; defaults to a week before today
+            end: Last date to fetch; defaults to ``horizon_days`` after today
+
+        Returns:
+            True if the calendar was fetched
+        """
+        today = self.today_fn()
+        start = start if start is not None else today - dt.timedelta(days=7)
+        end = end if end is not None else max(start, today) + dt.timedelta(days=self.horizon_days)
+        with self._lock:
+            calendar = self.api_client.get("calendar", params={"start": start.isoformat(), "end": end.isoformat()})
+            if calendar is None:
+                self._failed_at = time.monotonic()
+                logger.warning("Market calendar unavailable, assuming regular hours")
+                return False
+            self._index(start, end, calendar, dt.datetime.now(pytz.utc))
+            self._failed_at = None
+            logger.info("Cached %d market sessions from %s to %s", len(self._sessions), start, end)
+        try:
+            self._save(calendar)
+        except OSError as e:
+            logger.error(f"Failed to persist market calendar to {self.path}: {str(e)}")
+        return True
+
+    def _ensure(self, day: dt.date) -> bool:
+        """Make sure ``day`` is in the cached range; False if the calendar is unavailable."""
+        if self._covers(day):
+            return True
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                self._load()
+                if self.fetched_at is not None and dt.datetime.now(pytz.utc) - self.fetched_at > self.max_age:
+                    logger.info("Persisted market calendar is stale, refreshing")
+                    self.refresh()
+            if self._covers(day):
+                return True
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_seconds:
+                return False
+            today = self.today_fn()
+            self.refresh(
+                start=min(day, today - dt.timedelta(days=7)),
+                end=max(day, today) + dt.timedelta(days=self.horizon_days),
+            )
+            return self._covers(day)
+
+    def _covers(self, day: dt.date) -> bool:
+        return self._start is not None and self._start <= day <= self._end
+
+    def _index(self, start: dt.date, end: dt.date, calendar: List[Dict[str, str]], fetched_at: dt.datetime) -> None:
+        sessions = []
+        for entry in calendar:
+            day = dt.date.fromisoformat(entry["date"])
+            market_open = dt.datetime.strptime(entry["open"], "%H:%M").time()
+            market_close = dt.datetime.strptime(entry["close"], "%H:%M").time()
+            sessions.append((day, (
+                eastern.localize(dt.datetime.combine(day, market_open)),
+                eastern.localize(dt.datetime.combine(day, market_close)),
+            )))
+        sessions.sort(key=lambda item: item[0])
+
+        next_index: Dict[dt.date, int] = {}
+        index = 0
+        for offset in range((end - start).days + 1):
+            day = start + dt.timedelta(days=offset)
+            while index < len(sessions) and sessions[index][0] < day:
+                index += 1
+            next_index[day] = index
+
+        self._sessions = sessions
+        self._by_date = dict(sessions)
+        self._next_index = next_index
+        self._start, self._end = start, end
+        self.fetched_at = fetched_at
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self._index(
+                dt.date.fromisoformat(data["start"]),
+                dt.date.fromisoformat(data["end"]),
+                data["sessions"],
+                dt.datetime.fromisoformat(data["fetched_at"]),
+            )
+            logger.info("Loaded %d market sessions from %s", len(self._sessions), self.path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load market calendar from {self.path}: {str(e)}")
+
+    def _save(self, calendar: List[Dict[str, str]]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "fetched_at": self.fetched_at.isoformat(),
+                "start": self._start.isoformat(),
+                "end": self._end.isoformat(),
+                "sessions": [
+                    {"date": entry["date"], "open": entry["open"], "close": entry["close"]} for entry in calendar
+                ],
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def _regular_session(self, day: dt.date) -> Optional[Session]:
+        if day.weekday() >= 5:
+            return None
+        return (
+            eastern.localize(dt.datetime.combine(day, self.regular_open)),
+            eastern.localize(dt.datetime.combine(day, self.regular_close)),
+        )
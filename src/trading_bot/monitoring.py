@@ -1,23 +1,100 @@
 import logging
+import threading
 import time
+from collections import deque
 from datetime import datetime
+import numpy as np
 import psutil
-import requests
-from typing import Dict, Any, Optional
+from typing import Callable, Deque, Dict, Any, List, Optional
 import json
 import os
+from trading_bot import events
+from trading_bot.alerts import AlertDispatcher, DROP_OLDEST, Sender, TelegramSender
+from trading_bot.metrics import SYSTEM_USAGE, registry
+
+API_REQUESTS = registry.counter(
+    "trading_bot_api_requests_total", "Alpaca API request attempts by endpoint and outcome.", ["endpoint", "outcome"]
+)
+API_REQUEST_SECONDS = registry.histogram(
+    "trading_bot_api_request_seconds", "Alpaca API request attempt latency.", ["endpoint"]
+)
+API_ERROR_RATE = registry.gauge("trading_bot_api_error_rate", "Error rate over the most recent API requests.")
+TRADES = registry.counter("trading_bot_trades_total", "Tracked trades by outcome.", ["outcome"])
+PROCESS_RESOURCES = registry.gauge(
+    "trading_bot_process_resources", "Trader process RSS bytes, thread count and open file descriptors.", ["resource"]
+)
+PROFIT_LOSS = registry.gauge("trading_bot_profit_loss_dollars", "Cumulative realized profit and loss.")
 
 logger = logging.getLogger(__name__)
 
+class RingBuffer:
+    """
+    Fixed-capacity ring of records stored column-wise in NumPy arrays.
+
+    Appending never allocates: once full, each append overwrites the oldest
+    record and returns it so callers can keep running aggregates up to date.
+    """
+
+    def __init__(self, capacity: int, columns: Dict[str, Any]):
+        """
+        Args:
+            capacity: Maximum number of records kept
+            columns: Column names mapped to NumPy dtypes
+        """
+        self.capacity = capacity
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns.items()}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, **values: Any) -> Optional[Dict[str, Any]]:
+        """Add a record; returns the evicted record once the buffer is full."""
+        evicted = None
+        if self._size == self.capacity:
+            evicted = {name: column[self._next].item() for name, column in self._columns.items()}
+        for name, column in self._columns.items():
+            column[self._next] = values[name]
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return evicted
+
+    def values(self, name: str) -> np.ndarray:
+        """View of a column's stored values, in storage (not time) order."""
+        return self._columns[name][:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """Copy of a column, oldest first."""
+        column = self._columns[name]
+        if self._size < self.capacity:
+            return column[:self._size].copy()
+        return np.concatenate((column[self._next:], column[:self._next]))
+
+    def last(self, n: int) -> Dict[str, np.ndarray]:
+        """The newest ``n`` records as columns, oldest first."""
+        return {name: self.column(name)[-n:] for name in self._columns}
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    return f"{value * 1000:.1f}ms" if value is not None else "n/a"
+
+
 class SystemMonitor:
-    def __init__(self, alert_thresholds: Optional[Dict[str, float]] = None):
+    def __init__(self, alert_thresholds: Optional[Dict[str, float]] = None, capacity: int = 1440):
         self.alert_thresholds = alert_thresholds or {
             'cpu_percent': 80.0,
             'memory_percent': 80.0,
             'disk_percent': 80.0
         }
         self.last_check = time.time()
-        self.metrics_history = []
+        # Last 24 hours of metrics, assuming 1-minute intervals
+        self.metrics_history = RingBuffer(capacity, {
+            'cpu_percent': np.float32,
+            'memory_percent': np.float32,
+            'disk_percent': np.float32,
+            'timestamp': np.float64,
+        })
 
     def get_system_metrics(self) -> Dict[str, float]:
         """Get current system metrics."""
@@ -41,61 +118,267 @@ class SystemMonitor:
         try:
             metrics = self.get_system_metrics()
             self.check_alerts(metrics)
-            self.metrics_history.append(metrics)
-            
-            # Keep only last 24 hours of metrics (assuming 1-minute intervals)
-            if len(self.metrics_history) > 1440:
-                self.metrics_history = self.metrics_history[-1440:]
-                
+            self.metrics_history.append(**metrics)
+            SYSTEM_USAGE.set(metrics['cpu_percent'], resource='cpu')
+            SYSTEM_USAGE.set(metrics['memory_percent'], resource='memory')
+            SYSTEM_USAGE.set(metrics['disk_percent'], resource='disk')
             logger.info(f"System metrics: {json.dumps(metrics)}")
             
         except Exception as e:
             logger.error(f"Error in system monitoring: {str(e)}")
 
+class HealthSampler:
+    """
+    Samples host and process health on a fixed cadence from a background thread.
+
+    Every psutil call used is non-blocking (CPU usage is measured since the
+    previous sample rather than over a sleep), so neither the sampler nor
+    readers of ``latest`` ever stall. Samples are kept in an in-memory ring and
+    appended to the health log in batches instead of one write per sample.
+    """
+
+    FIELDS = ('cpu_usage', 'memory_usage', 'disk_usage', 'process_rss', 'process_threads', 'open_fds')
+
+    def __init__(
+        self,
+        interval: float = 60.0,
+        capacity: int = 1440,
+        log_path: Optional[str] = os.path.join('logs', 'health_metrics.log'),
+        flush_size: int = 5,
+        flush_interval: float = 300.0,
+        disk_path: str = '/',
+    ):
+        """
+        Args:
+            interval: Seconds between samples
+            capacity: Number of samples kept in memory
+            log_path: JSON-lines health log samples are flushed to, or None
+            flush_size: Flush once this many samples are buffered
+            flush_interval: Flush at least this often, in seconds
+            disk_path: Mount point whose usage is reported
+        """
+        self.interval = interval
+        self.log_path = log_path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.disk_path = disk_path
+        self.series = RingBuffer(capacity, {
+            'cpu_usage': np.float32,
+            'memory_usage': np.float32,
+            'disk_usage': np.float32,
+            'process_rss': np.int64,
+            'process_threads': np.int32,
+            'open_fds': np.int32,
+            'timestamp': np.float64,
+        })
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._process = psutil.Process()
+        self._latest: Optional[Dict[str, Any]] = None
+        self._pending: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # The first non-blocking reading has no baseline and reports 0.0
+        psutil.cpu_percent(interval=None)
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample without blocking."""
+        memory = self._process.memory_info()
+        try:
+            open_fds = self._process.num_fds()
+        except AttributeError:
+            open_fds = self._process.num_handles()
+        now = time.time()
+        return {
+            'cpu_usage': psutil.cpu_percent(interval=None),
+            'memory_usage': psutil.virtual_memory().percent,
+            'disk_usage': psutil.disk_usage(self.disk_path).percent,
+            'process_rss': memory.rss,
+            'process_threads': self._process.num_threads(),
+            'open_fds': open_fds,
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+        }
+
+    def record(self, sample: Dict[str, Any]) -> None:
+        """Store a sample, buffer it for the health log and notify listeners."""
+        with self._lock:
+            self._latest = sample
+            self.series.append(
+                **{name: sample.get(name, 0) for name in self.FIELDS},
+                timestamp=datetime.fromisoformat(sample['timestamp']).timestamp(),
+            )
+            self._pending.append(json.dumps(sample))
+            due = (
+                len(self._pending) >= self.flush_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        SYSTEM_USAGE.set(sample['cpu_usage'], resource='cpu')
+        SYSTEM_USAGE.set(sample['memory_usage'], resource='memory')
+        SYSTEM_USAGE.set(sample['disk_usage'], resource='disk')
+        for resource in self.FIELDS[3:]:
+            if resource in sample:
+                PROCESS_RESOURCES.set(sample[resource], resource=resource)
+        events.publish(events.HEALTH, sample)
+        for listener in self.listeners:
+            try:
+                listener(sample)
+            except Exception as e:
+                logger.error(f"Health listener failed: {str(e)}")
+        if due:
+            self.flush()
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent sample, or None before the first one."""
+        return self._latest
+
+    def flush(self) -> None:
+        """Append buffered samples to the health log in one write."""
+        with self._lock:
+            lines, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if not lines or not self.log_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            with open(self.log_path, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+        except OSError as e:
+            logger.error(f"Failed to flush health metrics: {str(e)}")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='health-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop sampling and flush buffered samples."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        # Samples are scheduled on a fixed grid so slow samples do not drift the cadence
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.record(self.sample())
+            except Exception as e:
+                logger.error(f"Failed to sample system health: {str(e)}")
+            next_run += self.interval
+            now = time.monotonic()
+            if next_run < now:
+                next_run = now + self.interval
+            self._stop.wait(next_run - now)
+
+
 class APIMonitor:
-    def __init__(self, api_client):
+    def __init__(self, api_client, capacity: int = 10_000, window: int = 100):
+        """
+        Args:
+            api_client: Monitored AlpacaAPIClient
+            capacity: Number of requests kept in the history
+            window: Number of most recent requests the error rate and
+                latency percentiles are computed over
+        """
         self.api_client = api_client
-        self.request_history = []
+        self.request_history = RingBuffer(capacity, {
+            'endpoint': np.int32,
+            'success': np.bool_,
+            'response_time': np.float64,
+            'timestamp': np.float64,
+        })
+        self.endpoints: Dict[str, int] = {}
         self.error_count = 0
+        self.total_requests = 0
         self.last_successful_request = None
+        self._window = RingBuffer(window, {'success': np.bool_, 'response_time': np.float64})
+        self._window_failures = 0
+        self._latency_percentiles: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+        if hasattr(api_client, 'add_request_listener'):
+            api_client.add_request_listener(self.track_request)
 
     def track_request(self, endpoint: str, success: bool, response_time: float) -> None:
         """Track API request metrics."""
-        request_data = {
-            'endpoint': endpoint,
-            'success': success,
-            'response_time': response_time,
-            'timestamp': time.time()
-        }
-        self.request_history.append(request_data)
-        
-        if not success:
-            self.error_count += 1
-        else:
-            self.last_successful_request = time.time()
-            self.error_count = 0
+        now = time.time()
+        with self._lock:
+            endpoint_id = self.endpoints.setdefault(endpoint, len(self.endpoints))
+            self.request_history.append(
+                endpoint=endpoint_id, success=success, response_time=response_time, timestamp=now
+            )
+            evicted = self._window.append(success=success, response_time=response_time)
+            if evicted is not None and not evicted['success']:
+                self._window_failures -= 1
+            self.total_requests += 1
+            self._latency_percentiles = None
+            API_REQUESTS.inc(endpoint=endpoint, outcome='success' if success else 'error')
+            API_REQUEST_SECONDS.observe(response_time, endpoint=endpoint)
+
+            if not success:
+                self._window_failures += 1
+                self.error_count += 1
+            else:
+                self.last_successful_request = now
+                self.error_count = 0
+            API_ERROR_RATE.set(self._window_failures / len(self._window))
 
     def get_api_health(self) -> Dict[str, Any]:
-        """Get API health metrics."""
-        if not self.request_history:
-            return {'status': 'unknown', 'error_rate': 0.0}
-            
-        recent_requests = self.request_history[-100:]  # Last 100 requests
-        error_rate = sum(1 for r in recent_requests if not r['success']) / len(recent_requests)
-        
-        return {
-            'status': 'healthy' if error_rate < 0.1 else 'degraded',
-            'error_rate': error_rate,
-            'last_successful_request': self.last_successful_request,
-            'total_requests': len(self.request_history),
-            'error_count': self.error_count
-        }
+        """Get API health metrics over the most recent requests."""
+        with self._lock:
+            if not self.total_requests:
+                return {'status': 'unknown', 'error_rate': 0.0}
+
+            error_rate = self._window_failures / len(self._window)
+            if self._latency_percentiles is None:
+                p50, p95, p99 = np.percentile(self._window.values('response_time'), [50, 95, 99])
+                self._latency_percentiles = {
+                    'latency_p50': float(p50),
+                    'latency_p95': float(p95),
+                    'latency_p99': float(p99),
+                }
+
+            return {
+                'status': 'healthy' if error_rate < 0.1 else 'degraded',
+                'error_rate': error_rate,
+                'last_successful_request': self.last_successful_request,
+                'total_requests': self.total_requests,
+                'error_count': self.error_count,
+                **self._latency_percentiles,
+            }
+
+    def get_endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-endpoint request statistics from the client's latency histograms.
+
+        Returns:
+            Dict keyed by ``METHOD /path`` with calls, retries, errors, status
+            codes, bytes, backoff time and p50/p95/p99 latency in seconds
+        """
+        stats = getattr(self.api_client, 'stats', None)
+        return stats.summary() if stats is not None else {}
 
     def monitor(self) -> None:
         """Monitor API health and log metrics."""
         try:
             health_metrics = self.get_api_health()
             logger.info(f"API health metrics: {json.dumps(health_metrics)}")
+            for endpoint, stats in self.get_endpoint_stats().items():
+                logger.info(
+                    "API %s: %d calls, %d retries, %d errors, p50 %s p95 %s p99 %s, backoff %.2fs",
+                    endpoint, stats['calls'], stats['retries'], stats['errors'],
+                    _format_seconds(stats['p50']), _format_seconds(stats['p95']), _format_seconds(stats['p99']),
+                    stats['backoff_seconds'],
+                )
             
             if health_metrics['status'] == 'degraded':
                 logger.warning("API health is degraded")
@@ -104,39 +387,50 @@ class APIMonitor:
             logger.error(f"Error in API monitoring: {str(e)}")
 
 class TradeMonitor:
-    def __init__(self):
-        self.trade_history = []
+    def __init__(self, capacity: int = 10_000, recent: int = 10):
+        self.trade_history = RingBuffer(capacity, {
+            'success': np.bool_,
+            'profit_loss': np.float64,
+            'timestamp': np.float64,
+        })
+        self.recent_trades: Deque[Dict[str, Any]] = deque(maxlen=recent)
         self.profit_loss = 0.0
         self.total_trades = 0
         self.successful_trades = 0
+        self._lock = threading.Lock()
 
     def track_trade(self, trade_data: Dict[str, Any]) -> None:
         """Track trade execution and results."""
-        self.trade_history.append({
-            **trade_data,
-            'timestamp': time.time()
-        })
-        self.total_trades += 1
-        
-        if trade_data.get('success', False):
-            self.successful_trades += 1
-            self.profit_loss += trade_data.get('profit_loss', 0.0)
+        trade = {**trade_data, 'timestamp': time.time()}
+        success = bool(trade_data.get('success', False))
+        profit_loss = trade_data.get('profit_loss', 0.0) if success else 0.0
+        with self._lock:
+            self.trade_history.append(success=success, profit_loss=profit_loss, timestamp=trade['timestamp'])
+            self.recent_trades.append(trade)
+            self.total_trades += 1
+
+            if success:
+                self.successful_trades += 1
+                self.profit_loss += profit_loss
+            TRADES.inc(outcome='success' if success else 'failure')
+            PROFIT_LOSS.set(self.profit_loss)
 
     def get_trade_metrics(self) -> Dict[str, Any]:
         """Get trading performance metrics."""
-        if not self.trade_history:
+        with self._lock:
+            if not self.total_trades:
+                return {
+                    'total_trades': 0,
+                    'success_rate': 0.0,
+                    'profit_loss': 0.0
+                }
+
             return {
-                'total_trades': 0,
-                'success_rate': 0.0,
-                'profit_loss': 0.0
+                'total_trades': self.total_trades,
+                'success_rate': self.successful_trades / self.total_trades,
+                'profit_loss': self.profit_loss,
+                'recent_trades': list(self.recent_trades)
             }
-            
-        return {
-            'total_trades': self.total_trades,
-            'success_rate': self.successful_trades / self.total_trades,
-            'profit_loss': self.profit_loss,
-            'recent_trades': self.trade_history[-10:]  # Last 10 trades
-        }
 
     def monitor(self) -> None:
         """Monitor trading performance and log metrics."""
@@ -151,32 +445,65 @@ class TradeMonitor:
             logger.error(f"Error in trade monitoring: {str(e)}")
 
 class Monitoring:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], sender: Optional[Sender] = None):
+        """
+        Args:
+            config: Bot configuration
+            sender: Delivers alert messages; defaults to Telegram when it is
+                enabled and configured. Tests pass a local fake.
+        """
         self.config = config
-        self.telegram_enabled = config.get('monitoring', {}).get('enable_telegram', False)
-        self.telegram_token = config.get('monitoring', {}).get('telegram_bot_token')
-        self.telegram_chat_id = config.get('monitoring', {}).get('telegram_chat_id')
-        self.alert_on_trade = config.get('monitoring', {}).get('alert_on_trade', True)
-        self.alert_on_error = config.get('monitoring', {}).get('alert_on_error', True)
-        self.alert_on_circuit_breaker = config.get('monitoring', {}).get('alert_on_circuit_breaker', True)
-
-    def send_telegram_message(self, message: str) -> bool:
-        """Send a message via Telegram."""
-        if not self.telegram_enabled or not self.telegram_token or not self.telegram_chat_id:
-            return False
+        monitoring_config = config.get('monitoring', {})
+        self.telegram_enabled = monitoring_config.get('enable_telegram', False)
+        self.telegram_token = monitoring_config.get('telegram_bot_token')
+        self.telegram_chat_id = monitoring_config.get('telegram_chat_id')
+        self.alert_on_trade = monitoring_config.get('alert_on_trade', True)
+        self.alert_on_error = monitoring_config.get('alert_on_error', True)
+        self.alert_on_circuit_breaker = monitoring_config.get('alert_on_circuit_breaker', True)
 
-        try:
-            url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-            data = {
-                "chat_id": self.telegram_chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            }
-            response = requests.post(url, data=data)
-            return response.status_code == 200
-        except Exception as e:
-            logger.error(f"Failed to send Telegram message: {str(e)}")
+        if sender is None and self.telegram_enabled and self.telegram_token and self.telegram_chat_id:
+            sender = TelegramSender(
+                self.telegram_token, self.telegram_chat_id, monitoring_config.get('telegram_timeout', 10.0)
+            )
+        self.dispatcher = AlertDispatcher(
+            sender,
+            maxsize=monitoring_config.get('alert_queue_size', 100),
+            batch_seconds=monitoring_config.get('alert_batch_seconds', 2.0),
+            max_batch=monitoring_config.get('alert_max_batch', 20),
+            dedup_seconds=monitoring_config.get('alert_dedup_seconds', 300.0),
+            drop_policy=monitoring_config.get('alert_drop_policy', DROP_OLDEST),
+        ) if sender is not None else None
+
+        self.sampler = HealthSampler(
+            interval=monitoring_config.get('health_sample_interval', 60.0),
+            flush_size=monitoring_config.get('health_flush_size', 5),
+            flush_interval=monitoring_config.get('health_flush_interval', 300.0),
+        )
+        self.sampler.listeners.append(self.alert_system_health)
+
+    def send_telegram_message(self, message: str, key: Optional[str] = None) -> bool:
+        """
+        Queue a message for delivery via Telegram.
+
+        Never blocks on the network: the message is sent from the alert
+        dispatcher's thread, batched with any others raised shortly after.
+
+        Args:
+            message: Message text (Telegram HTML)
+            key: Deduplication key; repeats within the dedup window are suppressed
+
+        Returns:
+            True if the message was queued
+        """
+        if self.dispatcher is None:
             return False
+        return self.dispatcher.submit(message, key)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the health sampler, deliver queued alerts and stop the dispatcher."""
+        self.sampler.stop(timeout)
+        if self.dispatcher is not None:
+            self.dispatcher.stop(timeout)
 
     def alert_trade(self, trade_details: Dict[str, Any]) -> None:
         """Alert on trade execution."""
@@ -191,7 +518,7 @@ class Monitoring:
             f"Price: ${trade_details.get('price', 'N/A')}\n"
             f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
-        self.send_telegram_message(message)
+        self.send_telegram_message(message, key=f"trade:{trade_details.get('order_id') or message}")
 
     def alert_error(self, error_message: str) -> None:
         """Alert on error occurrence."""
@@ -203,7 +530,7 @@ class Monitoring:
             f"Message: {error_message}\n"
             f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
-        self.send_telegram_message(message)
+        self.send_telegram_message(message, key=f"error:{error_message}")
 
     def alert_circuit_breaker(self, reason: str) -> None:
         """Alert on circuit breaker trigger."""
@@ -215,44 +542,45 @@ class Monitoring:
             f"Reason: {reason}\n"
             f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
-        self.send_telegram_message(message)
+        self.send_telegram_message(message, key=f"circuit_breaker:{reason}")
 
-    def check_system_health(self) -> Dict[str, Any]:
-        """Check system health metrics."""
-        try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            health_data = {
-                'cpu_usage': cpu_percent,
-                'memory_usage': memory.percent,
-                'disk_usage': disk.percent,
-                'timestamp': datetime.now().isoformat()
-            }
+    def alert_system_health(self, health_data: Dict[str, Any]) -> None:
+        """Alert if any resource usage in a health sample is above threshold."""
+        cpu_usage = health_data['cpu_usage']
+        memory_usage = health_data['memory_usage']
+        disk_usage = health_data['disk_usage']
+        if cpu_usage > 80 or memory_usage > 80 or disk_usage > 80:
+            message = (
+                f"⚠️ <b>System Health Alert</b>\n\n"
+                f"CPU Usage: {cpu_usage}%\n"
+                f"Memory Usage: {memory_usage}%\n"
+                f"Disk Usage: {disk_usage}%\n"
+                f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            )
+            self.send_telegram_message(message, key="system_health")
 
-            # Alert if any metric is above threshold
-            if cpu_percent > 80 or memory.percent > 80 or disk.percent > 80:
-                message = (
-                    f"⚠️ <b>System Health Alert</b>\n\n"
-                    f"CPU Usage: {cpu_percent}%\n"
-                    f"Memory Usage: {memory.percent}%\n"
-                    f"Disk Usage: {disk.percent}%\n"
-                    f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                )
-                self.send_telegram_message(message)
+    def check_system_health(self) -> Dict[str, Any]:
+        """
+        Check system health metrics without blocking.
 
+        Returns the health sampler's latest sample while it is running;
+        otherwise takes and records a sample on the spot.
+        """
+        try:
+            if self.sampler.running and self.sampler.latest() is not None:
+                return self.sampler.latest()
+            health_data = self.sampler.sample()
+            self.sampler.record(health_data)
             return health_data
         except Exception as e:
             logger.error(f"Failed to check system health: {str(e)}")
             return {}
 
     def log_health_metrics(self, health_data: Dict[str, Any]) -> None:
-        """Log health metrics to file."""
+        """Buffer health metrics for the health log; samples already recorded are skipped."""
         try:
-            log_file = os.path.join('logs', 'health_metrics.log')
-            with open(log_file, 'a') as f:
-                f.write(json.dumps(health_data) + '\n')
+            if health_data and health_data is not self.sampler.latest():
+                self.sampler.record(health_data)
         except Exception as e:
             logger.error(f"Failed to log health metrics: {str(e)}")
 
@@ -1,18 +1,41 @@
 # Improved option_finder.py
-import yfinance as yf
 import datetime as dt
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 from .utils import find_nearest_expiration
 import logging
 import json
 from .api_client import AlpacaAPIClient
+from .streaming import QuoteStream
+from .metrics import CACHE_REQUESTS
 
 logger = logging.getLogger("trading_bot")
 
+# Streamed quotes older than this (seconds) fall back to REST
+STREAM_QUOTE_MAX_AGE = 5.0
+
+
+def get_current_price(
+    ticker: str, client: AlpacaAPIClient, quote_stream: Optional[QuoteStream] = None
+) -> Optional[float]:
+    """Latest price for a stock: the streamed quote mid if fresh, else the last REST trade."""
+    if quote_stream is not None:
+        quote = quote_stream.get_quote(ticker, max_age=STREAM_QUOTE_MAX_AGE)
+        if quote and quote["bid"] > 0 and quote["ask"] > 0:
+            CACHE_REQUESTS.inc(cache="stock_quotes", result="hit")
+            return (quote["bid"] + quote["ask"]) / 2
+        CACHE_REQUESTS.inc(cache="stock_quotes", result="miss")
+    return client.get(endpoint='stocks/trades/latest', params={'symbols': ticker}, base='data')['trades'][ticker]['p']
+
 
 def find_option_strategy(
-    ticker: str, earnings_date: dt.datetime, client: AlpacaAPIClient
+    ticker: str,
+    earnings_date: dt.datetime,
+    client: AlpacaAPIClient,
+    quote_stream: Optional[QuoteStream] = None,
 ) -> Union[Dict[str, Dict[str, str]], None]:
+    # Deferred: yfinance is slow to import and only needed when scanning
+    import yfinance as yf
+
     try:
         logger.info(f"Starting to find option strategy for ticker: {ticker}")
         stock = yf.Ticker(ticker)
@@ -26,7 +49,7 @@ def find_option_strategy(
             logger.error(f"Error fetching options for {ticker}: {e}")
             return None
 
-        current_price = client.get(endpoint='stocks/trades/latest', params={'symbols': ticker}, base='data')['trades'][ticker]['p']
+        current_price = get_current_price(ticker, client, quote_stream)
         if current_price is None:
             logger.error(f"Failed to fetch current price for {ticker}.")
             return None
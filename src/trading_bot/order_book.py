@@ -0,0 +1,202 @@
+import datetime as dt
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from trading_bot import events
+from trading_bot.execution import DEAD_STATUSES, FILLED_STATUS
+from trading_bot.ledger import CONTRACT_MULTIPLIER
+
+logger = logging.getLogger("trading_bot")
+
+# Statuses of orders that are no longer working
+CLOSED_STATUSES = DEAD_STATUSES | {FILLED_STATUS, "replaced"}
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _format_qty(qty: float) -> str:
+    return str(int(qty)) if float(qty).is_integer() else str(qty)
+
+
+class OrderBook:
+    """
+    In-memory book of the account's orders and positions.
+
+    Seeded from ``/positions`` and today's orders, then kept current by
+    applying trade updates. Position changes are derived from each leg's
+    cumulative ``filled_qty`` against the last one seen, so replayed or
+    duplicate updates never double-count a fill. Fill events of single-leg
+    orders also carry the resulting ``position_qty``, which is taken as
+    authoritative; it corrects fills that landed between the two requests
+    of a seed. Readers get copies and never touch the network.
+    """
+
+    def __init__(self, api_client, clock: Callable[[], dt.datetime] = lambda: dt.datetime.now(dt.timezone.utc)):
+        """
+        Args:
+            api_client: Client used to seed the book
+            clock: Current time, used to bound the orders fetched when seeding
+        """
+        self.api_client = api_client
+        self.clock = clock
+        self.seeded = threading.Event()
+        self.updated_at: Optional[dt.datetime] = None
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        # Leg or order id -> (cumulative filled qty, average fill price) already applied
+        self._fills: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def seed(self) -> bool:
+        """
+        Replace the book with the positions and today's orders from the API.
+
+        Returns:
+            True if both could be fetched
+        """
+        self.seeded.clear()
+        since = self.clock().replace(hour=0, minute=0, second=0, microsecond=0)
+        positions = self.api_client.get("positions")
+        orders = self.api_client.get(
+            "orders", params={"status": "all", "after": since.isoformat(), "limit": 500, "nested": "true"}
+        )
+        if positions is None or orders is None:
+            logger.error("Failed to seed the order book from the API")
+            self.seeded.clear()
+            return False
+        with self._lock:
+            self._positions = {position["symbol"]: dict(position) for position in positions}
+            self._orders = {order["id"]: order for order in orders}
+            # Fills so far are already reflected in the positions
+            self._fills = {
+                leg["id"]: (_number(leg.get("filled_qty")), _number(leg.get("filled_avg_price")))
+                for order in orders for leg in self._legs(order)
+            }
+            self.updated_at = self.clock()
+        self.seeded.set()
+        logger.info("Seeded order book with %d positions and %d orders", len(positions), len(orders))
+        return True
+
+    def invalidate(self) -> None:
+        """Mark the book stale, e.g. when trade updates stop arriving, until it is seeded again."""
+        self.seeded.clear()
+
+    def apply(self, update: Dict[str, Any]) -> None:
+        """Apply one trade update (the ``data`` of a ``trade_updates`` message)."""
+        order = update.get("order")
+        if not order:
+            return
+        changed = []
+        with self._lock:
+            self._orders[order["id"]] = order
+            # Any event may carry fills not seen yet, e.g. a cancel after a missed partial fill
+            for leg in self._legs(order):
+                position = self._apply_fill(leg)
+                if position is not None:
+                    changed.append(position)
+            position = self._sync_position(order.get("symbol"), update)
+            if position is not None:
+                changed.append(position)
+            self.updated_at = self.clock()
+        for position in changed:
+            events.publish(events.POSITION, position)
+
+    def _apply_fill(self, leg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply a leg's fills since the last update. Caller holds the lock."""
+        filled, average = _number(leg.get("filled_qty")), _number(leg.get("filled_avg_price"))
+        previous, previous_average = self._fills.get(leg["id"], (0.0, 0.0))
+        delta = filled - previous
+        if delta <= 0:
+            return None
+        self._fills[leg["id"]] = (filled, average)
+        # Price of just the new fills, backed out of the cumulative average
+        price = (filled * average - previous * previous_average) / delta
+        signed = delta if leg.get("side") == "buy" else -delta
+
+        symbol = leg["symbol"]
+        position = self._positions.get(symbol, {"symbol": symbol, "qty": "0", "avg_entry_price": "0"})
+        qty = _number(position.get("qty"))
+        new_qty = qty + signed
+        if new_qty == 0:
+            self._positions.pop(symbol, None)
+            return {"symbol": symbol, "qty": "0", "side": None, "avg_entry_price": None}
+        if qty == 0 or (qty > 0) != (new_qty > 0):
+            entry = price
+        elif abs(new_qty) > abs(qty):
+            entry = (abs(qty) * _number(position.get("avg_entry_price")) + delta * price) / abs(new_qty)
+        else:
+            entry = _number(position.get("avg_entry_price"))
+        position = {
+            **position,
+            "qty": _format_qty(new_qty),
+            "side": "long" if new_qty > 0 else "short",
+            "avg_entry_price": f"{entry:.4f}",
+        }
+        self._positions[symbol] = position
+        return dict(position)
+
+    def _sync_position(self, symbol: Optional[str], update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Set a position to the ``position_qty`` reported by a fill event. Caller holds the lock."""
+        if not symbol or update.get("position_qty") is None:
+            return None
+        qty = _number(update["position_qty"])
+        position = self._positions.get(symbol)
+        if qty == _number(position.get("qty") if position else 0):
+            return None
+        if qty == 0:
+            self._positions.pop(symbol, None)
+            return {"symbol": symbol, "qty": "0", "side": None, "avg_entry_price": None}
+        if position is None:
+            position = {"symbol": symbol, "avg_entry_price": f"{_number(update.get('price')):.4f}"}
+        position = {**position, "qty": _format_qty(qty), "side": "long" if qty > 0 else "short"}
+        self._positions[symbol] = position
+        return dict(position)
+
+    @staticmethod
+    def _legs(order: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """The legs of a multi-leg order, or the order itself."""
+        return order.get("legs") or [order]
+
+    def positions(self) -> List[Dict[str, Any]]:
+        """Open positions, in the shape returned by ``/positions``."""
+        with self._lock:
+            return [dict(position) for position in self._positions.values()]
+
+    def position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            position = self._positions.get(symbol)
+            return dict(position) if position is not None else None
+
+    def order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._orders.get(order_id)
+
+    def open_orders(self) -> List[Dict[str, Any]]:
+        """Orders that are still working."""
+        with self._lock:
+            return [order for order in self._orders.values() if order.get("status") not in CLOSED_STATUSES]
+
+    def unrealized_pl(self, price: Callable[[str], Optional[float]]) -> float:
+        """
+        Unrealized P&L of the open positions.
+
+        Args:
+            price: Current price of a symbol; positions without one use the
+                ``current_price`` they were seeded with, or are skipped
+        """
+        total = 0.0
+        for position in self.positions():
+            current = price(position["symbol"])
+            if current is None:
+                current = position.get("current_price")
+            if current is None:
+                continue
+            total += (_number(current) - _number(position.get("avg_entry_price"))) * _number(position.get("qty"))
+        return total * CONTRACT_MULTIPLIER
+
@@ -0,0 +1,159 @@
+import datetime as dt
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from trading_bot.metrics import registry
+
+logger = logging.getLogger("trading_bot")
+
+# Alpaca rejects longer client order ids
+MAX_CLIENT_ORDER_ID_LENGTH = 128
+
+ORDER_SUBMISSIONS = registry.counter(
+    "trading_bot_order_submissions_total",
+    "Order submissions by result (submitted, recovered, duplicate or failed).",
+    ["result"],
+)
+
+
+def client_order_id(cycle: dt.date, ticker: str, legs: Iterable[Tuple[str, str]], attempt: int = 0) -> str:
+    """
+    Deterministic client order id of a spread order.
+
+    The same cycle, ticker and legs always give the same id, so a retried
+    submission is recognised by the broker (and by ``lookup_order``) as the
+    order already placed. ``attempt`` distinguishes a deliberate resubmission
+    after the previous order was cancelled or rejected.
+
+    Args:
+        cycle: Trading day the order belongs to
+        ticker: Underlying symbol
+        legs: (symbol, side) of every leg
+        attempt: Resubmission number
+    """
+    digest = hashlib.sha1("|".join(f"{symbol}:{side}" for symbol, side in sorted(legs)).encode()).hexdigest()[:12]
+    order_id = f"cs-{cycle:%Y%m%d}-{ticker}-{digest}"
+    if attempt:
+        order_id = f"{order_id}-{attempt}"
+    return order_id[:MAX_CLIENT_ORDER_ID_LENGTH]
+
+
+class InFlightOrders:
+    """
+    Client order ids this process has submitted, and the orders they resolved to.
+
+    Claiming an id before submitting it keeps two threads from placing the
+    same order; ids whose submission may have reached the broker without a
+    response are remembered, so the next attempt looks the order up first.
+    """
+
+    def __init__(self):
+        self._orders: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._uncertain = set()
+        self._lock = threading.Lock()
+
+    def claim(self, client_order_id: str) -> bool:
+        """Reserve an id for submission; False if it is being or has been submitted."""
+        with self._lock:
+            if client_order_id in self._orders:
+                return False
+            self._orders[client_order_id] = None
+            return True
+
+    def resolve(self, client_order_id: str, order: Dict[str, Any]) -> None:
+        """Record the order an id was accepted as."""
+        with self._lock:
+            self._orders[client_order_id] = order
+            self._uncertain.discard(client_order_id)
+
+    def release(self, client_order_id: str) -> None:
+        """Give up an unresolved claim; the id may have reached the broker."""
+        with self._lock:
+            if self._orders.get(client_order_id) is None:
+                self._orders.pop(client_order_id, None)
+                self._uncertain.add(client_order_id)
+
+    def may_exist(self, client_order_id: str) -> None:
+        """Mark an id as possibly placed already, e.g. by a process that crashed."""
+        with self._lock:
+            self._uncertain.add(client_order_id)
+
+    def is_uncertain(self, client_order_id: str) -> bool:
+        with self._lock:
+            return client_order_id in self._uncertain
+
+    def get(self, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """The order an id resolved to, if any."""
+        with self._lock:
+            return self._orders.get(client_order_id)
+
+    def pending(self) -> int:
+        """Number of ids currently being submitted."""
+        with self._lock:
+            return sum(order is None for order in self._orders.values())
+
+
+def lookup_order(api_client, client_order_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch an order by client order id; None if the broker has no such order."""
+    return api_client.get("orders:by_client_order_id", params={"client_order_id": client_order_id}, retries=1)
+
+
+def submit_order(
+    api_client, payload: Dict[str, Any], in_flight: InFlightOrders, attempts: int = 3
+) -> Optional[Dict[str, Any]]:
+    """
+    Submit an order at most once, however often it is retried.
+
+    The payload must carry a ``client_order_id``. Every attempt after the
+    first (and the first one too, if an earlier submission of the id went
+    unanswered) looks the id up before posting again, so an order accepted
+    by the broker despite a timeout is returned instead of duplicated.
+
+    Args:
+        api_client: AlpacaAPIClient
+        payload: Order payload including ``client_order_id``
+        in_flight: Registry of ids submitted by this process
+        attempts: Maximum number of POST attempts
+
+    Returns:
+        The accepted order, or None if it could not be placed
+    """
+    order_id = payload["client_order_id"]
+    existing = in_flight.get(order_id)
+    if existing is not None:
+        ORDER_SUBMISSIONS.inc(result="duplicate")
+        logger.info("Order %s was already submitted as %s", order_id, existing.get("id"))
+        return existing
+    if not in_flight.claim(order_id):
+        ORDER_SUBMISSIONS.inc(result="duplicate")
+        logger.warning("Order %s is already being submitted", order_id)
+        return None
+
+    order = None
+    try:
+        for attempt in range(attempts):
+            if attempt or in_flight.is_uncertain(order_id):
+                order = lookup_order(api_client, order_id)
+                if order:
+                    ORDER_SUBMISSIONS.inc(result="recovered")
+                    logger.info("Found order %s already placed as %s", order_id, order.get("id"))
+                    return order
+            order = api_client.post(endpoint="/orders", payload=payload, retries=1)
+            if order:
+                ORDER_SUBMISSIONS.inc(result="submitted")
+                return order
+            logger.warning("Order %s submission attempt %d/%d failed", order_id, attempt + 1, attempts)
+        # The last attempt may have been accepted without a response reaching us
+        order = lookup_order(api_client, order_id)
+        if order:
+            ORDER_SUBMISSIONS.inc(result="recovered")
+            return order
+        ORDER_SUBMISSIONS.inc(result="failed")
+        return None
+    finally:
+        if order:
+            in_flight.resolve(order_id, order)
+        else:
+            in_flight.release(order_id)
@@ -0,0 +1,129 @@
+import base64
+import datetime as dt
+import json
+import math
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+
+Record = Dict[str, Any]
+Cursor = Tuple[str, int]
+
+
+def encode_cursor(key: str, skip: int) -> str:
+    """Opaque cursor pointing after the first ``skip`` records with sort key ``key``."""
+    raw = json.dumps({"k": key, "s": skip}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(raw["k"]), int(raw["s"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class Page:
+    """
+    Lazily paginated view over records sorted by a string key.
+
+    Iterating yields at most ``limit`` records after the cursor position; once
+    exhausted, ``next_cursor`` is set if more records follow. Records sharing a
+    key are counted so pages can split them without repeats or gaps.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Record],
+        key: Callable[[Record], str],
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[Cursor] = None,
+    ):
+        self.records = records
+        self.key = key
+        self.limit = limit
+        self.cursor = cursor
+        self.next_cursor: Optional[str] = None
+
+    def __iter__(self) -> Iterator[Record]:
+        after, skip = self.cursor or (None, 0)
+        last_key, run, count = after, skip, 0
+        for record in self.records:
+            key = self.key(record)
+            if after is not None:
+                if key < after:
+                    continue
+                if key == after and skip > 0:
+                    skip -= 1
+                    continue
+            if count == self.limit:
+                self.next_cursor = encode_cursor(last_key, run)
+                return
+            run = run + 1 if key == last_key else 1
+            last_key = key
+            count += 1
+            yield record
+
+
+def stream_json(page: Page) -> Iterator[str]:
+    """Serialize a page as ``{"data": [...], "next_cursor": ...}`` one record at a time."""
+    yield '{"data": ['
+    for i, record in enumerate(page):
+        yield ("," if i else "") + json.dumps(record, default=str)
+    yield '], "next_cursor": ' + json.dumps(page.next_cursor) + "}"
+
+
+def downsample(
+    records: Iterable[Record], bucket_seconds: int, timestamp: Callable[[Record], dt.datetime]
+) -> Iterator[Record]:
+    """
+    Aggregate time-ordered records into fixed-width buckets.
+
+    Every numeric field is reduced to ``{"min", "max", "mean"}``; other fields
+    are dropped.
+
+    Args:
+        records: Records in time order
+        bucket_seconds: Bucket width
+        timestamp: Returns a record's time
+
+    Yields:
+        One record per non-empty bucket with its start ``timestamp`` and ``count``
+    """
+    current: Optional[int] = None
+    stats: Dict[str, list] = {}
+    count = 0
+    for record in records:
+        bucket = math.floor(timestamp(record).timestamp() / bucket_seconds)
+        if bucket != current:
+            if current is not None:
+                yield _bucket_record(current, bucket_seconds, count, stats)
+            current, stats, count = bucket, {}, 0
+        count += 1
+        for name, value in record.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                entry = stats.setdefault(name, [value, value, 0.0, 0])
+                entry[0] = min(entry[0], value)
+                entry[1] = max(entry[1], value)
+                entry[2] += value
+                entry[3] += 1
+    if current is not None:
+        yield _bucket_record(current, bucket_seconds, count, stats)
+
+
+def _bucket_record(bucket: int, bucket_seconds: int, count: int, stats: Dict[str, list]) -> Record:
+    record: Record = {
+        "timestamp": dt.datetime.fromtimestamp(bucket * bucket_seconds).isoformat(),
+        "count": count,
+    }
+    for name, (low, high, total, n) in stats.items():
+        record[name] = {"min": low, "max": high, "mean": total / n}
+    return record
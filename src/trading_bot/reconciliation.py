@@ -0,0 +1,238 @@
+import datetime as dt
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from trading_bot.ledger import CONTRACT_MULTIPLIER, TradeLedger
+
+logger = logging.getLogger("trading_bot")
+
+ACTIVITIES_PAGE_SIZE = 100
+ORDERS_PAGE_SIZE = 500
+
+FILL_COLUMNS = ["id", "order_id", "symbol", "side", "qty", "price", "transaction_time"]
+REALIZED_COLUMNS = ["pnl", "long_price", "short_price", "closed_at"]
+
+
+class ReconciliationEngine:
+    """
+    Reconcile broker fills against open trade ledger entries.
+
+    Fills for a date range are pulled in bulk from Alpaca's account activities
+    endpoint, mapped from leg order ids to their parent spread order via the
+    orders endpoint, and joined to the ledger's open legs. Realized P&L is then
+    computed per spread with vectorized pandas operations and written back to
+    the ledger in one batch.
+    """
+
+    def __init__(self, api_client, ledger: TradeLedger, trade_monitor=None):
+        """
+        Args:
+            api_client: AlpacaAPIClient used to fetch activities and orders
+            ledger: Trade ledger holding the open spreads
+            trade_monitor: Optional TradeMonitor fed with every realized P&L
+        """
+        self.api_client = api_client
+        self.ledger = ledger
+        self.trade_monitor = trade_monitor
+
+    def fetch_fills(self, start: dt.datetime, end: dt.datetime) -> pd.DataFrame:
+        """Fetch all fill activities between ``start`` and ``end``."""
+        activities: List[Dict[str, Any]] = []
+        params = {
+            "after": start.isoformat(),
+            "until": end.isoformat(),
+            "direction": "asc",
+            "page_size": ACTIVITIES_PAGE_SIZE,
+        }
+        while True:
+            page = self.api_client.get("account/activities/FILL", params=params)
+            if not page:
+                break
+            activities.extend(page)
+            if len(page) < ACTIVITIES_PAGE_SIZE:
+                break
+            params["page_token"] = page[-1]["id"]
+
+        fills = pd.DataFrame(activities, columns=FILL_COLUMNS)
+        fills["qty"] = pd.to_numeric(fills["qty"])
+        fills["price"] = pd.to_numeric(fills["price"])
+        return fills
+
+    def fetch_leg_orders(self, start: dt.datetime, end: dt.datetime) -> pd.DataFrame:
+        """
+        Fetch orders submitted between ``start`` and ``end`` and map every leg
+        order id to its parent order id.
+
+        Returns:
+            DataFrame with ``order_id`` (leg or parent id) and ``parent_order_id``
+        """
+        rows: List[Dict[str, str]] = []
+        params = {
+            "status": "all",
+            "after": start.isoformat(),
+            "until": end.isoformat(),
+            "direction": "asc",
+            "nested": "true",
+            "limit": ORDERS_PAGE_SIZE,
+        }
+        while True:
+            page = self.api_client.get("orders", params=params)
+            if not page:
+                break
+            for order in page:
+                rows.append({"order_id": order["id"], "parent_order_id": order["id"]})
+                for leg in order.get("legs") or []:
+                    rows.append({"order_id": leg["id"], "parent_order_id": order["id"]})
+            if len(page) < ORDERS_PAGE_SIZE:
+                break
+            params["after"] = page[-1]["submitted_at"]
+
+        return pd.DataFrame(rows, columns=["order_id", "parent_order_id"]).drop_duplicates("order_id")
+
+    def open_legs(self) -> pd.DataFrame:
+        """Legs of all open ledger spreads, one row per leg."""
+        rows = [
+            {
+                "spread_id": order["order_id"],
+                "qty": order["qty"],
+                "leg": leg["leg"],
+                "symbol": leg["symbol"],
+                "ledger_price": leg["price"],
+            }
+            for order in self.ledger.open_orders()
+            for leg in order["legs"]
+        ]
+        return pd.DataFrame(rows, columns=["spread_id", "qty", "leg", "symbol", "ledger_price"])
+
+    def compute_pnl(self, fills: pd.DataFrame, leg_orders: pd.DataFrame, legs: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute realized P&L per fully closed spread.
+
+        Fills belonging to a spread's own (opening) order are matched by parent
+        order id. Other fills on the opposite side of an open leg (a sell for a
+        long leg, a buy for a short leg) are closing fills; they are allocated
+        to the spreads holding that leg oldest first, in fill order, so spreads
+        sharing a contract never count the same close twice. Opening prices
+        come from the opening fills where present and from the ledger otherwise.
+
+        Returns:
+            DataFrame indexed by spread id with ``pnl``, ``long_price``,
+            ``short_price`` (closing VWAPs) and ``closed_at``
+        """
+        if fills.empty or legs.empty:
+            return pd.DataFrame(columns=REALIZED_COLUMNS)
+
+        fills = fills.merge(leg_orders, on="order_id", how="left")
+        fills["parent_order_id"] = fills["parent_order_id"].fillna(fills["order_id"])
+        spread_ids = legs["spread_id"].unique()
+        is_open_fill = fills["parent_order_id"].isin(spread_ids)
+        fills["notional"] = fills["price"] * fills["qty"]
+
+        # Opening fills: VWAP per (spread, symbol), falling back to the ledger price
+        opening = (
+            fills[is_open_fill]
+            .groupby(["parent_order_id", "symbol"])[["notional", "qty"]]
+            .sum()
+            .rename_axis(["spread_id", "symbol"])
+        )
+        legs = legs.merge(
+            (opening["notional"] / opening["qty"]).rename("open_fill_price").reset_index(),
+            on=["spread_id", "symbol"],
+            how="left",
+        )
+        legs["open_price"] = legs["open_fill_price"].fillna(legs["ledger_price"])
+
+        # Closing fills: the opposite side of an open leg, allocated oldest spread first.
+        # Each leg and each fill covers an interval of the cumulative quantity per
+        # (symbol, side); a fill closes whatever part of a leg's interval it overlaps.
+        legs["leg_index"] = np.arange(len(legs))
+        legs["close_side"] = np.where(legs["leg"] == "long", "sell", "buy")
+        legs["leg_end"] = legs.groupby(["symbol", "close_side"])["qty"].cumsum()
+        closing = fills[~is_open_fill].sort_values("transaction_time", kind="stable")
+        closing = closing.assign(fill_end=closing.groupby(["symbol", "side"])["qty"].cumsum())
+        pairs = legs[["leg_index", "symbol", "close_side", "qty", "leg_end"]].merge(
+            closing[["symbol", "side", "qty", "fill_end", "price", "transaction_time"]],
+            left_on=["symbol", "close_side"],
+            right_on=["symbol", "side"],
+            suffixes=("", "_fill"),
+        )
+        pairs["allocated"] = (
+            np.minimum(pairs["leg_end"], pairs["fill_end"])
+            - np.maximum(pairs["leg_end"] - pairs["qty"], pairs["fill_end"] - pairs["qty_fill"])
+        ).clip(lower=0)
+        pairs = pairs[pairs["allocated"] > 0]
+        allocated = (
+            pairs.assign(close_notional=pairs["allocated"] * pairs["price"])
+            .groupby("leg_index")
+            .agg(close_notional=("close_notional", "sum"), close_qty=("allocated", "sum"),
+                 closed_at=("transaction_time", "max"))
+        )
+        legs = legs.merge(allocated, left_on="leg_index", right_index=True, how="left")
+        legs[["close_notional", "close_qty"]] = legs[["close_notional", "close_qty"]].fillna(0.0)
+
+        # A spread is realized once every leg has closed its full quantity
+        legs["closed"] = legs["close_qty"] >= legs["qty"]
+        legs["close_price"] = legs["close_notional"] / legs["close_qty"].replace(0, np.nan)
+        direction = np.where(legs["leg"] == "long", 1.0, -1.0)
+        legs["pnl"] = direction * (legs["close_price"] - legs["open_price"]) * legs["qty"] * CONTRACT_MULTIPLIER
+
+        grouped = legs.groupby("spread_id")
+        realized = grouped["closed"].all() & grouped["pnl"].count().eq(grouped.size())
+        result = pd.DataFrame({
+            "pnl": grouped["pnl"].sum(),
+            "long_price": legs[legs["leg"] == "long"].set_index("spread_id")["close_price"],
+            "short_price": legs[legs["leg"] == "short"].set_index("spread_id")["close_price"],
+            "closed_at": grouped["closed_at"].max(),
+        })
+        return result[realized.reindex(result.index, fill_value=False)]
+
+    def reconcile(self, start: dt.datetime, end: Optional[dt.datetime] = None) -> pd.DataFrame:
+        """
+        Reconcile fills in a date range and record realized P&L.
+
+        Args:
+            start: Start of the fill window
+            end: End of the fill window (defaults to now)
+
+        Returns:
+            DataFrame of spreads closed by this run, indexed by spread id
+        """
+        end = end or dt.datetime.now(dt.timezone.utc)
+        legs = self.open_legs()
+        if legs.empty:
+            logger.info("No open ledger entries to reconcile")
+            return pd.DataFrame(columns=REALIZED_COLUMNS)
+
+        fills = self.fetch_fills(start, end)
+        leg_orders = self.fetch_leg_orders(start, end)
+        realized = self.compute_pnl(fills, leg_orders, legs)
+
+        if not realized.empty:
+            self.ledger.record_closes([
+                {
+                    "order_id": spread_id,
+                    "long_price": row["long_price"],
+                    "short_price": row["short_price"],
+                    "pnl": float(row["pnl"]),
+                    "closed_at": str(row["closed_at"]),
+                }
+                for spread_id, row in realized.iterrows()
+            ])
+            if self.trade_monitor is not None:
+                for spread_id, row in realized.iterrows():
+                    self.trade_monitor.track_trade({
+                        "order_id": spread_id,
+                        "success": True,
+                        "profit_loss": float(row["pnl"]),
+                    })
+
+        logger.info(
+            "Reconciled %d fills: %d spreads closed, realized P&L %.2f",
+            len(fills),
+            len(realized),
+            realized["pnl"].sum() if not realized.empty else 0.0,
+        )
+        return realized
@@ -0,0 +1,220 @@
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from trading_bot.logging_config import setup_logging
+from trading_bot.metrics import CONTENT_TYPE, registry
+
+logger = logging.getLogger("trading_bot")
+
+MODES = ["all", "trader", "web", "serve"]
+
+DEFAULT_SERVING = {
+    "host": "0.0.0.0",
+    "port": 5000,
+    "workers": 4,
+    "threads": 8,
+    "trader_health_host": "127.0.0.1",
+    "trader_health_port": 8001,
+}
+
+
+def load_config_section(path: str, section: str) -> Dict[str, Any]:
+    """One section of the config file, or an empty dict if it cannot be read."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get(section, {})
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def load_serving_config(path: str = "config.json") -> Dict[str, Any]:
+    """Serving settings from the ``serving`` section of the config, with defaults."""
+    return {**DEFAULT_SERVING, **load_config_section(path, "serving")}
+
+
+class HealthServer:
+    """
+    Minimal HTTP server answering ``GET /healthz`` with a JSON status document
+    and ``GET /metrics`` with the trader process's metrics.
+    """
+
+    def __init__(self, status_fn: Callable[[], Dict[str, Any]], host: str = "127.0.0.1", port: int = 8001):
+        status = status_fn
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    self._send(200, registry.render().encode(), CONTENT_TYPE)
+                    return
+                if path != "/healthz":
+                    self.send_error(404)
+                    return
+                try:
+                    body = status()
+                except Exception as e:
+                    body = {"status": "error", "error": str(e)}
+                payload = json.dumps(body, default=str).encode()
+                self._send(200 if body.get("status") == "ok" else 503, payload, "application/json")
+
+            def _send(self, code, payload, content_type):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug("Health check: " + format, *args)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, name="health-server", daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _bootstrap(config_path: str) -> None:
+    from trading_bot.context import ConfigError, bootstrap
+
+    try:
+        bootstrap(config_path)
+    except ConfigError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+
+def run_trader(settings: Dict[str, Any], config_path: str = "config.json") -> None:
+    """Run the trader in this process with its health endpoint."""
+    from trading_bot.trader import trader, trader_status
+
+    _bootstrap(config_path)
+    health = HealthServer(trader_status, settings["trader_health_host"], settings["trader_health_port"])
+    health.start()
+    logger.info("Trader health endpoint on http://%s:%d/healthz", settings["trader_health_host"], health.port)
+    try:
+        trader()
+    finally:
+        health.stop()
+
+
+def _start_indexes(worker) -> None:
+    from trading_bot.web_interface import health_index, performance_index, store_feed
+
+    # The logging listener thread does not survive the fork into the worker
+    setup_logging()
+    health_index.start()
+    performance_index.start()
+    # The trader is another process, so live events come from the shared stores
+    store_feed.start()
+
+
+def _configure_web(config_path: str) -> None:
+    from trading_bot.web_interface import configure
+
+    configure(
+        load_config_section(config_path, "ledger").get("path"),
+        load_config_section(config_path, "spread_store").get("path"),
+    )
+
+
+def run_web(settings: Dict[str, Any], config_path: str = "config.json") -> None:
+    """
+    Serve the web interface with gunicorn.
+
+    Workers are forked processes with their own threads, so dashboard requests
+    never contend with the trader; they share state only through the ledger,
+    spread store and metric logs, read from the paths in ``config_path``.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.error("gunicorn is required for the web and serve modes: pip install gunicorn")
+        sys.exit(1)
+    from trading_bot.web_interface import app
+
+    _configure_web(config_path)
+
+    class WebApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{settings['host']}:{settings['port']}")
+            self.cfg.set("workers", settings["workers"])
+            # Threaded workers keep long-lived event streams from blocking a whole worker
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", settings["threads"])
+            self.cfg.set("post_worker_init", _start_indexes)
+
+        def load(self):
+            return app
+
+    WebApplication().run()
+
+
+def run_all(settings: Dict[str, Any], config_path: str = "config.json") -> None:
+    """Development mode: trader thread and Flask's dev server in one process."""
+    from trading_bot.trader import trader
+    from trading_bot.web_interface import run_web_interface
+
+    _bootstrap(config_path)
+    _configure_web(config_path)
+    trader_thread = threading.Thread(target=trader)
+    trader_thread.daemon = True
+    trader_thread.start()
+    run_web_interface(host=settings["host"], port=settings["port"])
+
+
+def serve(settings: Dict[str, Any], config_path: str) -> None:
+    """Production mode: trader in a child process, web interface under gunicorn."""
+    command = [sys.executable, "-m", "trading_bot.run", "--mode", "trader", "--config", config_path]
+    trader_process = subprocess.Popen(command)
+    logger.info("Started trader process %d", trader_process.pid)
+    try:
+        run_web(settings, config_path)
+    finally:
+        trader_process.terminate()
+        try:
+            trader_process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            trader_process.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the trading bot and its web interface.")
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="all",
+        help="all: trader and dev server in one process; trader: trader with health endpoint; "
+        "web: web interface under gunicorn; serve: trader process plus gunicorn",
+    )
+    parser.add_argument("--config", default="config.json", help="Configuration file")
+    args = parser.parse_args(argv)
+    settings = load_serving_config(args.config)
+    setup_logging(load_config_section(args.config, "logging"))
+
+    if args.mode == "trader":
+        run_trader(settings, args.config)
+    elif args.mode == "web":
+        run_web(settings, args.config)
+    elif args.mode == "serve":
+        serve(settings, args.config)
+    else:
+        run_all(settings, args.config)
+
+
+if __name__ == "__main__":
+    main()
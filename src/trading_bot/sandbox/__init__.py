@@ -0,0 +1 @@
+"""Local stand-ins for Alpaca services, for offline testing."""
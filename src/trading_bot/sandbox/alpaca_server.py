@@ -0,0 +1,838 @@
+import argparse
+import datetime as dt
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from trading_bot.latency import normalize_endpoint
+
+logger = logging.getLogger("trading_bot")
+
+# Statuses of orders that are no longer working
+CLOSED_STATUSES = {"filled", "canceled", "expired", "rejected", "replaced"}
+
+OCC_SYMBOL = re.compile(r"^(?P<root>[A-Z.]{1,6})(?P<expiry>\d{6})(?P<type>[CP])(?P<strike>\d{8})$")
+
+# Stable namespace for order and activity ids, so a seeded run is reproducible
+ID_NAMESPACE = uuid.UUID("6f1c2e0a-5b7d-4c1e-9a53-2f8e4d7b9c10")
+
+
+def option_symbol(underlying: str, expiry: dt.date, option_type: str, strike: float) -> str:
+    """OCC symbol of an option contract, e.g. ``AAPL250117C00150000``."""
+    return f"{underlying}{expiry:%y%m%d}{option_type[0].upper()}{int(round(strike * 1000)):08d}"
+
+
+def _norm_cdf(x: float) -> float:
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+class SandboxFixtures:
+    """
+    Deterministic market data for the stand-in server.
+
+    Every value is derived from the seed and the symbol, so the same seed
+    always serves the same prices, contracts and quotes. Stock prices and
+    quotes can be pinned per symbol; option quotes are otherwise priced with
+    Black-Scholes from the underlying's price and a per-underlying volatility.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        prices: Optional[Dict[str, float]] = None,
+        quotes: Optional[Dict[str, Dict[str, float]]] = None,
+        holidays: Optional[List[str]] = None,
+        strikes: int = 10,
+        today_fn: Callable[[], dt.date] = lambda: dt.datetime.now(dt.timezone.utc).date(),
+    ):
+        """
+        Args:
+            seed: Seed all generated data is derived from
+            prices: Stock prices by symbol, overriding generated ones
+            quotes: Option ``bid``/``ask`` by contract symbol, overriding priced ones
+            holidays: ISO dates the market is closed besides weekends
+            strikes: Strikes listed on each side of the stock price
+            today_fn: Current date, used for time to expiry
+        """
+        self.seed = seed
+        self.prices = dict(prices or {})
+        self.quotes = dict(quotes or {})
+        self.holidays = {dt.date.fromisoformat(day) for day in holidays or []}
+        self.strikes = strikes
+        self.today_fn = today_fn
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "SandboxFixtures":
+        """Load fixtures from a JSON file with optional ``seed``, ``prices``, ``quotes`` and ``holidays``."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        for key in ("seed", "prices", "quotes", "holidays", "strikes"):
+            if key in data:
+                kwargs.setdefault(key, data[key])
+        return cls(**kwargs)
+
+    def _random(self, *key: Any) -> random.Random:
+        return random.Random(":".join(str(part) for part in (self.seed, *key)))
+
+    def stock_price(self, symbol: str) -> float:
+        if symbol in self.prices:
+            return float(self.prices[symbol])
+        return round(self._random("price", symbol).uniform(20, 500), 2)
+
+    def volatility(self, underlying: str) -> float:
+        return round(self._random("vol", underlying).uniform(0.2, 0.6), 4)
+
+    @staticmethod
+    def strike_step(price: float) -> float:
+        if price < 25:
+            return 0.5
+        if price < 100:
+            return 1.0
+        if price < 250:
+            return 2.5
+        return 5.0
+
+    def expirations(self, count: int = 8) -> List[dt.date]:
+        """The next ``count`` weekly (Friday) expirations."""
+        today = self.today_fn()
+        friday = today + dt.timedelta(days=(4 - today.weekday()) % 7)
+        return [friday + dt.timedelta(weeks=week) for week in range(count)]
+
+    def contracts(
+        self, underlying: str, expiration: Optional[dt.date] = None, option_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Option contracts listed around the stock price, in the shape of ``/options/contracts``."""
+        price = self.stock_price(underlying)
+        step = self.strike_step(price)
+        center = round(price / step) * step
+        contracts = []
+        for expiry in [expiration] if expiration else self.expirations():
+            for kind in [option_type] if option_type else ["call", "put"]:
+                for offset in range(-self.strikes, self.strikes + 1):
+                    strike = center + offset * step
+                    if strike <= 0:
+                        continue
+                    symbol = option_symbol(underlying, expiry, kind, strike)
+                    contracts.append({
+                        "id": str(uuid.uuid5(ID_NAMESPACE, symbol)),
+                        "symbol": symbol,
+                        "name": f"{underlying} {expiry:%b %d %Y} {strike:g} {kind.title()}",
+                        "status": "active",
+                        "tradable": True,
+                        "expiration_date": expiry.isoformat(),
+                        "root_symbol": underlying,
+                        "underlying_symbol": underlying,
+                        "type": kind,
+                        "style": "american",
+                        "strike_price": f"{strike:g}",
+                        "size": "100",
+                        "open_interest": str(self._random("oi", symbol).randint(0, 5000)),
+                    })
+        return contracts
+
+    def option_quote(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Bid and ask of an option contract, or None if the symbol is not an OCC symbol."""
+        if symbol in self.quotes:
+            return {"bid": float(self.quotes[symbol]["bid"]), "ask": float(self.quotes[symbol]["ask"])}
+        match = OCC_SYMBOL.match(symbol)
+        if match is None:
+            return None
+        underlying = match["root"]
+        expiry = dt.datetime.strptime(match["expiry"], "%y%m%d").date()
+        strike = int(match["strike"]) / 1000
+        price = self.stock_price(underlying)
+        years = max((expiry - self.today_fn()).days, 1) / 365
+        sigma = self.volatility(underlying)
+        d1 = (math.log(price / strike) + 0.5 * sigma ** 2 * years) / (sigma * math.sqrt(years))
+        d2 = d1 - sigma * math.sqrt(years)
+        if match["type"] == "C":
+            value = price * _norm_cdf(d1) - strike * _norm_cdf(d2)
+        else:
+            value = strike * _norm_cdf(-d2) - price * _norm_cdf(-d1)
+        mid = max(value, 0.01)
+        half_spread = max(0.01, round(mid * 0.02, 2))
+        return {"bid": round(max(mid - half_spread, 0.0), 2), "ask": round(mid + half_spread, 2)}
+
+    def calendar(self, start: dt.date, end: dt.date) -> List[Dict[str, str]]:
+        """Weekday sessions between two dates, skipping holidays, in the shape of ``/calendar``."""
+        sessions = []
+        for offset in range((end - start).days + 1):
+            day = start + dt.timedelta(days=offset)
+            if day.weekday() < 5 and day not in self.holidays:
+                sessions.append({"date": day.isoformat(), "open": "09:30", "close": "16:00"})
+        return sessions
+
+
+class FaultProfile:
+    """
+    Latency and failures injected into every request.
+
+    Decisions come from a seeded generator, so a load test sees the same
+    sequence of delays and failures on every run (for a given request order).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        requests_per_minute: Optional[int] = None,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            latency: Seconds added to every response
+            jitter: Up to this many seconds added on top of ``latency``, uniformly
+            error_rate: Fraction of requests answered with a 500
+            rate_limit_rate: Fraction of requests answered with a 429
+            requests_per_minute: Requests allowed per rolling minute before
+                further ones get a 429, like Alpaca's account rate limit
+            seed: Seed of the fault generator
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_minute = requests_per_minute
+        self._random = random.Random(seed)
+        self._window: List[float] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any]) -> "FaultProfile":
+        return cls(
+            latency=settings.get("latency", 0.0),
+            jitter=settings.get("jitter", 0.0),
+            error_rate=settings.get("error_rate", 0.0),
+            rate_limit_rate=settings.get("rate_limit_rate", 0.0),
+            requests_per_minute=settings.get("requests_per_minute"),
+            seed=settings.get("seed", 0),
+        )
+
+    def decide(self) -> Tuple[float, Optional[int], int]:
+        """
+        Fault for the next request.
+
+        Returns:
+            Tuple of (delay in seconds, status to fail with or None, requests left in the window)
+        """
+        now = time.monotonic()
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+            remaining = -1
+            if self.requests_per_minute is not None:
+                self._window = [t for t in self._window if now - t < 60]
+                remaining = self.requests_per_minute - len(self._window)
+                if remaining <= 0:
+                    return delay, 429, 0
+                self._window.append(now)
+                remaining -= 1
+        if roll < self.rate_limit_rate:
+            return delay, 429, remaining
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500, remaining
+        return delay, None, remaining
+
+
+class SandboxError(Exception):
+    """An API error response: HTTP status and Alpaca error body."""
+
+    def __init__(self, status: int, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code or status * 100000, "message": message}
+
+
+class AlpacaSandboxServer:
+    """
+    Local HTTP stand-in for the Alpaca trading and market data APIs.
+
+    Serves the endpoints the bot uses (option contracts, stock trades, option
+    quotes, orders including ``orders:by_client_order_id``, positions, the
+    calendar and fill activities) from ``SandboxFixtures``, with an in-memory
+    order book behind them. Limit orders fill as soon as their price reaches
+    the spread's mid plus ``fill_at`` of the way to the natural price, and
+    fill at that price, so order walking can be exercised. Every request goes through a
+    ``FaultProfile`` first.
+
+    Point both ``base_url`` and ``data_url`` at ``url``; the version prefix
+    (``/v2``, ``/v1beta1``) is ignored.
+    """
+
+    def __init__(
+        self,
+        fixtures: Optional[SandboxFixtures] = None,
+        faults: Optional[FaultProfile] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        api_key: Optional[str] = None,
+        fill_at: float = 0.0,
+        fill_delay: float = 0.0,
+        trade_updates=None,
+        clock: Callable[[], dt.datetime] = lambda: dt.datetime.now(dt.timezone.utc),
+    ):
+        """
+        Args:
+            fixtures: Market data served; defaults to seed 0
+            faults: Latency and failures injected; defaults to none
+            host: Interface to bind
+            port: Port to bind; 0 picks a free port
+            api_key: If given, requests with another ``APCA-API-KEY-ID`` are rejected
+            fill_at: Fraction of the way from mid to natural price a limit
+                order must reach to fill (0 fills at mid)
+            fill_delay: Seconds an order stays working before it may fill
+            trade_updates: Optional TradeUpdateServer order events are published to
+            clock: Current time, used for order and fill timestamps
+        """
+        self.fixtures = fixtures or SandboxFixtures()
+        self.faults = faults or FaultProfile()
+        self.host = host
+        self.port = port
+        self.api_key = api_key
+        self.fill_at = fill_at
+        self.fill_delay = fill_delay
+        self.trade_updates = trade_updates
+        self.clock = clock
+        self.request_counts: Dict[str, int] = {}
+        self.max_concurrency = 0
+        self._active = 0
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._by_client_id: Dict[str, str] = {}
+        self._submitted: Dict[str, float] = {}
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        self._activities: List[Dict[str, Any]] = []
+        self._sequence = 0
+        self._last_timestamp: Optional[dt.datetime] = None
+        self._lock = threading.RLock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._routes = [
+            ("GET", re.compile(r"^/stocks/trades/latest$"), self._latest_trades),
+            ("GET", re.compile(r"^/options/quotes/latest$"), self._latest_quotes),
+            ("GET", re.compile(r"^/options/contracts$"), self._contracts),
+            ("GET", re.compile(r"^/calendar$"), self._calendar),
+            ("GET", re.compile(r"^/orders:by_client_order_id$"), self._order_by_client_id),
+            ("GET", re.compile(r"^/orders$"), self._list_orders),
+            ("POST", re.compile(r"^/orders$"), self._submit_order),
+            ("GET", re.compile(r"^/orders/(?P<order_id>[^/]+)$"), self._get_order),
+            ("PATCH", re.compile(r"^/orders/(?P<order_id>[^/]+)$"), self._replace_order),
+            ("DELETE", re.compile(r"^/orders/(?P<order_id>[^/]+)$"), self._cancel_order),
+            ("GET", re.compile(r"^/positions$"), self._list_positions),
+            ("GET", re.compile(r"^/positions/(?P<symbol>[^/]+)$"), self._get_position),
+            ("DELETE", re.compile(r"^/positions/(?P<symbol>[^/]+)$"), self._close_position),
+            ("GET", re.compile(r"^/account/activities/FILL$"), self._fill_activities),
+        ]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="AlpacaSandboxServer", daemon=True)
+        self._thread.start()
+        logger.info("Alpaca sandbox server listening on %s", self.url)
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        if self._thread:
+            self._thread.join(5)
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        logger.info("Alpaca sandbox server listening on %s", self.url)
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def orders(self) -> List[Dict[str, Any]]:
+        """Every order placed, in submission order."""
+        with self._lock:
+            return [json.loads(json.dumps(order)) for order in self._orders.values()]
+
+    def positions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(position) for position in self._positions.values()]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._dispatch(self, "GET")
+
+            def do_POST(self):
+                server._dispatch(self, "POST")
+
+            def do_PATCH(self):
+                server._dispatch(self, "PATCH")
+
+            def do_DELETE(self):
+                server._dispatch(self, "DELETE")
+
+            def log_message(self, format, *args):
+                logger.debug("Sandbox %s", format % args)
+
+        return Handler
+
+    # Request handling
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        with self._lock:
+            self._active += 1
+            self.max_concurrency = max(self.max_concurrency, self._active)
+        try:
+            parts = urlsplit(request.path)
+            path = re.sub(r"^/v[^/]*", "", re.sub(r"/+", "/", parts.path)) or "/"
+            query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+            length = int(request.headers.get("Content-Length") or 0)
+            raw = request.rfile.read(length) if length else b""
+            status, body, headers = self._respond(request, method, path, query, raw)
+            with self._lock:
+                label = f"{normalize_endpoint(method, path)} {status}"
+                self.request_counts[label] = self.request_counts.get(label, 0) + 1
+            payload = json.dumps(body).encode() if body is not None else b""
+            request.send_response(status)
+            for name, value in headers.items():
+                request.send_header(name, value)
+            if payload:
+                request.send_header("Content-Type", "application/json")
+            request.send_header("Content-Length", str(len(payload)))
+            request.end_headers()
+            request.wfile.write(payload)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _respond(
+        self, request: BaseHTTPRequestHandler, method: str, path: str, query: Dict[str, str], raw: bytes
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        if self.api_key and request.headers.get("APCA-API-KEY-ID") != self.api_key:
+            return 401, {"code": 40110000, "message": "request is not authorized"}, {}
+        delay, failure, remaining = self.faults.decide()
+        if delay:
+            time.sleep(delay)
+        headers = {}
+        if self.faults.requests_per_minute is not None:
+            headers["X-RateLimit-Limit"] = str(self.faults.requests_per_minute)
+            headers["X-RateLimit-Remaining"] = str(max(remaining, 0))
+        if failure == 429:
+            return 429, {"code": 42910000, "message": "rate limit exceeded"}, {**headers, "Retry-After": "1"}
+        if failure is not None:
+            return failure, {"code": 50010000, "message": "internal server error"}, headers
+
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if route_method != method or match is None:
+                continue
+            try:
+                payload = json.loads(raw) if raw else {}
+            except ValueError:
+                return 400, {"code": 40010000, "message": "request body is not valid JSON"}, headers
+            try:
+                status, body = handler(query=query, payload=payload, **match.groupdict())
+            except SandboxError as e:
+                return e.status, e.body, headers
+            return status, body, headers
+        return 404, {"code": 40410000, "message": "endpoint not found"}, headers
+
+    # Market data
+
+    def _latest_trades(self, query, payload) -> Tuple[int, Any]:
+        symbols = [symbol for symbol in query.get("symbols", "").split(",") if symbol]
+        timestamp = self.clock().isoformat()
+        return 200, {
+            "trades": {
+                symbol: {"t": timestamp, "p": self.fixtures.stock_price(symbol), "s": 100, "x": "V"}
+                for symbol in symbols
+            }
+        }
+
+    def _latest_quotes(self, query, payload) -> Tuple[int, Any]:
+        timestamp = self.clock().isoformat()
+        quotes = {}
+        for symbol in query.get("symbols", "").split(","):
+            quote = self.fixtures.option_quote(symbol) if symbol else None
+            if quote is not None:
+                quotes[symbol] = {
+                    "t": timestamp, "bp": quote["bid"], "ap": quote["ask"], "bs": 10, "as": 10,
+                    # The bot reads the long names
+                    "bid": quote["bid"], "ask": quote["ask"],
+                }
+        return 200, {"quotes": quotes}
+
+    def _contracts(self, query, payload) -> Tuple[int, Any]:
+        expiration = query.get("expiration_date")
+        contracts = []
+        for underlying in query.get("underlying_symbols", "").split(","):
+            if underlying:
+                contracts.extend(self.fixtures.contracts(
+                    underlying, dt.date.fromisoformat(expiration) if expiration else None, query.get("type")
+                ))
+        return 200, {"option_contracts": contracts, "next_page_token": None}
+
+    def _calendar(self, query, payload) -> Tuple[int, Any]:
+        today = self.fixtures.today_fn()
+        start = dt.date.fromisoformat(query["start"]) if "start" in query else today
+        end = dt.date.fromisoformat(query["end"]) if "end" in query else today + dt.timedelta(days=30)
+        return 200, self.fixtures.calendar(start, end)
+
+    # Orders
+
+    def _next_id(self) -> str:
+        self._sequence += 1
+        return str(uuid.uuid5(ID_NAMESPACE, f"{self.fixtures.seed}:{self._sequence}"))
+
+    def _timestamp(self) -> str:
+        # Strictly increasing, so paging by submitted_at never skips an order
+        now = self.clock()
+        if self._last_timestamp is not None and now <= self._last_timestamp:
+            now = self._last_timestamp + dt.timedelta(microseconds=1)
+        self._last_timestamp = now
+        return now.isoformat()
+
+    def _order_view(self, order: Dict[str, Any], nested: bool = True) -> Dict[str, Any]:
+        view = json.loads(json.dumps(order))
+        if not nested:
+            view["legs"] = None
+        return view
+
+    def _find_order(self, order_id: str) -> Dict[str, Any]:
+        order = self._orders.get(order_id)
+        if order is None:
+            raise SandboxError(404, "order not found", 40410000)
+        return order
+
+    def _submit_order(self, query, payload) -> Tuple[int, Any]:
+        with self._lock:
+            client_id = payload.get("client_order_id") or self._next_id()
+            if client_id in self._by_client_id:
+                raise SandboxError(422, "client_order_id must be unique", 40010001)
+            order = self._new_order(payload, client_id)
+            self._try_fill(order)
+            return 200, self._order_view(order)
+
+    def _new_order(self, payload: Dict[str, Any], client_id: str, replaces: Optional[str] = None) -> Dict[str, Any]:
+        qty = payload.get("qty")
+        if not qty or float(qty) <= 0:
+            raise SandboxError(422, "qty must be > 0", 40010001)
+        legs = payload.get("legs") or []
+        if not legs and not payload.get("symbol"):
+            raise SandboxError(422, "symbol is required", 40010001)
+        timestamp = self._timestamp()
+        order_id = self._next_id()
+        order = {
+            "id": order_id,
+            "client_order_id": client_id,
+            "created_at": timestamp,
+            "updated_at": timestamp,
+            "submitted_at": timestamp,
+            "filled_at": None,
+            "canceled_at": None,
+            "replaced_at": None,
+            "replaced_by": None,
+            "replaces": replaces,
+            "symbol": payload.get("symbol", ""),
+            "asset_class": "us_option",
+            "qty": str(qty),
+            "filled_qty": "0",
+            "filled_avg_price": None,
+            "order_class": payload.get("order_class", "simple"),
+            "type": payload.get("type", "market"),
+            "side": payload.get("side", ""),
+            "time_in_force": payload.get("time_in_force", "day"),
+            "limit_price": payload.get("limit_price"),
+            "status": "new",
+            "legs": [
+                {
+                    "id": self._next_id(),
+                    "client_order_id": self._next_id(),
+                    "symbol": leg["symbol"],
+                    "side": leg["side"],
+                    "position_intent": leg.get("position_intent"),
+                    "ratio_qty": str(leg.get("ratio_qty", 1)),
+                    "qty": str(qty),
+                    "filled_qty": "0",
+                    "filled_avg_price": None,
+                    "status": "new",
+                }
+                for leg in legs
+            ] or None,
+        }
+        self._orders[order_id] = order
+        self._by_client_id[client_id] = order_id
+        self._submitted[order_id] = time.monotonic()
+        self._publish("new", order)
+        return order
+
+    def _legs(self, order: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return order["legs"] or [order]
+
+    def _leg_prices(self, order: Dict[str, Any]) -> List[Tuple[float, float]]:
+        """(mid, natural) price of each leg, signed so a debit is positive."""
+        prices = []
+        for leg in self._legs(order):
+            quote = self.fixtures.option_quote(leg["symbol"])
+            if quote is None:
+                price = self.fixtures.stock_price(leg["symbol"])
+                quote = {"bid": price, "ask": price}
+            sign = 1 if leg["side"] == "buy" else -1
+            mid = (quote["bid"] + quote["ask"]) / 2
+            natural = quote["ask"] if leg["side"] == "buy" else quote["bid"]
+            prices.append((sign * mid, sign * natural))
+        return prices
+
+    def _try_fill(self, order: Dict[str, Any]) -> None:
+        """Fill a working order whose limit price reaches the fill threshold. Caller holds the lock."""
+        if order["status"] in CLOSED_STATUSES:
+            return
+        if order["type"] == "limit" and time.monotonic() - self._submitted[order["id"]] < self.fill_delay:
+            return
+        # Each leg fills fill_at of the way from its mid to its natural price
+        leg_prices = [mid + self.fill_at * (natural - mid) for mid, natural in self._leg_prices(order)]
+        price = sum(leg_prices)
+        if order["type"] == "limit" and float(order["limit_price"]) < price - 1e-9:
+            return
+        timestamp = self._timestamp()
+        for leg, leg_price in zip(self._legs(order), leg_prices):
+            leg_price = abs(leg_price)
+            leg_qty = float(order["qty"]) * float(leg.get("ratio_qty") or 1)
+            leg.update(status="filled", filled_qty=order["qty"], filled_avg_price=f"{leg_price:.4f}")
+            self._record_fill(leg, leg_qty, leg_price, timestamp)
+        order.update(
+            status="filled",
+            filled_qty=order["qty"],
+            filled_avg_price=f"{price:.4f}",
+            filled_at=timestamp,
+            updated_at=timestamp,
+        )
+        self._publish("fill", order)
+
+    def _record_fill(self, leg: Dict[str, Any], qty: float, price: float, timestamp: str) -> None:
+        """Update the position and activity log with a leg's fill. Caller holds the lock."""
+        symbol = leg["symbol"]
+        signed = qty if leg["side"] == "buy" else -qty
+        position = self._positions.get(symbol, {"symbol": symbol, "qty": "0", "avg_entry_price": "0"})
+        held = float(position["qty"])
+        new_qty = held + signed
+        if new_qty == 0:
+            self._positions.pop(symbol, None)
+        else:
+            if held == 0 or (held > 0) != (new_qty > 0):
+                entry = price
+            elif abs(new_qty) > abs(held):
+                entry = (abs(held) * float(position["avg_entry_price"]) + qty * price) / abs(new_qty)
+            else:
+                entry = float(position["avg_entry_price"])
+            self._positions[symbol] = {
+                "symbol": symbol,
+                "asset_class": "us_option",
+                "qty": f"{new_qty:g}",
+                "side": "long" if new_qty > 0 else "short",
+                "avg_entry_price": f"{entry:.4f}",
+            }
+        self._activities.append({
+            "id": f"{timestamp}::{self._next_id()}",
+            "activity_type": "FILL",
+            "type": "fill",
+            "order_id": leg["id"],
+            "symbol": symbol,
+            "side": leg["side"],
+            "qty": f"{qty:g}",
+            "cum_qty": f"{qty:g}",
+            "leaves_qty": "0",
+            "price": f"{price:.4f}",
+            "transaction_time": timestamp,
+        })
+
+    def _publish(self, event: str, order: Dict[str, Any]) -> None:
+        if self.trade_updates is not None:
+            self.trade_updates.publish(
+                {"event": event, "order": self._order_view(order), "timestamp": order["updated_at"]}
+            )
+
+    def _get_order(self, query, payload, order_id) -> Tuple[int, Any]:
+        with self._lock:
+            order = self._find_order(order_id)
+            self._try_fill(order)
+            return 200, self._order_view(order, query.get("nested", "true") == "true")
+
+    def _order_by_client_id(self, query, payload) -> Tuple[int, Any]:
+        with self._lock:
+            order_id = self._by_client_id.get(query.get("client_order_id", ""))
+            if order_id is None:
+                raise SandboxError(404, "order not found", 40410000)
+            order = self._orders[order_id]
+            self._try_fill(order)
+            return 200, self._order_view(order)
+
+    def _list_orders(self, query, payload) -> Tuple[int, Any]:
+        status = query.get("status", "open")
+        after = dt.datetime.fromisoformat(query["after"]) if "after" in query else None
+        until = dt.datetime.fromisoformat(query["until"]) if "until" in query else None
+        limit = min(int(query.get("limit", 50)), 500)
+        nested = query.get("nested", "false") == "true"
+        with self._lock:
+            for order in self._orders.values():
+                self._try_fill(order)
+            orders = []
+            for order in self._orders.values():
+                submitted = dt.datetime.fromisoformat(order["submitted_at"])
+                if after is not None and submitted <= after or until is not None and submitted >= until:
+                    continue
+                closed = order["status"] in CLOSED_STATUSES
+                if status == "open" and closed or status == "closed" and not closed:
+                    continue
+                orders.append(order)
+            if query.get("direction", "desc") == "desc":
+                orders.reverse()
+            return 200, [self._order_view(order, nested) for order in orders[:limit]]
+
+    def _replace_order(self, query, payload, order_id) -> Tuple[int, Any]:
+        with self._lock:
+            order = self._find_order(order_id)
+            self._try_fill(order)
+            if order["status"] in CLOSED_STATUSES:
+                raise SandboxError(422, f"order is {order['status']}, not replaceable", 42210000)
+            replacement = self._new_order({
+                **order,
+                "legs": order["legs"],
+                "qty": payload.get("qty", order["qty"]),
+                "limit_price": payload.get("limit_price", order["limit_price"]),
+                "time_in_force": payload.get("time_in_force", order["time_in_force"]),
+            }, payload.get("client_order_id") or self._next_id(), replaces=order_id)
+            timestamp = self._timestamp()
+            order.update(status="replaced", replaced_by=replacement["id"], replaced_at=timestamp, updated_at=timestamp)
+            self._publish("replaced", order)
+            self._try_fill(replacement)
+            return 200, self._order_view(replacement)
+
+    def _cancel_order(self, query, payload, order_id) -> Tuple[int, Any]:
+        with self._lock:
+            order = self._find_order(order_id)
+            if order["status"] in CLOSED_STATUSES:
+                raise SandboxError(422, f"order is {order['status']}, not cancelable", 42210000)
+            timestamp = self._timestamp()
+            order.update(status="canceled", canceled_at=timestamp, updated_at=timestamp)
+            for leg in order["legs"] or []:
+                leg["status"] = "canceled"
+            self._publish("canceled", order)
+            # Like Alpaca: accepted with no content
+            return 204, None
+
+    # Positions and activities
+
+    def _with_market_value(self, position: Dict[str, Any]) -> Dict[str, Any]:
+        quote = self.fixtures.option_quote(position["symbol"])
+        if quote is None:
+            return dict(position)
+        current = (quote["bid"] + quote["ask"]) / 2
+        qty = float(position["qty"])
+        return {
+            **position,
+            "current_price": f"{current:.4f}",
+            "market_value": f"{current * qty * 100:.2f}",
+            "unrealized_pl": f"{(current - float(position['avg_entry_price'])) * qty * 100:.2f}",
+        }
+
+    def _list_positions(self, query, payload) -> Tuple[int, Any]:
+        with self._lock:
+            return 200, [self._with_market_value(position) for position in self._positions.values()]
+
+    def _get_position(self, query, payload, symbol) -> Tuple[int, Any]:
+        with self._lock:
+            if symbol not in self._positions:
+                raise SandboxError(404, "position does not exist", 40410000)
+            return 200, self._with_market_value(self._positions[symbol])
+
+    def _close_position(self, query, payload, symbol) -> Tuple[int, Any]:
+        with self._lock:
+            position = self._positions.get(symbol)
+            if position is None:
+                raise SandboxError(404, "position does not exist", 40410000)
+            qty = abs(float(position["qty"]))
+            order = self._new_order({
+                "symbol": symbol,
+                "qty": f"{qty:g}",
+                "side": "sell" if float(position["qty"]) > 0 else "buy",
+                "type": "market",
+                "time_in_force": "day",
+            }, self._next_id())
+            self._try_fill(order)
+            return 200, self._order_view(order)
+
+    def _fill_activities(self, query, payload) -> Tuple[int, Any]:
+        after = dt.datetime.fromisoformat(query["after"]) if "after" in query else None
+        until = dt.datetime.fromisoformat(query["until"]) if "until" in query else None
+        page_size = min(int(query.get("page_size", 100)), 100)
+        with self._lock:
+            activities = [
+                activity for activity in self._activities
+                if (after is None or dt.datetime.fromisoformat(activity["transaction_time"]) > after)
+                and (until is None or dt.datetime.fromisoformat(activity["transaction_time"]) < until)
+            ]
+        if query.get("direction", "desc") == "desc":
+            activities.reverse()
+        token = query.get("page_token")
+        if token:
+            ids = [activity["id"] for activity in activities]
+            activities = activities[ids.index(token) + 1:] if token in ids else []
+        return 200, activities[:page_size]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Alpaca trading and data APIs.")
+    parser.add_argument("--fixtures", help="JSON file of fixture prices, quotes and holidays")
+    parser.add_argument("--seed", type=int, help="Seed of the generated data and faults (default 0)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--requests-per-minute", type=int, help="Rolling per-minute request limit")
+    parser.add_argument("--fill-at", type=float, default=0.0, help="Fill threshold between mid (0) and natural (1)")
+    parser.add_argument("--fill-delay", type=float, default=0.0, help="Seconds before an order may fill")
+    args = parser.parse_args()
+
+    seed = {"seed": args.seed} if args.seed is not None else {}
+    fixtures = SandboxFixtures.from_file(args.fixtures, **seed) if args.fixtures else SandboxFixtures(**seed)
+    faults = FaultProfile(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        requests_per_minute=args.requests_per_minute,
+        seed=fixtures.seed,
+    )
+    server = AlpacaSandboxServer(
+        fixtures, faults, host=args.host, port=args.port, fill_at=args.fill_at, fill_delay=args.fill_delay
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
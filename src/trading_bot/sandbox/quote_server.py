@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import msgpack
+import websockets
+
+logger = logging.getLogger("trading_bot")
+
+
+class QuoteReplayServer:
+    """
+    Local stand-in for Alpaca's market-data quote stream.
+
+    Speaks the same connect/auth/subscribe handshake as the real feed and then
+    replays recorded quote messages (``{"T": "q", "S": ..., "bp": ..., "ap": ...}``)
+    for the symbols each client has subscribed to.
+    """
+
+    def __init__(
+        self,
+        quotes: List[Dict[str, Any]],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        interval: float = 0.0,
+        api_key: Optional[str] = None,
+        repeat: bool = False,
+    ):
+        """
+        Args:
+            quotes: Recorded quote messages, replayed in order
+            host: Interface to bind
+            port: Port to bind; 0 picks a free port
+            interval: Seconds to wait between replayed quotes
+            api_key: If given, clients authenticating with another key are rejected
+            repeat: Replay the recording in a loop instead of once
+        """
+        self.quotes = quotes
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.api_key = api_key
+        self.repeat = repeat
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "QuoteReplayServer":
+        """Create a server replaying a JSONL recording, e.g. one written by QuoteStream."""
+        with open(path, "r") as f:
+            quotes = [json.loads(line) for line in f if line.strip()]
+        return cls(quotes, **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread and wait until it is listening."""
+        self._thread = threading.Thread(target=self.serve_forever, name="QuoteReplayServer", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread:
+            self._thread.join(5)
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until stopped."""
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._serve())
+        self._loop.close()
+
+    async def _serve(self) -> None:
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        logger.info("Quote replay server listening on %s", self.url)
+        await self._server.wait_closed()
+
+    @staticmethod
+    def _decode(raw) -> Dict[str, Any]:
+        return msgpack.unpackb(raw) if isinstance(raw, bytes) else json.loads(raw)
+
+    async def _handler(self, ws, path: Optional[str] = None) -> None:
+        await ws.send(json.dumps([{"T": "success", "msg": "connected"}]))
+        auth = self._decode(await ws.recv())
+        if auth.get("action") != "auth" or (self.api_key and auth.get("key") != self.api_key):
+            await ws.send(json.dumps([{"T": "error", "code": 402, "msg": "auth failed"}]))
+            await ws.close()
+            return
+        await ws.send(json.dumps([{"T": "success", "msg": "authenticated"}]))
+
+        subscribed = set()
+        first_subscription = asyncio.Event()
+        replay = asyncio.ensure_future(self._replay(ws, subscribed, first_subscription))
+        try:
+            async for raw in ws:
+                message = self._decode(raw)
+                symbols = message.get("quotes", [])
+                if message.get("action") == "subscribe":
+                    subscribed.update(symbols)
+                    first_subscription.set()
+                elif message.get("action") == "unsubscribe":
+                    subscribed.difference_update(symbols)
+                await ws.send(json.dumps([{"T": "subscription", "quotes": sorted(subscribed)}]))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            replay.cancel()
+
+    async def _replay(self, ws, subscribed: set, first_subscription: asyncio.Event) -> None:
+        await first_subscription.wait()
+        while True:
+            for quote in self.quotes:
+                if quote.get("S") in subscribed:
+                    await ws.send(json.dumps([quote]))
+                    if self.interval:
+                        await asyncio.sleep(self.interval)
+            if not self.repeat:
+                return
+            await asyncio.sleep(self.interval or 0.1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded quotes as a local Alpaca quote stream.")
+    parser.add_argument("recording", help="JSONL file of recorded quote messages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--repeat", action="store_true")
+    args = parser.parse_args()
+
+    server = QuoteReplayServer.from_file(
+        args.recording, host=args.host, port=args.port, interval=args.interval, repeat=args.repeat
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+import websockets
+
+logger = logging.getLogger("trading_bot")
+
+
+class TradeUpdateServer:
+    """
+    Local stand-in for Alpaca's trading stream (``trade_updates``).
+
+    Speaks the same auth/listen handshake as the real stream, replays the
+    given updates to every client once it listens, and pushes updates passed
+    to ``publish`` to all listening clients. Like the real stream, messages
+    are sent as JSON in binary frames.
+    """
+
+    def __init__(
+        self,
+        updates: Optional[List[Dict[str, Any]]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        interval: float = 0.0,
+        api_key: Optional[str] = None,
+    ):
+        """
+        Args:
+            updates: Trade update ``data`` payloads replayed to each new listener
+            host: Interface to bind
+            port: Port to bind; 0 picks a free port
+            interval: Seconds to wait between replayed updates
+            api_key: If given, clients authenticating with another key are rejected
+        """
+        self.updates = updates or []
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.api_key = api_key
+        self._listeners: Set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "TradeUpdateServer":
+        """Create a server replaying a JSONL file of trade update payloads."""
+        with open(path, "r") as f:
+            updates = [json.loads(line) for line in f if line.strip()]
+        return cls(updates, **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    @property
+    def listeners(self) -> int:
+        """Number of clients listening to trade updates."""
+        return len(self._listeners)
+
+    def start(self) -> None:
+        """Start serving in a background thread and wait until it is listening."""
+        self._thread = threading.Thread(target=self.serve_forever, name="TradeUpdateServer", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self) -> None:
+        """Stop the server; stopping it again is a no-op."""
+        if self._loop and self._server and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread:
+            self._thread.join(5)
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until stopped."""
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._serve())
+        self._loop.close()
+
+    def publish(self, update: Dict[str, Any]) -> None:
+        """Send a trade update to every listening client, from any thread."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._broadcast(update), self._loop).result(5)
+
+    def fill(self, order: Dict[str, Any], event: str = "fill") -> None:
+        """Publish a fill (or ``partial_fill``) of an order carrying its cumulative ``filled_qty``."""
+        self.publish({"event": event, "order": order, "timestamp": order.get("filled_at")})
+
+    async def _serve(self) -> None:
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        logger.info("Trade update server listening on %s", self.url)
+        await self._server.wait_closed()
+
+    @staticmethod
+    def _message(stream: str, data: Dict[str, Any]) -> bytes:
+        return json.dumps({"stream": stream, "data": data}).encode()
+
+    async def _broadcast(self, update: Dict[str, Any]) -> None:
+        message = self._message("trade_updates", update)
+        for ws in list(self._listeners):
+            try:
+                await ws.send(message)
+            except websockets.ConnectionClosed:
+                self._listeners.discard(ws)
+
+    async def _handler(self, ws, path: Optional[str] = None) -> None:
+        raw = await ws.recv()
+        auth = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
+        if auth.get("action") != "auth" or (self.api_key and auth.get("key") != self.api_key):
+            await ws.send(self._message("authorization", {"action": "authenticate", "status": "unauthorized"}))
+            await ws.close()
+            return
+        await ws.send(self._message("authorization", {"action": "authenticate", "status": "authorized"}))
+        try:
+            async for raw in ws:
+                message = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
+                if message.get("action") != "listen":
+                    continue
+                streams = message.get("data", {}).get("streams", [])
+                await ws.send(self._message("listening", {"streams": streams}))
+                if "trade_updates" in streams and ws not in self._listeners:
+                    self._listeners.add(ws)
+                    for update in self.updates:
+                        await ws.send(self._message("trade_updates", update))
+                        if self.interval:
+                            await asyncio.sleep(self.interval)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._listeners.discard(ws)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve recorded trade updates as a local Alpaca trading stream.")
+    parser.add_argument("recording", nargs="?", help="JSONL file of trade update payloads")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    kwargs = {"host": args.host, "port": args.port, "interval": args.interval}
+    server = TradeUpdateServer.from_file(args.recording, **kwargs) if args.recording else TradeUpdateServer(**kwargs)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
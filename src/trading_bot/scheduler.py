@@ -0,0 +1,210 @@
+import datetime as dt
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import pytz
+
+from trading_bot.logging_config import log_context
+from trading_bot.metrics import PIPELINE_STAGE_SECONDS
+
+logger = logging.getLogger("trading_bot")
+
+eastern = pytz.timezone("America/New_York")
+
+NextRun = Callable[[dt.datetime], Optional[dt.datetime]]
+
+
+class Job:
+    """A named, recurring job whose next wall-clock run time comes from ``next_run``."""
+
+    def __init__(self, name: str, func: Callable[[], None], next_run: NextRun):
+        self.name = name
+        self.func = func
+        self.next_run = next_run
+        self.run_at: Optional[dt.datetime] = None
+        self.running = False
+        self.last_run: Optional[dt.datetime] = None
+
+
+class Scheduler:
+    """
+    Priority-queue scheduler for timed jobs on the monotonic clock.
+
+    Jobs are kept in a heap ordered by monotonic deadline and run on a worker
+    pool, so the scheduler thread never blocks on job work. Each job's
+    wall-clock target is kept as well: the scheduler wakes at least every
+    ``resync_interval`` seconds and, if the wall clock has drifted from the
+    monotonic clock (e.g. after a suspend or NTP step), recomputes all
+    deadlines from the wall-clock targets. ``resync`` additionally asks every
+    job for a fresh run time, e.g. after the market calendar changed.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        resync_interval: float = 60.0,
+        drift_tolerance: float = 1.0,
+        now_fn: Callable[[], dt.datetime] = lambda: dt.datetime.now(eastern),
+    ):
+        self.resync_interval = resync_interval
+        self.drift_tolerance = drift_tolerance
+        self.now_fn = now_fn
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self._stopped = False
+        self.running = False
+        self._anchor_wall, self._anchor_mono = self.now_fn(), time.monotonic()
+
+    def schedule(self, name: str, func: Callable[[], None], next_run: NextRun) -> Optional[dt.datetime]:
+        """
+        Add a recurring job.
+
+        Args:
+            name: Unique job name; an existing job with the same name is replaced
+            func: Callable run on the worker pool
+            next_run: Returns the job's next run time strictly after the given
+                wall-clock time, or None to stop scheduling it
+
+        Returns:
+            The job's first run time, or None if it was not scheduled
+        """
+        job = Job(name, func, next_run)
+        with self._cond:
+            self.jobs[name] = job
+            return self._plan(job, self.now_fn())
+
+    def run_once(self, name: str, func: Callable[[], None], at: Optional[dt.datetime] = None) -> None:
+        """
+        Run ``func`` once on the worker pool, at ``at`` or as soon as possible.
+
+        The job is kept until it has run, so a ``resync`` before then does not drop it.
+        """
+        done = threading.Event()
+        target = at or self.now_fn()
+
+        def run() -> None:
+            try:
+                func()
+            finally:
+                done.set()
+
+        self.schedule(name, run, lambda after: None if done.is_set() else max(target, after))
+
+    def cancel(self, name: str) -> None:
+        """Remove a job; a run already in progress is not interrupted."""
+        with self._cond:
+            self.jobs.pop(name, None)
+            self._rebuild()
+
+    def next_runs(self) -> Dict[str, Optional[dt.datetime]]:
+        """Planned wall-clock run time of every job."""
+        with self._cond:
+            return {name: job.run_at for name, job in self.jobs.items()}
+
+    def resync(self) -> None:
+        """Re-plan every idle job from the current wall-clock time."""
+        with self._cond:
+            now = self.now_fn()
+            for job in self.jobs.values():
+                if not job.running:
+                    self._next_run(job, now)
+            self._rebuild()
+
+    def run(self) -> None:
+        """Dispatch due jobs until ``stop`` is called."""
+        logger.info("Scheduler started with jobs: %s", self._describe())
+        self.running = True
+        with self._cond:
+            while not self._stopped:
+                self._check_drift()
+                if not self._heap:
+                    self._cond.wait(self.resync_interval)
+                    continue
+                deadline, _, job = self._heap[0]
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    self._cond.wait(min(timeout, self.resync_interval))
+                    continue
+                heapq.heappop(self._heap)
+                job.running = True
+                self._executor.submit(self._run_job, job)
+        self.running = False
+        self._executor.shutdown(wait=False)
+
+    def stop(self) -> None:
+        """Stop dispatching; jobs already running are allowed to finish."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _run_job(self, job: Job) -> None:
+        cycle = f"{job.name}:{job.run_at:%Y%m%dT%H%M}" if job.run_at else job.name
+        with log_context(cycle=cycle):
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        started = time.monotonic()
+        logger.info("Running scheduled job %s", job.name)
+        try:
+            job.func()
+        except Exception as e:
+            logger.error(f"Scheduled job {job.name} failed: {str(e)}")
+        finally:
+            elapsed = time.monotonic() - started
+            PIPELINE_STAGE_SECONDS.observe(elapsed, stage=f"job:{job.name}")
+            logger.info("Job %s finished in %.2f seconds", job.name, elapsed)
+            with self._cond:
+                job.running = False
+                job.last_run = job.run_at
+                if self.jobs.get(job.name) is job:
+                    # Plan from the later of now and the slot just run, so a job
+                    # finishing early never runs twice for the same slot.
+                    now = self.now_fn()
+                    self._plan(job, max(now, job.run_at) if job.run_at else now)
+                    logger.info("Next run of %s at %s", job.name, job.run_at)
+
+    def _plan(self, job: Job, after: dt.datetime) -> Optional[dt.datetime]:
+        """Compute a job's next run and push it. Caller holds the lock."""
+        if self._next_run(job, after) is not None:
+            self._push(job)
+        return job.run_at
+
+    def _next_run(self, job: Job, after: dt.datetime) -> Optional[dt.datetime]:
+        """Set a job's next run, or None if it cannot be computed. Caller holds the lock."""
+        try:
+            job.run_at = job.next_run(after)
+        except Exception as e:
+            logger.error(f"Could not compute next run of {job.name}: {str(e)}")
+            job.run_at = None
+        return job.run_at
+
+    def _push(self, job: Job) -> None:
+        delay = (job.run_at - self.now_fn()).total_seconds()
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), job))
+        self._cond.notify_all()
+
+    def _rebuild(self) -> None:
+        """Recompute every deadline from the jobs' wall-clock targets. Caller holds the lock."""
+        self._heap = []
+        for job in self.jobs.values():
+            if job.run_at is not None and not job.running:
+                self._push(job)
+        self._anchor_wall, self._anchor_mono = self.now_fn(), time.monotonic()
+
+    def _check_drift(self) -> None:
+        expected = self._anchor_wall + dt.timedelta(seconds=time.monotonic() - self._anchor_mono)
+        drift = (self.now_fn() - expected).total_seconds()
+        if abs(drift) > self.drift_tolerance:
+            logger.warning("Wall clock drifted %.1f seconds from monotonic clock, resyncing schedule", drift)
+            self._rebuild()
+
+    def _describe(self) -> str:
+        return ", ".join(f"{name} at {run_at}" for name, run_at in self.next_runs().items())
@@ -0,0 +1,293 @@
+import argparse
+import ast
+import datetime as dt
+import functools
+import logging
+import math
+import os
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+# pyarrow and pandas take most of a second to import, so they are imported
+# on first use to keep the web process's startup light; column types are
+# named here and resolved to arrow types by schema()
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+logger = logging.getLogger("trading_bot")
+
+DEFAULT_STORE_PATH = os.path.join("data", "spreads")
+
+# Contract fields returned by Alpaca's /options/contracts, flattened per leg
+LEG_FIELDS = [
+    ("id", "string"),
+    ("symbol", "string"),
+    ("name", "string"),
+    ("status", "string"),
+    ("tradable", "bool"),
+    ("expiration_date", "date32"),
+    ("root_symbol", "string"),
+    ("underlying_symbol", "string"),
+    ("underlying_asset_id", "string"),
+    ("type", "string"),
+    ("style", "string"),
+    ("strike_price", "float64"),
+    ("multiplier", "int32"),
+    ("size", "int32"),
+    ("open_interest", "int64"),
+    ("open_interest_date", "date32"),
+    ("close_price", "float64"),
+    ("close_price_date", "date32"),
+    ("ppind", "bool"),
+]
+
+# Scan columns and the DataFrame columns they are read from
+SPREAD_FIELDS = [
+    ("ticker", "string", "Ticker"),
+    ("earnings_datetime", "timestamp", "Earnings DateTime"),
+    ("recommendation", "string", "Recommendation"),
+    ("expected_move", "float64", "Expected Move"),
+    ("avg_volume", "float64", "Avg Volume"),
+    ("rv30", "float64", "RV30"),
+    ("iv30_rv30", "float64", "IV30/RV30"),
+    ("ts_slope", "float64", "TS Slope"),
+]
+
+LEGS = {"short": "Short Leg", "long": "Long Leg"}
+
+
+def _arrow_type(name: str) -> "pa.DataType":
+    import pyarrow as pa
+
+    return pa.timestamp("us", tz="UTC") if name == "timestamp" else pa.type_for_alias(name)
+
+
+@functools.lru_cache(maxsize=None)
+def schema() -> "pa.Schema":
+    """Arrow schema of the store."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [pa.field(name, _arrow_type(type_)) for name, type_, _ in SPREAD_FIELDS]
+        + [pa.field(f"{leg}_{name}", _arrow_type(type_)) for leg in LEGS for name, type_ in LEG_FIELDS]
+        + [pa.field("scan_date", pa.date32())]
+    )
+
+
+def _partitioning() -> "ds.Partitioning":
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([pa.field("scan_date", pa.date32())]), flavor="hive")
+
+
+class SpreadStore:
+    """
+    Columnar store for scanned calendar spread candidates.
+
+    Candidates are written as Parquet, partitioned by scan date (hive layout),
+    with every leg field flattened into typed ``short_*``/``long_*`` columns.
+    Reads go through a lazy pyarrow dataset, so only the requested columns are
+    decoded and date-range filters prune whole partitions.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+
+    def exists(self) -> bool:
+        """Whether anything has been written to the store yet."""
+        return os.path.isdir(self.path) and any(os.scandir(self.path))
+
+    def write(self, candidates: "pd.DataFrame", scan_date: dt.date) -> int:
+        """
+        Append a day's candidates.
+
+        Args:
+            candidates: DataFrame as produced by the trade finder, with leg dicts
+                in the ``Short Leg``/``Long Leg`` columns
+            scan_date: Trading day the candidates were scanned for
+
+        Returns:
+            Number of rows written
+        """
+        if candidates.empty:
+            return 0
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = [flatten_candidate(row, scan_date) for row in candidates.to_dict("records")]
+        table = pa.Table.from_pylist(rows, schema=schema())
+
+        pq.write_to_dataset(
+            table,
+            root_path=self.path,
+            partitioning=_partitioning(),
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        logger.info("Stored %d spread candidates for %s", len(rows), scan_date)
+        return len(rows)
+
+    def dataset(self) -> "ds.Dataset":
+        """The store as a lazy pyarrow dataset."""
+        import pyarrow.dataset as ds
+
+        return ds.dataset(self.path, format="parquet", partitioning=_partitioning(), schema=schema())
+
+    def _filter(self, start: Optional[dt.date], end: Optional[dt.date]):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        expression = None
+        if start is not None:
+            expression = ds.field("scan_date") >= pa.scalar(start, pa.date32())
+        if end is not None:
+            upper = ds.field("scan_date") <= pa.scalar(end, pa.date32())
+            expression = upper if expression is None else expression & upper
+        return expression
+
+    def scan(
+        self,
+        columns: Optional[List[str]] = None,
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+    ) -> "pa.Table":
+        """
+        Read candidates with column projection and a scan-date range.
+
+        Args:
+            columns: Columns to read (all if None)
+            start: First scan date to include
+            end: Last scan date to include
+
+        Returns:
+            Arrow table with the requested columns
+        """
+        if not self.exists():
+            return schema().empty_table().select(columns or schema().names)
+        return self.dataset().to_table(columns=columns, filter=self._filter(start, end))
+
+    def scan_dates(self, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> List[dt.date]:
+        """Scan dates with a partition in the store, in order, read from the directory names."""
+        if not self.exists():
+            return []
+        days = []
+        for entry in os.scandir(self.path):
+            name, _, value = entry.name.partition("=")
+            if not entry.is_dir() or name != "scan_date":
+                continue
+            try:
+                day = dt.date.fromisoformat(value)
+            except ValueError:
+                continue
+            if (start is None or day >= start) and (end is None or day <= end):
+                days.append(day)
+        return sorted(days)
+
+    def iter_batches(
+        self,
+        columns: Optional[List[str]] = None,
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+        sort_by: Optional[str] = None,
+    ) -> Iterator["pa.RecordBatch"]:
+        """
+        Stream candidates batch by batch instead of materializing a table.
+
+        Args:
+            columns: Columns to read (all if None)
+            start: First scan date to include
+            end: Last scan date to include
+            sort_by: If given, partitions are read one at a time in scan-date
+                order and each day's rows are sorted by this column, so only
+                one day is held in memory
+        """
+        if not self.exists():
+            return iter(())
+        if sort_by is None:
+            return self.dataset().to_batches(columns=columns, filter=self._filter(start, end))
+        return self._iter_ordered(columns, start, end, sort_by)
+
+    def _iter_ordered(
+        self, columns: Optional[List[str]], start: Optional[dt.date], end: Optional[dt.date], sort_by: str
+    ) -> Iterator["pa.RecordBatch"]:
+        dataset = self.dataset()
+        for day in self.scan_dates(start, end):
+            table = dataset.to_table(columns=columns, filter=self._filter(day, day))
+            yield from table.sort_by(sort_by).to_batches()
+
+    def read(self, columns: Optional[List[str]] = None, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> "pd.DataFrame":
+        """Like ``scan`` but returns a DataFrame."""
+        return self.scan(columns, start, end).to_pandas()
+
+    def import_csv(self, path: str) -> int:
+        """
+        Migrate a legacy calendar_spreads.csv, whose legs are stringified dicts.
+
+        The scan date of each row is taken as the date of its earnings event.
+
+        Returns:
+            Number of rows imported
+        """
+        import pandas as pd
+
+        legacy = pd.read_csv(path)
+        if legacy.empty:
+            return 0
+        for column in LEGS.values():
+            legacy[column] = legacy[column].apply(lambda value: ast.literal_eval(value) if isinstance(value, str) else None)
+        earnings = pd.to_datetime(legacy["Earnings DateTime"], utc=True)
+        legacy["Earnings DateTime"] = earnings
+        count = 0
+        for scan_date, day in legacy.groupby(earnings.dt.date):
+            count += self.write(day, scan_date)
+        return count
+
+
+def flatten_candidate(row: Dict[str, Any], scan_date: dt.date) -> Dict[str, Any]:
+    """Flatten a candidate row and its leg dicts into typed store columns."""
+    flat: Dict[str, Any] = {"scan_date": scan_date}
+    for name, type_, source in SPREAD_FIELDS:
+        flat[name] = _coerce(row.get(source), type_)
+    for leg, source in LEGS.items():
+        contract = row.get(source) or {}
+        for name, type_ in LEG_FIELDS:
+            flat[f"{leg}_{name}"] = _coerce(contract.get(name), type_)
+    return flat
+
+
+def _coerce(value: Any, type_: str) -> Any:
+    """Convert API strings (e.g. ``'192.5'``, ``'5.4%'``, ``'2025-03-28'``) to the column type."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    try:
+        if type_.startswith("float"):
+            return float(str(value).rstrip("%"))
+        if type_.startswith("int"):
+            return int(float(value))
+        if type_ == "bool":
+            return value if isinstance(value, bool) else str(value).lower() == "true"
+        if type_.startswith("date"):
+            return value if isinstance(value, dt.date) else dt.date.fromisoformat(str(value)[:10])
+        if type_ == "timestamp":
+            import pandas as pd
+
+            return pd.Timestamp(value).tz_convert("UTC").to_pydatetime()
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a legacy calendar_spreads.csv into the spread store.")
+    parser.add_argument("csv", nargs="?", default="calendar_spreads.csv")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH)
+    args = parser.parse_args()
+    count = SpreadStore(args.store).import_csv(args.csv)
+    print(f"Imported {count} spreads into {args.store}")
+
+
+if __name__ == "__main__":
+    main()
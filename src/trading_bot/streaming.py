@@ -0,0 +1,289 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import msgpack
+import websockets
+
+logger = logging.getLogger("trading_bot")
+
+STOCK_STREAM_URL = "wss://stream.data.alpaca.markets/v2/iex"
+OPTION_STREAM_URL = "wss://stream.data.alpaca.markets/v1beta1/indicative"
+
+
+def headers_keyword(version: str = websockets.__version__) -> str:
+    """``connect`` argument for request headers; websockets 14 renamed ``extra_headers``."""
+    return "additional_headers" if int(version.split(".")[0]) >= 14 else "extra_headers"
+
+
+def trade_stream_url(base_url: str) -> str:
+    """Websocket URL of the trade updates stream of a trading API base URL."""
+    return base_url.rstrip("/").replace("https://", "wss://", 1).replace("http://", "ws://", 1) + "/stream"
+
+
+class StreamClient:
+    """
+    Base websocket client that runs its own asyncio loop in a daemon thread.
+
+    Subclasses implement ``_authenticate``, ``_on_connected`` and ``_handle``.
+    The connection is re-established automatically after errors.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        api_secret: str,
+        reconnect_delay: float = 5.0,
+        use_msgpack: bool = False,
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.reconnect_delay = reconnect_delay
+        self.use_msgpack = use_msgpack
+        self.connected = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the stream in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run_loop, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close the connection and stop the background thread."""
+        self._stopping = True
+        if self._loop and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread:
+            self._thread.join(timeout)
+        self.connected.clear()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        """Send a message from any thread if the stream is connected."""
+        if self._loop and self._ws is not None and self.connected.is_set():
+            asyncio.run_coroutine_threadsafe(self._ws.send(self._encode(message)), self._loop)
+
+    def _run_loop(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                headers = {"Content-Type": "application/msgpack"} if self.use_msgpack else None
+                async with websockets.connect(self.url, **{headers_keyword(): headers}) as ws:
+                    self._ws = ws
+                    await self._authenticate(ws)
+                    # Set before replaying subscriptions so none added meanwhile are lost.
+                    self.connected.set()
+                    await self._on_connected(ws)
+                    logger.info("Connected to stream %s", self.url)
+                    async for raw in ws:
+                        for message in self._decode(raw):
+                            self._handle(message)
+            except Exception as e:
+                if not self._stopping:
+                    logger.warning(
+                        f"Stream {self.url} disconnected: {e}. Reconnecting in {self.reconnect_delay:.1f} seconds..."
+                    )
+            finally:
+                self._ws = None
+                self.connected.clear()
+                self._on_disconnected()
+            if not self._stopping:
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _encode(self, message: Dict[str, Any]):
+        return msgpack.packb(message) if self.use_msgpack else json.dumps(message)
+
+    @staticmethod
+    def _decode(raw) -> List[Dict[str, Any]]:
+        data = msgpack.unpackb(raw) if isinstance(raw, bytes) else json.loads(raw)
+        return data if isinstance(data, list) else [data]
+
+    async def _recv(self, ws) -> List[Dict[str, Any]]:
+        return self._decode(await ws.recv())
+
+    async def _authenticate(self, ws) -> None:
+        raise NotImplementedError
+
+    async def _on_connected(self, ws) -> None:
+        pass
+
+    def _on_disconnected(self) -> None:
+        pass
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class QuoteStream(StreamClient):
+    """
+    Subscriber for Alpaca's market-data quote stream.
+
+    Keeps the latest quote per subscribed symbol in a plain dict. Each update
+    replaces the symbol's entry with a new dict, so readers can use
+    ``get_quote`` without taking a lock.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        api_secret: str,
+        reconnect_delay: float = 5.0,
+        use_msgpack: bool = False,
+        record_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            url: Websocket URL of the quote feed
+            api_key: Alpaca API key
+            api_secret: Alpaca API secret
+            reconnect_delay: Seconds to wait before reconnecting
+            use_msgpack: Speak msgpack instead of JSON (required by the options feed)
+            record_path: Optional JSONL file every received quote is appended to,
+                for replay through the sandbox quote server
+        """
+        super().__init__(url, api_key, api_secret, reconnect_delay, use_msgpack)
+        self.quotes: Dict[str, Dict[str, Any]] = {}
+        self.record_path = record_path
+        self._symbols = set()
+        self._symbols_lock = threading.Lock()
+
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        """Add symbols to the subscription, sending it immediately if connected."""
+        with self._symbols_lock:
+            new = [s for s in symbols if s not in self._symbols]
+            self._symbols.update(new)
+        if new:
+            self.send({"action": "subscribe", "quotes": new})
+
+    def get_quote(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest quote for a symbol.
+
+        Args:
+            symbol: Stock or option symbol
+            max_age: If given, quotes received more than this many seconds ago are ignored
+
+        Returns:
+            Dict with ``bid``, ``ask``, ``bid_size``, ``ask_size``, ``timestamp`` and
+            ``received`` (monotonic time), or None if no usable quote is held
+        """
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            return None
+        if max_age is not None and time.monotonic() - quote["received"] > max_age:
+            return None
+        return quote
+
+    async def _authenticate(self, ws) -> None:
+        await self._recv(ws)  # [{"T": "success", "msg": "connected"}]
+        await ws.send(self._encode({"action": "auth", "key": self.api_key, "secret": self.api_secret}))
+        for message in await self._recv(ws):
+            if message.get("T") == "error":
+                raise ConnectionError(f"Stream authentication failed: {message.get('msg')}")
+
+    async def _on_connected(self, ws) -> None:
+        with self._symbols_lock:
+            symbols = sorted(self._symbols)
+        if symbols:
+            await ws.send(self._encode({"action": "subscribe", "quotes": symbols}))
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        if message.get("T") != "q":
+            if message.get("T") == "error":
+                logger.error("Quote stream error: %s", message.get("msg"))
+            return
+        self.quotes[message["S"]] = {
+            "bid": float(message["bp"]),
+            "ask": float(message["ap"]),
+            "bid_size": message.get("bs"),
+            "ask_size": message.get("as"),
+            "timestamp": str(message.get("t")),
+            "received": time.monotonic(),
+        }
+        if self.record_path:
+            with open(self.record_path, "a") as f:
+                f.write(json.dumps(message, default=str) + "\n")
+
+
+class TradeUpdateStream(StreamClient):
+    """
+    Listener for Alpaca's ``trade_updates`` stream of order events on the account.
+
+    Every update's ``data`` (``event``, ``order`` and, for fills, ``qty``,
+    ``price`` and ``position_qty``) is passed to ``on_update``. Updates sent
+    while disconnected are lost, so ``on_disconnected`` runs whenever the
+    connection drops, for the caller to mark its state stale, and
+    ``on_connected`` runs after every (re)connection, once listening, for the
+    caller to resynchronise it.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        api_secret: str,
+        on_update: Callable[[Dict[str, Any]], None],
+        on_connected: Optional[Callable[[], Any]] = None,
+        on_disconnected: Optional[Callable[[], Any]] = None,
+        reconnect_delay: float = 5.0,
+    ):
+        """
+        Args:
+            url: Websocket URL of the trading stream, see ``trade_stream_url``
+            api_key: Alpaca API key
+            api_secret: Alpaca API secret
+            on_update: Called with the ``data`` of every trade update
+            on_connected: Called, off the stream thread's event loop, after each connection
+            on_disconnected: Called whenever the connection is lost or closed
+            reconnect_delay: Seconds to wait before reconnecting
+        """
+        super().__init__(url, api_key, api_secret, reconnect_delay)
+        self.on_update = on_update
+        self.on_connected = on_connected
+        self.on_disconnected = on_disconnected
+
+    @staticmethod
+    def _decode(raw) -> List[Dict[str, Any]]:
+        # The trading stream sends JSON, often in binary frames
+        data = json.loads(raw.decode() if isinstance(raw, bytes) else raw)
+        return data if isinstance(data, list) else [data]
+
+    async def _authenticate(self, ws) -> None:
+        await ws.send(self._encode({"action": "auth", "key": self.api_key, "secret": self.api_secret}))
+        for message in await self._recv(ws):
+            if message.get("data", {}).get("status") != "authorized":
+                raise ConnectionError(f"Trade stream authentication failed: {message.get('data')}")
+
+    async def _on_connected(self, ws) -> None:
+        await ws.send(self._encode({"action": "listen", "data": {"streams": ["trade_updates"]}}))
+        if self.on_connected is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.on_connected)
+
+    def _on_disconnected(self) -> None:
+        if self.on_disconnected is not None:
+            self.on_disconnected()
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        if message.get("stream") != "trade_updates":
+            return
+        try:
+            self.on_update(message["data"])
+        except Exception as e:
+            logger.error(f"Failed to apply trade update: {str(e)}")
@@ -0,0 +1,94 @@
+import datetime as dt
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from trading_bot.ledger import DEFAULT_LEDGER_PATH, get_ledger
+
+logger = logging.getLogger("trading_bot")
+
+HEALTH_WARNING_THRESHOLD = 80
+HEALTH_CRITICAL_THRESHOLD = 90
+
+
+def system_health(sample: Optional[Dict[str, Any]]) -> str:
+    """Classify a health sample as Healthy, Warning or Critical (Unknown if missing)."""
+    if not sample:
+        return "Unknown"
+    peak = max(sample.get("cpu_usage", 0), sample.get("memory_usage", 0), sample.get("disk_usage", 0))
+    if peak > HEALTH_CRITICAL_THRESHOLD:
+        return "Critical"
+    if peak > HEALTH_WARNING_THRESHOLD:
+        return "Warning"
+    return "Healthy"
+
+
+class SummaryAggregator:
+    """
+    Running dashboard summary over the trade ledger and the health log.
+
+    Each refresh reads only a change marker (latest order rowid, latest close
+    id and latest health sample); if it moved, only closes recorded since the
+    last refresh are folded into the running totals. The summary carries an
+    ETag and Last-Modified time that change only when its inputs do, so
+    clients polling an unchanged summary can be answered with 304.
+    """
+
+    def __init__(self, ledger_path: str = DEFAULT_LEDGER_PATH, health_index=None):
+        """
+        Args:
+            ledger_path: Trade ledger database; not created if missing
+            health_index: Optional MetricsLogIndex over the health log
+        """
+        self.ledger_path = ledger_path
+        self.health_index = health_index
+        self._lock = threading.Lock()
+        self._marker: Optional[Tuple[Any, ...]] = None
+        self._close_id = 0
+        self._total_trades = 0
+        self._closed_trades = 0
+        self._winning_trades = 0
+        self._total_pnl = 0.0
+        self._summary: Dict[str, Any] = {}
+        self.etag = ""
+        self.last_modified = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+
+    def snapshot(self) -> Tuple[Dict[str, Any], str, dt.datetime]:
+        """
+        Current summary, bringing the running totals up to date first.
+
+        Returns:
+            Tuple of (summary, etag, last_modified)
+        """
+        with self._lock:
+            ledger = get_ledger(self.ledger_path) if os.path.exists(self.ledger_path) else None
+            order_id, close_id = ledger.last_ids() if ledger is not None else (0, 0)
+            health = self.health_index.latest() if self.health_index is not None else None
+            marker = (order_id, close_id, (health or {}).get("timestamp"))
+            if marker != self._marker:
+                if ledger is not None and close_id > self._close_id:
+                    self._apply_closes(ledger.closes_since(self._close_id))
+                self._close_id = close_id
+                self._total_trades = order_id
+                self._update(marker, health)
+            return self._summary, self.etag, self.last_modified
+
+    def _apply_closes(self, closes) -> None:
+        for close in closes:
+            pnl = close.get("pnl") or 0.0
+            self._closed_trades += 1
+            self._winning_trades += pnl > 0
+            self._total_pnl += pnl
+
+    def _update(self, marker: Tuple[Any, ...], health: Optional[Dict[str, Any]]) -> None:
+        self._marker = marker
+        self._summary = {
+            "total_trades": self._total_trades,
+            "win_rate": (self._winning_trades / self._closed_trades * 100) if self._closed_trades else 0,
+            "total_pnl": self._total_pnl,
+            "system_health": system_health(health),
+        }
+        self.etag = hashlib.sha1(repr(marker).encode()).hexdigest()[:16]
+        self.last_modified = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
@@ -1,18 +1,49 @@
-import yfinance as yf
 import numpy as np
 import datetime as dt
 from datetime import datetime, timedelta
-from scipy.interpolate import interp1d
 import logging
 from trading_bot.utils import get_spx_tickers
 from trading_bot.earnings_getter import get_upcoming_earnings
 
 logger = logging.getLogger("trading_bot")
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+
+
+# Entry gates for the calendar spread
+MIN_AVG_VOLUME = 1500000
+MIN_IV30_RV30 = 1.25
+MAX_TS_SLOPE_0_45 = -0.00406
+
+
+def classify(avg_volume, iv30_rv30, ts_slope_0_45):
+    """Apply the entry gates; returns "Recommended", "Consider" or None."""
+    avg_volume_bool = avg_volume >= MIN_AVG_VOLUME
+    iv30_rv30_bool = iv30_rv30 >= MIN_IV30_RV30
+    ts_slope_bool = ts_slope_0_45 <= MAX_TS_SLOPE_0_45
+
+    if avg_volume_bool and iv30_rv30_bool and ts_slope_bool:
+        return "Recommended"
+    if ts_slope_bool and (avg_volume_bool or iv30_rv30_bool):
+        return "Consider"
+    return None
+
+
+def refresh_recommendation(avg_volume, rv30, near_dte, near_iv, long_dte, long_iv):
+    """
+    Re-check the entry gates using fresh implied volatilities of the two legs.
+
+    The term structure is rebuilt from the near and long leg IVs only, while the
+    volume and realized volatility measured during the warm-up scan are reused.
+    """
+    try:
+        if near_dte == 45 or rv30 <= 0:
+            return None
+        term_spline = build_term_structure([near_dte, long_dte], [near_iv, long_iv])
+        ts_slope_0_45 = (term_spline(45) - term_spline(near_dte)) / (45 - near_dte)
+        iv30_rv30 = term_spline(30) / rv30
+        return classify(avg_volume, iv30_rv30, ts_slope_0_45)
+    except Exception as e:
+        logger.error(f"Error refreshing recommendation: {str(e)}")
+        return None
 
 
 def get_current_price(ticker):
@@ -80,6 +111,9 @@ def yang_zhang(price_data, window=30, trading_periods=252, return_last_only=True
 
 
 def build_term_structure(days, ivs):
+    # Deferred: scipy is slow to import and only needed when scanning
+    from scipy.interpolate import interp1d
+
     try:
         days = np.array(days)
         ivs = np.array(ivs)
@@ -105,6 +139,9 @@ def build_term_structure(days, ivs):
 
 
 def compute_recommendation(tickers):
+    # Deferred: yfinance is slow to import and only needed when scanning
+    import yfinance as yf
+
     recommendations = {}
     for ticker in tickers:
         try:
@@ -199,24 +236,21 @@ def compute_recommendation(tickers):
             ts_slope_0_45 = (term_spline(45) - term_spline(dtes[0])) / (45 - dtes[0])
 
             price_history = stock.history(period='3mo')
-            iv30_rv30 = term_spline(30) / yang_zhang(price_history)
+            rv30 = yang_zhang(price_history)
+            iv30_rv30 = term_spline(30) / rv30
 
             avg_volume = price_history['Volume'].rolling(30).mean().dropna().iloc[-1]
             expected_move = str(round(straddle / underlying_price * 100, 2)) + "%" if straddle else None
 
-            avg_volume_bool = avg_volume >= 1500000
-            iv30_rv30_bool = iv30_rv30 >= 1.25
-            ts_slope_bool = ts_slope_0_45 <= -0.00406
-
-            if avg_volume_bool and iv30_rv30_bool and ts_slope_bool:
-                recommendations[ticker] = {
-                    "Recommendation": "Recommended",
-                    "Expected Move": expected_move,
-                }
-            elif ts_slope_bool and (avg_volume_bool or iv30_rv30_bool):
+            recommendation = classify(avg_volume, iv30_rv30, ts_slope_0_45)
+            if recommendation:
                 recommendations[ticker] = {
-                    "Recommendation": "Consider",
+                    "Recommendation": recommendation,
                     "Expected Move": expected_move,
+                    "Avg Volume": float(avg_volume),
+                    "RV30": float(rv30),
+                    "IV30/RV30": float(iv30_rv30),
+                    "TS Slope": float(ts_slope_0_45),
                 }
             else:
                 recommendations[ticker] = None
@@ -235,8 +269,8 @@ def process_tickers(df):
             if result is None or not isinstance(result, dict):
                 df = df[df["Ticker"] != ticker]
             else:
-                df.loc[df["Ticker"] == ticker, "Recommendation"] = result["Recommendation"]
-                df.loc[df["Ticker"] == ticker, "Expected Move"] = result["Expected Move"]
+                for column, value in result.items():
+                    df.loc[df["Ticker"] == ticker, column] = value
     except Exception as e:
         logger.error(f"Failed to process tickers: {str(e)}")
         raise
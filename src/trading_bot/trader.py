@@ -2,69 +2,74 @@ import logging
 import datetime as dt
 import json
 import pytz
-import pandas as pd
-from trading_bot.utils import wait_until, log_trade
-from trading_bot.api_client import AlpacaAPIClient
 import signal
 import sys
-from trading_bot.option_finder import find_option_strategy
+import os
+from trading_bot.option_finder import find_option_strategy, STREAM_QUOTE_MAX_AGE
 from trading_bot.earnings_getter import get_upcoming_earnings
-from trading_bot.ticker_filter import process_tickers
+from trading_bot.ticker_filter import process_tickers, refresh_recommendation
 from trading_bot import __version__
 import functools
+import threading
 import time
-from typing import Optional, Dict, Any, List
-from trading_bot.circuit_breaker import CircuitBreaker
-from trading_bot.logging_config import setup_logging
-
-# Setup logging
-logger = setup_logging()
-
-# Load configuration
-try:
-    with open("config.json", "r") as config_file:
-        config = json.load(config_file)
-except FileNotFoundError:
-    logger.error("config.json not found")
-    sys.exit(1)
-except json.JSONDecodeError:
-    logger.error("Invalid JSON in config.json")
-    sys.exit(1)
-
-# Validate required configuration
-required_config = ["api_key", "api_secret", "base_url", "market_close_time", "market_open_time", "default_limit_price"]
-for key in required_config:
-    if key not in config:
-        logger.error(f"Missing required configuration: {key}")
-        sys.exit(1)
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Set, Tuple
+from trading_bot.context import ConfigError, LazyProxy, bootstrap, context_attribute
+from trading_bot.checkpoint import CANDIDATES, CLOSED, EXECUTED
+from trading_bot.execution import DEAD_STATUSES, FILLED_STATUS, ExecutionEngine
+from trading_bot.scheduler import Scheduler
+from trading_bot.metrics import CACHE_REQUESTS, PIPELINE_STAGE_SECONDS
+from trading_bot.orders import client_order_id as make_client_order_id, submit_order
+from trading_bot.logging_config import log_context
+
+# pandas is imported where it is used so importing the trader stays light
+if TYPE_CHECKING:
+    import pandas as pd
 
-API_KEY = config["api_key"]
-API_SECRET = config["api_secret"]
-BASE_URL = config["base_url"]
-MARKET_CLOSE_TIME = config["market_close_time"]
-MARKET_OPEN_TIME = config["market_open_time"]
-DEFAULT_LIMIT_PRICE = config["default_limit_price"]
+logger = logging.getLogger("trading_bot")
 
-# Initialize API client with circuit breaker
-api_client = AlpacaAPIClient(BASE_URL, API_KEY, API_SECRET)
-circuit_breaker = CircuitBreaker()
+# Configuration and clients are built on first use (or by bootstrap()), not at
+# import, so importing this module neither reads config.json nor connects anything
+config = context_attribute("config")
+circuit_breaker = context_attribute("circuit_breaker")
+api_client = context_attribute("api_client")
+api_monitor = context_attribute("api_monitor")
+market_calendar = context_attribute("market_calendar")
+checkpoints = context_attribute("checkpoints")
+in_flight_orders = context_attribute("in_flight_orders")
+monitoring = context_attribute("monitoring")
+warmup_config = context_attribute("warmup_config")
+streaming_config = context_attribute("streaming_config")
+trade_ledger = context_attribute("trade_ledger")
+trade_monitor = context_attribute("trade_monitor")
+spread_store = context_attribute("spread_store")
+reconciliation_engine = context_attribute("reconciliation_engine")
+stock_quotes = context_attribute("stock_quotes")
+option_quotes = context_attribute("option_quotes")
+order_book = context_attribute("order_book")
+trade_updates = context_attribute("trade_updates")
 
 eastern = pytz.timezone("America/New_York")
 
 def signal_handler(sig, frame):
     """Handle shutdown signals gracefully."""
     logger.info("Shutdown signal received. Exiting gracefully.")
+    monitoring.close()
     sys.exit(0)
 
 def add_retry_logic(func):
-    """Decorator to add retry logic for rate-limited API calls."""
+    """
+    Decorator to add retry logic for rate-limited API calls.
+
+    Circuit breaking happens per endpoint class in the API client, so the
+    wrapped function itself is not put behind a breaker.
+    """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         max_retries = 3
         base_delay = 1
         for attempt in range(max_retries):
             try:
-                return circuit_breaker.execute(func, *args, **kwargs)
+                return func(*args, **kwargs)
             except Exception as e:
                 if "Too Many Requests" in str(e):
                     delay = base_delay * (2 ** attempt)
@@ -88,46 +93,106 @@ def validate_trade_params(long_symbol: str, short_symbol: str, qty: int) -> bool
         return False
     return True
 
-def calculate_limit_price(long_symbol: str, short_symbol: str) -> float:
+def get_option_quote(symbol: str) -> Optional[Dict[str, float]]:
     """
-    Calculate a good limit price for the calendar spread based on the mid-price of the long and short legs.
+    Get the latest bid/ask for an option contract.
+    
+    Reads the streamed quote table when it holds a fresh quote and falls back
+    to the REST latest-quote endpoint otherwise.
+    
+    Args:
+        symbol: Option contract symbol
+        
+    Returns:
+        Dict with ``bid`` and ``ask``, or None if no quote could be fetched
+    """
+    quote = option_quotes.get_quote(symbol, max_age=STREAM_QUOTE_MAX_AGE)
+    if quote is not None:
+        CACHE_REQUESTS.inc(cache="option_quotes", result="hit")
+        return quote
+    CACHE_REQUESTS.inc(cache="option_quotes", result="miss")
+    
+    response = api_client.get(endpoint=f"/options/quotes/latest", params={"symbols": symbol}, base="data")
+    if not response:
+        return None
+    return {
+        "bid": float(response["quotes"][symbol]["bid"]),
+        "ask": float(response["quotes"][symbol]["ask"]),
+    }
+
+def get_spread_quotes(long_symbol: str, short_symbol: str) -> Optional[Dict[str, float]]:
+    """
+    Fetch the latest quotes for both legs of a calendar spread.
     
     Args:
         long_symbol: Symbol for the long leg
         short_symbol: Symbol for the short leg
         
     Returns:
-        float: The calculated limit price
+        Dict with the spread's ``mid`` price and ``natural`` price (long ask minus
+        short bid), or None if quotes could not be fetched
     """
     try:
-        long_quote = api_client.get(endpoint=f"/options/quotes/latest", params={"symbols": long_symbol}, base="data")
-        short_quote = api_client.get(endpoint=f"/options/quotes/latest", params={"symbols": short_symbol}, base="data")
+        long_quote = get_option_quote(long_symbol)
+        short_quote = get_option_quote(short_symbol)
         
         if not long_quote or not short_quote:
-            logger.error("Failed to fetch quotes for limit price calculation.")
-            return DEFAULT_LIMIT_PRICE
-        
-        long_mid = (float(long_quote["quotes"][long_symbol]["bid"]) + float(long_quote["quotes"][long_symbol]["ask"])) / 2
-        short_mid = (float(short_quote["quotes"][short_symbol]["bid"]) + float(short_quote["quotes"][short_symbol]["ask"])) / 2
+            logger.error("Failed to fetch quotes for spread %s/%s.", long_symbol, short_symbol)
+            return None
         
-        # The limit price is the difference between the long and short mid-prices
-        limit_price = long_mid - short_mid
-        logger.info(f"Calculated limit price: {limit_price:.2f}")
-        return limit_price
+        return {
+            "mid": (long_quote["bid"] + long_quote["ask"]) / 2 - (short_quote["bid"] + short_quote["ask"]) / 2,
+            "natural": long_quote["ask"] - short_quote["bid"],
+        }
     except Exception as e:
-        logger.error(f"Error calculating limit price: {e}")
-        return DEFAULT_LIMIT_PRICE
+        logger.error(f"Error fetching spread quotes: {e}")
+        return None
+
+def calculate_limit_price(long_symbol: str, short_symbol: str) -> float:
+    """
+    Calculate a good limit price for the calendar spread based on the mid-price of the long and short legs.
+    
+    Args:
+        long_symbol: Symbol for the long leg
+        short_symbol: Symbol for the short leg
+        
+    Returns:
+        float: The calculated limit price
+    """
+    quotes = get_spread_quotes(long_symbol, short_symbol)
+    if quotes is None:
+        return config["default_limit_price"]
+    
+    # The limit price is the difference between the long and short mid-prices
+    limit_price = quotes["mid"]
+    logger.info(f"Calculated limit price: {limit_price:.2f}")
+    return limit_price
+
+def spread_legs(long_symbol: str, short_symbol: str) -> List[Tuple[str, str]]:
+    """(symbol, side) of a calendar spread's legs."""
+    return [(long_symbol, "buy"), (short_symbol, "sell")]
 
 @add_retry_logic
-def trade_calendar_spread(long_symbol: str, short_symbol: str, qty: int = 10, limit_price: float = None) -> Optional[Dict[str, Any]]:
+def trade_calendar_spread(
+    long_symbol: str,
+    short_symbol: str,
+    qty: int = 10,
+    limit_price: float = None,
+    client_order_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Place a calendar spread trade.
     
+    Submission is idempotent: the order carries a deterministic client order
+    id and every retry looks it up before posting again, so a timeout after
+    the broker accepted the order never places it twice.
+    
     Args:
         long_symbol: Symbol for the long leg
         short_symbol: Symbol for the short leg
         qty: Quantity of contracts
         limit_price: Limit price for the trade (defaults to calculated value)
+        client_order_id: Client order id (defaults to one derived from today and the legs)
         
     Returns:
         Dict containing order details if successful, None otherwise
@@ -146,9 +211,16 @@ def trade_calendar_spread(long_symbol: str, short_symbol: str, qty: int = 10, li
         limit_price,
     )
 
+    if client_order_id is None:
+        # OCC option symbols end in a 15-character expiry, type and strike suffix
+        client_order_id = make_client_order_id(
+            dt.datetime.now(eastern).date(), long_symbol[:-15] or long_symbol, spread_legs(long_symbol, short_symbol)
+        )
+
     payload = {
+        "client_order_id": client_order_id,
         "type": "limit",
-        "limit_price": str(limit_price),
+        "limit_price": f"{limit_price:.2f}",
         "time_in_force": "day",
         "order_class": "mleg",
         "qty": str(qty),
@@ -169,7 +241,9 @@ def trade_calendar_spread(long_symbol: str, short_symbol: str, qty: int = 10, li
     }
     
     try:
-        response = api_client.post(endpoint="/orders", payload=payload)
+        response = submit_order(
+            api_client, payload, in_flight_orders, attempts=config.get("execution", {}).get("submit_attempts", 3)
+        )
         if response:
             logger.info("Order submitted successfully: %s", response)
             return response
@@ -180,16 +254,33 @@ def trade_calendar_spread(long_symbol: str, short_symbol: str, qty: int = 10, li
         logger.error("Error submitting calendar spread orders: %s", e)
         return None
 
+def book_is_live() -> bool:
+    """Whether the order book is seeded and receiving trade updates."""
+    return order_book.seeded.is_set() and trade_updates.connected.is_set()
+
+def current_positions() -> Optional[List[Dict[str, Any]]]:
+    """Open positions from the order book while it is live, otherwise from the API."""
+    if book_is_live():
+        return order_book.positions()
+    return api_client.get("/positions")
+
+def position_price(symbol: str) -> Optional[float]:
+    """Mid price of a position's contract from the quote streams, if quoted."""
+    quote = option_quotes.get_quote(symbol, max_age=STREAM_QUOTE_MAX_AGE) or stock_quotes.get_quote(
+        symbol, max_age=STREAM_QUOTE_MAX_AGE
+    )
+    return (quote["bid"] + quote["ask"]) / 2 if quote else None
+
 @add_retry_logic
 def close_positions(positions: Optional[List[Dict[str, Any]]] = None) -> None:
     """
     Close all open positions.
     
     Args:
-        positions: Optional list of positions to close. If None, fetches current positions.
+        positions: Optional list of positions to close. If None, uses the current positions.
     """
     try:
-        positions = positions if positions is not None else api_client.get("/positions")
+        positions = positions if positions is not None else current_positions()
         if positions is None:
             logger.error("Failed to fetch positions or no positions open.")
             return
@@ -212,26 +303,30 @@ def close_positions(positions: Optional[List[Dict[str, Any]]] = None) -> None:
     except Exception as e:
         logger.error(f"Error in close_positions: {str(e)}")
 
-def get_todays_trades(days: int = 1) -> pd.DataFrame:
+def get_todays_trades(days: int = 1, after: Optional[dt.datetime] = None) -> Optional["pd.DataFrame"]:
     """
     Get today's trading opportunities.
     
     Args:
         days: Number of days to look ahead for earnings
+        after: Start of the earnings window (defaults to now)
         
     Returns:
-        DataFrame containing valid trading opportunities
+        DataFrame containing valid trading opportunities, or None if the scan failed
     """
+    import pandas as pd
+
     try:
         tickers = config.get("tickers", [])
         if not tickers:
             logger.error("No tickers configured")
             return pd.DataFrame()
             
-        upcoming = get_upcoming_earnings(tickers, days=days)
+        upcoming = get_upcoming_earnings(tickers, days=days, after=after)
         if upcoming is None or upcoming.empty:
             logger.warning("No upcoming earnings found")
             return pd.DataFrame()
+        stock_quotes.subscribe(upcoming["Ticker"])
             
         df = process_tickers(upcoming)
         if df is None or df.empty:
@@ -239,103 +334,574 @@ def get_todays_trades(days: int = 1) -> pd.DataFrame:
             return pd.DataFrame()
             
         for index, row in df.iterrows():
-            strat = find_option_strategy(row["Ticker"], row["Earnings Date"], api_client)
+            with log_context(ticker=row["Ticker"]):
+                strat = find_option_strategy(row["Ticker"], row["Earnings Date"], api_client, stock_quotes)
             if isinstance(strat, str):
                 logger.warning("Skipping %s: %s", row["Ticker"], strat)
                 df.drop(index, inplace=True)
                 continue
             df.at[index, "Short Leg"] = strat["near_term"]
             df.at[index, "Long Leg"] = strat["long_term"]
+            option_quotes.subscribe([strat["near_term"]["symbol"], strat["long_term"]["symbol"]])
 
         return df[~df["Short Leg"].isnull() & ~df["Long Leg"].isnull()]
     except Exception as e:
         logger.error(f"Error in get_todays_trades: {str(e)}")
-        return pd.DataFrame()
+        return None
 
-def trader() -> None:
+def candidates_path(day: dt.date) -> str:
+    """Path of the persisted warm-up candidate set for a trading day."""
+    return os.path.join(warmup_config.get("candidates_dir", "data"), f"candidates_{day:%Y%m%d}.json")
+
+def save_candidates(candidates: "pd.DataFrame", day: dt.date) -> None:
+    """Persist a candidate set so the execution job (or a restarted process) can pick it up."""
+    path = candidates_path(day)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(candidates.to_dict("records"), f, default=str)
+    os.replace(tmp_path, path)
+    logger.info("Saved %d candidates to %s", len(candidates), path)
+
+def load_candidates(day: dt.date) -> Optional["pd.DataFrame"]:
+    """Load the warm-up candidate set for a day, or None if the warm-up did not run."""
+    import pandas as pd
+
+    path = candidates_path(day)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return pd.DataFrame(json.load(f))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Failed to load candidates from {path}: {str(e)}")
+        return None
+
+def warm_up() -> None:
     """
-    Main trading loop.
+    Pre-market warm-up.
     
-    Daily schedule:
-    - At 15 minutes before market close, run the trade finder
-      to process only earnings events scheduled between today's close and next day's open.
-    - Then, on the next trading day at 15 minutes after market open,
-      close all positions.
+    Runs the slow part of the scan (earnings lookup, volatility filter and leg
+    selection) hours before the close for the earnings window of the next trade
+    execution, and persists the candidates for the fast refresh at execution time.
+    """
+    execution_time = next_trade_execution(dt.datetime.now(eastern))
+    if execution_time is None:
+        logger.warning("No upcoming trade execution, skipping warm-up")
+        return
+    with PIPELINE_STAGE_SECONDS.time(stage="warm_up_scan"):
+        candidates = get_todays_trades(days=overnight_days(execution_time.date()), after=execution_time)
+    if candidates is None:
+        # Saving nothing leaves the full scan to the execution job
+        logger.warning("Warm-up scan failed, candidates not saved")
+        return
+    save_candidates(candidates, execution_time.date())
+
+def refresh_candidates(candidates: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Re-check warm-up candidates against fresh market data.
+    
+    Fetches option snapshots for every leg in one request and re-applies the
+    IV/RV and term-structure slope gates using the legs' current implied
+    volatilities. Candidates without fresh IVs keep their warm-up recommendation.
+    
+    Args:
+        candidates: Candidate set produced by the warm-up
+        
+    Returns:
+        DataFrame of candidates that still pass the gates
+    """
+    import pandas as pd
+
+    if candidates.empty:
+        return candidates
+    
+    symbols = []
+    for _, row in candidates.iterrows():
+        symbols += [row["Short Leg"]["symbol"], row["Long Leg"]["symbol"]]
+    option_quotes.subscribe(symbols)
+    
+    response = api_client.get(
+        endpoint="options/snapshots", url_part="v1beta1", params={"symbols": ",".join(symbols)}, base="data"
+    )
+    snapshots = (response or {}).get("snapshots", {})
+    if not snapshots:
+        logger.warning("No option snapshots available, using warm-up recommendations as-is")
+        return candidates
+    
+    today = dt.datetime.now(eastern).date()
+    keep = []
+    for index, row in candidates.iterrows():
+        near, far = row["Short Leg"], row["Long Leg"]
+        near_iv = snapshots.get(near["symbol"], {}).get("impliedVolatility")
+        far_iv = snapshots.get(far["symbol"], {}).get("impliedVolatility")
+        if near_iv is None or far_iv is None or pd.isnull(row.get("RV30")):
+            logger.warning("No fresh IV for %s, keeping warm-up recommendation", row["Ticker"])
+            keep.append(index)
+            continue
+        
+        recommendation = refresh_recommendation(
+            avg_volume=row["Avg Volume"],
+            rv30=row["RV30"],
+            near_dte=(dt.date.fromisoformat(near["expiration_date"]) - today).days,
+            near_iv=near_iv,
+            long_dte=(dt.date.fromisoformat(far["expiration_date"]) - today).days,
+            long_iv=far_iv,
+        )
+        if recommendation is None:
+            logger.info("%s no longer passes the entry gates on fresh data", row["Ticker"])
+            continue
+        candidates.at[index, "Recommendation"] = recommendation
+        keep.append(index)
+    
+    return candidates.loc[keep]
+
+@functools.lru_cache(maxsize=None)
+def _execution_engine() -> ExecutionEngine:
+    return ExecutionEngine(api_client, trade_calendar_spread, get_spread_quotes, config, on_submit=checkpoint_order)
+
+execution_engine = LazyProxy(_execution_engine)
+
+def get_market_session(day: dt.date) -> Optional[Tuple[dt.datetime, dt.datetime]]:
+    """
+    Get the market open and close for a day.
+    
+    Reads the cached market calendar, so holidays and half-days are honoured
+    without an API call per lookup. If the calendar cannot be fetched,
+    weekdays are assumed to open at half past ``market_open_time`` and close
+    at ``market_close_time``.
+    
+    Args:
+        day: Calendar date
+        
+    Returns:
+        Tuple of (open, close) datetimes in US/Eastern, or None if the market is closed
+    """
+    return market_calendar.session(day)
+
+def next_session_time(after: dt.datetime, pick) -> Optional[dt.datetime]:
+    """
+    Find the first session-relative time strictly after ``after``.
+    
+    Args:
+        after: Wall-clock time to search from
+        pick: Maps a session's (open, close) to the wanted time in that session
+        
+    Returns:
+        The first such time after ``after`` within the next three sessions, or None
     """
-    while True:
-        try:
-            now = dt.datetime.now(eastern)
-            logger.info("Running trade cycle on %s", now.strftime("%Y-%m-%d %H:%M:%S"))
+    after = after.astimezone(eastern)
+    for session in market_calendar.sessions_from(after.date(), 3):
+        candidate = pick(*session)
+        if candidate > after:
+            return candidate
+    return None
+
+def overnight_days(day: dt.date) -> int:
+    """Calendar days from ``day`` to the next session, e.g. 3 over a regular weekend."""
+    session = market_calendar.next_session(day)
+    return (session[0].date() - day).days if session is not None else 1
 
-            # Assume market close at 16:00 local time
-            market_close = eastern.localize(
-                dt.datetime(now.year, now.month, now.day, MARKET_CLOSE_TIME)
+def next_trade_execution(after: dt.datetime) -> Optional[dt.datetime]:
+    """Next trade execution time: 15 minutes before a session's close."""
+    return next_session_time(after, lambda market_open, market_close: market_close - dt.timedelta(minutes=15))
+
+def next_warm_up(after: dt.datetime) -> Optional[dt.datetime]:
+    """Next warm-up time: ``warmup.lead_minutes`` before a session's close."""
+    lead = dt.timedelta(minutes=warmup_config.get("lead_minutes", 240))
+    return next_session_time(after, lambda market_open, market_close: market_close - lead)
+
+def next_position_close(after: dt.datetime) -> Optional[dt.datetime]:
+    """Next position close time: 15 minutes after a session's open."""
+    return next_session_time(after, lambda market_open, market_close: market_open + dt.timedelta(minutes=15))
+
+def next_reconciliation(after: dt.datetime) -> Optional[dt.datetime]:
+    """Next fill reconciliation time: four hours after a session's close."""
+    return next_session_time(after, lambda market_open, market_close: market_close + dt.timedelta(hours=4))
+
+def refresh_calendar(scheduler: Scheduler) -> None:
+    """Re-fetch the market calendar, then re-plan every job against it."""
+    market_calendar.refresh()
+    scheduler.resync()
+
+def next_calendar_refresh(after: dt.datetime) -> dt.datetime:
+    """Next schedule re-sync against the market calendar: daily at 06:00 US/Eastern."""
+    after = after.astimezone(eastern)
+    refresh = eastern.localize(dt.datetime.combine(after.date(), dt.time(6)))
+    if refresh <= after:
+        refresh = eastern.localize(dt.datetime.combine(after.date() + dt.timedelta(days=1), dt.time(6)))
+    return refresh
+
+def select_spreads(today: dt.date) -> List[Dict[str, Any]]:
+    """
+    Choose the spreads to execute today.
+    
+    Uses the warm-up candidate set after a fast refresh on fresh data; a full
+    scan only runs if the warm-up did not.
+    """
+    candidates = load_candidates(today)
+    if candidates is None:
+        CACHE_REQUESTS.inc(cache="warmup_candidates", result="miss")
+        logger.info("No warm-up candidates found, running full scan")
+        with PIPELINE_STAGE_SECONDS.time(stage="scan"):
+            trades = get_todays_trades(days=overnight_days(today))
+    else:
+        CACHE_REQUESTS.inc(cache="warmup_candidates", result="hit")
+        with PIPELINE_STAGE_SECONDS.time(stage="refresh"):
+            trades = refresh_candidates(candidates)
+    if trades is None or trades.empty:
+        logger.info("No trades meet criteria after filtering for overnight earnings events.")
+        return []
+    try:
+        spread_store.write(trades, today)
+    except Exception as e:
+        logger.error(f"Failed to store spread candidates: {str(e)}")
+
+    spreads = []
+    for _, row in trades.iterrows():
+        ticker = row["Ticker"]
+        short_call = row["Short Leg"]
+        long_call = row["Long Leg"]
+
+        short_symbol = short_call["symbol"]
+        long_symbol = long_call["symbol"]
+
+        if not short_symbol or not long_symbol:
+            logger.warning("Could not retrieve option symbols for %s", ticker)
+            continue
+
+        spreads.append({
+            "cycle": today.isoformat(),
+            "client_order_id": make_client_order_id(today, ticker, spread_legs(long_symbol, short_symbol)),
+            "ticker": ticker,
+            "long_symbol": long_symbol,
+            "short_symbol": short_symbol,
+            "long_contract": long_call,
+            "short_contract": short_call,
+            "qty": config.get("default_quantity", 10),
+            "recommendation": row["Recommendation"],
+        })
+    return spreads
+
+# Held while a cycle executes, so a resumed execution never overlaps the scheduled one
+_execution_lock = threading.Lock()
+
+def execute_trades() -> None:
+    """
+    Find today's trades and walk their orders until filled.
+    
+    The chosen spreads, every submitted order and the fills awaiting the close
+    are checkpointed. If today's cycle already has a checkpoint, execution
+    resumes from it: orders submitted before a restart are looked up instead
+    of submitted again, and only the remaining spreads are walked.
+    """
+    today = dt.datetime.now(eastern).date()
+    if not market_calendar.is_trading_day(today):
+        logger.info("Market is closed on %s, skipping trade execution", today)
+        return
+    if not _execution_lock.acquire(blocking=False):
+        logger.warning("Trade execution is already running")
+        return
+    try:
+        checkpoint = checkpoints.load(today)
+        if checkpoint is not None and checkpoint.get("stage") != CANDIDATES:
+            logger.info("Trade execution for %s already finished", today)
+            return
+        if checkpoint is not None:
+            CACHE_REQUESTS.inc(cache="checkpoint", result="hit")
+            recovered, settled = recover_orders(checkpoint)
+            orders = checkpoint.get("orders", {})
+            spreads = [
+                resubmission(spread, orders.get(spread["ticker"]))
+                for spread in checkpoint.get("spreads", [])
+                if spread["ticker"] not in settled
+            ]
+            logger.info(
+                "Resuming trade execution for %s from checkpoint: %d filled, %d spreads left",
+                today,
+                len(recovered),
+                len(spreads),
             )
-            trade_exec_time = market_close - dt.timedelta(minutes=15)
+        else:
+            CACHE_REQUESTS.inc(cache="checkpoint", result="miss")
+            recovered = []
+            spreads = select_spreads(today)
+            checkpoints.update(today, stage=CANDIDATES, spreads=spreads)
 
-            # Wait until trade execution time if needed
-            if now < trade_exec_time:
-                wait_until(trade_exec_time)
+        with PIPELINE_STAGE_SECONDS.time(stage="execution"):
+            results = execution_engine.execute_batch(spreads)
+        finish_execution(today, recovered + results)
+    finally:
+        _execution_lock.release()
 
-            # Compute next day's market open
-            next_day = now + dt.timedelta(days=1)
-            next_market_open = eastern.localize(
-                dt.datetime(next_day.year, next_day.month, next_day.day, MARKET_OPEN_TIME)
+def finish_execution(day: dt.date, results: List[Dict[str, Any]]) -> None:
+    """
+    Alert on and record a cycle's execution results, then checkpoint its fills for the close.
+    
+    Orders cancelled after filling part of their quantity are recorded and
+    checkpointed with the quantity that actually filled.
+    """
+    filled = [result for result in results if result["filled"] or result.get("filled_qty")]
+    for result in results:
+        if result["filled"]:
+            monitoring.alert_trade({
+                "order_id": result["order"]["id"],
+                "symbol": f"{result['ticker']} {result['short_symbol']}/{result['long_symbol']}",
+                "type": "calendar spread",
+                "qty": result["qty"],
+                "price": result["limit_price"],
+            })
+        elif result.get("filled_qty"):
+            monitoring.alert_error(
+                f"Calendar spread for {result['ticker']} was only partially filled "
+                f"({result['filled_qty']} of {result['qty']})"
             )
+        else:
+            monitoring.alert_error(f"Calendar spread for {result['ticker']} was not filled")
+    unrecorded = [result for result in filled if trade_ledger.get_order(result["order"]["id"]) is None]
+    if unrecorded:
+        trade_ledger.record_trades([ledger_entry(result) for result in unrecorded])
+        logger.info("Logged %d filled spreads to the trade ledger", len(unrecorded))
+    checkpoints.update(day, stage=EXECUTED, pending_closes=[result["order"]["id"] for result in filled])
+    api_monitor.monitor()
 
-            trades = get_todays_trades()
-            if not trades.empty:
-                for _, row in trades.iterrows():
-                    ticker = row["Ticker"]
-                    short_call = row["Short Leg"]
-                    long_call = row["Long Leg"]
-                    qty = config.get("default_quantity", 10)
-
-                    short_symbol = short_call["symbol"]
-                    long_symbol = long_call["symbol"]
-
-                    if not short_symbol or not long_symbol:
-                        logger.warning("Could not retrieve option symbols for %s", ticker)
-                        continue
-
-                    trade_result = trade_calendar_spread(
-                        long_symbol=long_symbol,
-                        short_symbol=short_symbol,
-                        qty=qty
-                    )
-                    
-                    if trade_result:
-                        log_trade(
-                            ticker=ticker,
-                            qty=qty,
-                            long_symbol=long_symbol,
-                            long_call=trade_result['legs'][0],
-                            short_symbol=short_symbol,
-                            short_call=trade_result['legs'][1],
-                            recommendation=row['Recommendation']
-                        )
-            else:
-                logger.info("No trades meet criteria after filtering for overnight earnings events.")
-
-            # Wait until next trading day at 15 minutes after market open to close positions
-            close_positions_time = next_market_open + dt.timedelta(minutes=45)
-            sleep_duration = (close_positions_time - dt.datetime.now(eastern)).total_seconds()
-            if sleep_duration > 0:
-                wait_until(close_positions_time)
-            else:
-                logger.warning("Positions closing time already passed, skipping sleep.")
-
-            close_positions()
-            
-        except Exception as e:
-            logger.error(f"Error in main trading loop: {str(e)}")
-            time.sleep(60)  # Wait a minute before retrying
+def resubmission(spread: Dict[str, Any], submitted: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    A checkpointed spread to walk again after a restart.
+    
+    A spread whose previous order died gets a new client order id. One with no
+    checkpointed order may still have been accepted just before the crash, so
+    its id is looked up before it is posted.
+    """
+    if submitted is None:
+        if spread.get("client_order_id"):
+            in_flight_orders.may_exist(spread["client_order_id"])
+        return spread
+    attempt = submitted.get("attempt", 0) + 1
+    return {
+        **spread,
+        "attempt": attempt,
+        "client_order_id": make_client_order_id(
+            dt.date.fromisoformat(spread["cycle"]),
+            spread["ticker"],
+            spread_legs(spread["long_symbol"], spread["short_symbol"]),
+            attempt,
+        ),
+    }
+
+def checkpoint_order(spread: Dict[str, Any], order: Dict[str, Any]) -> None:
+    """Checkpoint a spread order as soon as it is accepted."""
+    day = dt.date.fromisoformat(spread["cycle"]) if spread.get("cycle") else dt.datetime.now(eastern).date()
+    checkpoints.record_order(day, spread["ticker"], {
+        "order_id": order["id"],
+        "client_order_id": order.get("client_order_id"),
+        "attempt": spread.get("attempt", 0),
+        "limit_price": order.get("limit_price"),
+        "submitted_at": dt.datetime.now(eastern).isoformat(),
+    })
+
+def current_order(order_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch an order, following replacements to the order that superseded it."""
+    order = api_client.get(f"orders/{order_id}")
+    while order and order.get("status") == "replaced" and order.get("replaced_by"):
+        order = api_client.get(f"orders/{order['replaced_by']}")
+    return order
+
+def recover_orders(checkpoint: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Set[str]]:
+    """
+    Settle the orders a checkpointed cycle submitted before it was interrupted.
+    
+    Orders still working are cancelled, since no process is walking them any
+    more. Orders whose status cannot be fetched are left alone rather than
+    risk a duplicate submission.
+    
+    Returns:
+        Tuple of (execution results of the filled orders, tickers not to execute again)
+    """
+    spreads = {spread["ticker"]: spread for spread in checkpoint.get("spreads", [])}
+    results, settled = [], set()
+    for ticker, submitted in checkpoint.get("orders", {}).items():
+        if ticker not in spreads:
+            continue
+        order = current_order(submitted["order_id"])
+        if order is None:
+            logger.error("Could not fetch order %s for %s, not executing it again", submitted["order_id"], ticker)
+            settled.add(ticker)
+            continue
+        if order.get("status") not in DEAD_STATUSES | {FILLED_STATUS}:
+            logger.info("Cancelling order %s for %s left working by the interrupted cycle", order["id"], ticker)
+            api_client.delete(f"/orders/{order['id']}")
+            order = current_order(order["id"]) or order
+        if order.get("status") == FILLED_STATUS:
+            settled.add(ticker)
+            limit_price = float(order.get("limit_price") or submitted.get("limit_price") or 0)
+            results.append({
+                **spreads[ticker],
+                "order": order,
+                "filled": True,
+                "mid_price": None,
+                "limit_price": limit_price,
+                "steps": 0,
+                "time_to_fill": None,
+            })
+        elif order.get("status") not in DEAD_STATUSES:
+            # The cancel has not taken effect yet; do not submit a second order
+            settled.add(ticker)
+    return results, settled
+
+def close_cycle() -> None:
+    """Close all positions, then mark the cycle whose fills awaited the close as closed."""
+    checkpoint = checkpoints.latest()
+    close_positions()
+    if checkpoint is not None and checkpoint.get("stage") == EXECUTED:
+        checkpoints.update(dt.date.fromisoformat(checkpoint["day"]), stage=CLOSED)
+    checkpoints.prune(config.get("checkpoint", {}).get("keep", 30))
+
+def resume_cycle() -> None:
+    """
+    Pick up the last unfinished trade cycle after a restart.
+    
+    - Interrupted during execution with the session still open: resume the
+      execution from its checkpoint.
+    - Interrupted during execution and the session has since closed: settle
+      the orders it submitted and checkpoint their fills for the close.
+    - Fills awaiting a close whose scheduled time passed while the process
+      was down: close them now, if the market is open.
+    """
+    checkpoint = checkpoints.latest()
+    if checkpoint is None:
+        return
+    day = dt.date.fromisoformat(checkpoint["day"])
+    now = dt.datetime.now(eastern)
+    if checkpoint.get("stage") == CANDIDATES:
+        session = market_calendar.session(day)
+        if day == now.date() and session is not None and now < session[1]:
+            logger.info("Resuming interrupted trade execution for %s", day)
+            execute_trades()
+            return
+        logger.info("Session of %s ended during execution, settling its orders", day)
+        results, _ = recover_orders(checkpoint)
+        finish_execution(day, results)
+        checkpoint = checkpoints.load(day)
+
+    if not checkpoint.get("pending_closes"):
+        return
+    session = market_calendar.session(day)
+    close_at = next_position_close(session[1] if session is not None else eastern.localize(
+        dt.datetime.combine(day, dt.time(23, 59))
+    ))
+    today = market_calendar.session(now.date())
+    if close_at is not None and close_at <= now and today is not None and today[0] <= now < today[1]:
+        logger.info("Position close for the %s cycle was missed, closing now", day)
+        close_cycle()
+
+def ledger_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a trade ledger entry from a filled or partly filled execution result."""
+    order = result["order"]
+    fills = {leg.get("symbol"): leg for leg in order.get("legs") or []}
+    
+    def leg(name: str, side: str) -> Dict[str, Any]:
+        contract = result[f"{name}_contract"]
+        symbol = result[f"{name}_symbol"]
+        return {
+            "leg": name,
+            "symbol": symbol,
+            "side": side,
+            "expiry": contract.get("expiration_date"),
+            "strike": contract.get("strike_price"),
+            "price": fills.get(symbol, {}).get("filled_avg_price"),
+        }
+    
+    return {
+        "order_id": order["id"],
+        "client_order_id": order.get("client_order_id"),
+        "ticker": result["ticker"],
+        "qty": result.get("filled_qty") or result["qty"],
+        "recommendation": result["recommendation"],
+        "legs": [leg("long", "buy"), leg("short", "sell")],
+    }
+
+def reconcile_fills() -> None:
+    """Reconcile recent fills against the ledger and record realized P&L."""
+    lookback = dt.timedelta(days=config.get("reconciliation", {}).get("lookback_days", 3))
+    reconciliation_engine.reconcile(start=dt.datetime.now(eastern) - lookback)
+    trade_monitor.monitor()
+
+# Scheduler of the running trader, reported by trader_status
+active_scheduler: Optional[Scheduler] = None
+
+def trader_status() -> Dict[str, Any]:
+    """Liveness and state of the trading loop, served by the trader health endpoint."""
+    running = active_scheduler is not None and active_scheduler.running
+    return {
+        "status": "ok" if running else "stopped" if active_scheduler is not None else "starting",
+        "version": __version__,
+        "jobs": active_scheduler.next_runs() if active_scheduler is not None else {},
+        "circuit_breaker": circuit_breaker.states(),
+        "orders_in_flight": in_flight_orders.pending(),
+        "health": monitoring.sampler.latest(),
+        "positions": {
+            "live": book_is_live(),
+            "open": len(order_book.positions()),
+            "open_orders": len(order_book.open_orders()),
+            "unrealized_pl": order_book.unrealized_pl(position_price) if order_book.seeded.is_set() else None,
+        },
+        "streams": {
+            "stocks": stock_quotes.connected.is_set(),
+            "options": option_quotes.connected.is_set(),
+            "trade_updates": trade_updates.connected.is_set(),
+        },
+    }
+
+def trader() -> None:
+    """
+    Main trading loop.
+    
+    Runs a scheduler with the daily jobs, timed from the cached market calendar
+    so weekends and holidays are skipped and half-days close early:
+    - Hours before the close, warm up: find earnings events scheduled between
+      today's close and next day's open, filter them, select legs and persist
+      the candidates.
+    - At 15 minutes before market close, re-check the candidates' gates on fresh
+      data, then walk each spread's limit price from mid toward natural until filled.
+    - Then, on the next trading day at 15 minutes after market open,
+      close all positions.
+    - Every trading night, reconcile fills and record realized P&L.
+    - Every morning, re-fetch the market calendar and re-plan all jobs against it.
+    - On startup, resume the last cycle from its checkpoint if a restart
+      interrupted it.
+    """
+    if streaming_config.get("enabled", False):
+        stock_quotes.start()
+        option_quotes.start()
+        trade_updates.start()
+    monitoring.sampler.start()
+
+    global active_scheduler
+    scheduler_config = config.get("scheduler", {})
+    scheduler = active_scheduler = Scheduler(
+        max_workers=scheduler_config.get("max_workers", 4),
+        resync_interval=scheduler_config.get("resync_interval", 60),
+    )
+    scheduler.schedule("warm_up", warm_up, next_warm_up)
+    scheduler.schedule("trade_execution", execute_trades, next_trade_execution)
+    scheduler.schedule("position_close", close_cycle, next_position_close)
+    scheduler.schedule("reconciliation", reconcile_fills, next_reconciliation)
+    scheduler.schedule("calendar_refresh", functools.partial(refresh_calendar, scheduler), next_calendar_refresh)
+    scheduler.run_once("resume", resume_cycle)
+    scheduler.run()
 
 if __name__ == "__main__":
     # Enable signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    try:
+        bootstrap()
+    except ConfigError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    
     try:
         trader()
     except Exception as e:
@@ -3,10 +3,9 @@ import time
 import logging
 import datetime as dt
 import pytz
-from typing import List
-import pandas as pd
-import datetime as dt
-import os
+import uuid
+from typing import List, Optional
+from trading_bot.ledger import TradeLedger, get_ledger
 from concurrent.futures import (
     ThreadPoolExecutor,
     as_completed,
@@ -30,6 +29,8 @@ def wait_until(target_time):
 
 
 def get_spx_tickers() -> List[str]:
+    import pandas as pd
+
     try:
         spx_table = pd.read_html(
             "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
@@ -56,48 +57,55 @@ def log_trade(
     short_call, 
     long_symbol, 
     long_call, 
-    recommendation
+    recommendation,
+    order_id=None,
+    client_order_id=None,
+    ledger: Optional[TradeLedger] = None,
 ):
-    log_entry = {
-        "timestamp": dt.datetime.now().isoformat(),
+    """Record an opened calendar spread in the trade ledger."""
+    ledger = ledger or get_ledger()
+    ledger.record_trades([{
+        "order_id": order_id or uuid.uuid4().hex,
+        "client_order_id": client_order_id,
         "ticker": ticker,
         "qty": qty,
-        "short_symbol": short_symbol,
-        "short_expiry": short_call["expiry"],
-        "short_strike": short_call["strike"],
-        "short_price": short_call["price"],
-        "long_symbol": long_symbol,
-        "long_expiry": long_call["expiry"],
-        "long_strike": long_call["strike"],
-        "long_price": long_call["price"],
         "recommendation": recommendation,
-        "status": "Opened",
-        "closed_timestamp": "",
-        "pnl": "",
-    }
-
-    df = pd.DataFrame([log_entry])
-    log_file = "trade_log.csv"
-    df.to_csv(log_file, mode="a", index=False, header=not os.path.exists(log_file))
+        "opened_at": dt.datetime.now().isoformat(),
+        "legs": [
+            {
+                "leg": "short",
+                "symbol": short_symbol,
+                "side": "sell",
+                "expiry": short_call.get("expiry"),
+                "strike": short_call.get("strike"),
+                "price": short_call.get("price"),
+            },
+            {
+                "leg": "long",
+                "symbol": long_symbol,
+                "side": "buy",
+                "expiry": long_call.get("expiry"),
+                "strike": long_call.get("strike"),
+                "price": long_call.get("price"),
+            },
+        ],
+    }])
     logger.info("Trade logged successfully.")
     
 def update_log(
-    ticker, 
-    qty, 
-    short_symbol, 
+    order_id, 
     short_closed, 
-    long_symbol, 
     long_closed, 
-    
+    ledger: Optional[TradeLedger] = None,
 ):
-    log_file = "trade_log.csv"
-    if os.path.exists(log_file):
-        df = pd.read_csv(log_file)
-        df["closed_timestamp"] = dt.datetime.now().isoformat()
-        df["pnl"] = df.apply(
-            lambda row: (row["long_price"] - row["short_price"]) * row["qty"], axis=1
-        )
-        df.to_csv(log_file, index=False)
-        logger.info("Trade log updated successfully.")
-    else:
-        logger.warning("Trade log file does not exist.")
\ No newline at end of file
+    """Record the close of a spread; pnl is computed from the legs' open and close prices."""
+    ledger = ledger or get_ledger()
+    if ledger.get_order(order_id) is None:
+        logger.warning("Trade %s not found in ledger.", order_id)
+        return
+    ledger.record_closes([{
+        "order_id": order_id,
+        "short_price": short_closed.get("price"),
+        "long_price": long_closed.get("price"),
+    }])
+    logger.info("Trade log updated successfully.")
@@ -1,31 +1,63 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 import json
+import math
+import logging
 import os
+import threading
 from datetime import datetime, timedelta
-import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from trading_bot.spread_store import SpreadStore, DEFAULT_STORE_PATH
+from trading_bot.log_index import MetricsLogIndex
+from trading_bot.ledger import DEFAULT_LEDGER_PATH, get_ledger
+from trading_bot.summary import SummaryAggregator
+from trading_bot import events
+from trading_bot.metrics import CACHE_REQUESTS, CONTENT_TYPE, registry
+from trading_bot.pagination import Page, decode_cursor, downsample, stream_json, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Columns served by /api/trades; leg metadata stays on disk
+TRADE_HISTORY_COLUMNS = [
+    'scan_date', 'ticker', 'earnings_datetime', 'recommendation', 'expected_move',
+    'short_symbol', 'short_strike_price', 'short_expiration_date',
+    'long_symbol', 'long_strike_price', 'long_expiration_date',
+]
+
+logger = logging.getLogger("trading_bot")
 
 app = Flask(__name__)
 
-def load_health_metrics() -> List[Dict[str, Any]]:
-    """Load health metrics from log file."""
+health_index = MetricsLogIndex(os.path.join('logs', 'health_metrics.log'))
+performance_index = MetricsLogIndex(os.path.join('logs', 'performance_metrics.log'))
+summary_aggregator = SummaryAggregator(DEFAULT_LEDGER_PATH, health_index)
+trade_store_path = DEFAULT_STORE_PATH
+
+# Range of the metrics endpoints when no start is given
+DEFAULT_HISTORY = timedelta(hours=24)
+
+# Seconds between keep-alive comments on idle event streams
+STREAM_KEEPALIVE = 15.0
+
+def load_health_metrics(hours: float = 24) -> List[Dict[str, Any]]:
+    """Load health metrics of the last ``hours`` from the log index."""
     try:
-        with open('logs/health_metrics.log', 'r') as f:
-            return [json.loads(line) for line in f.readlines()]
+        return health_index.since(datetime.now() - timedelta(hours=hours))
     except Exception:
         return []
 
-def load_performance_metrics() -> List[Dict[str, Any]]:
-    """Load performance metrics from log file."""
+def load_performance_metrics(hours: float = 24) -> List[Dict[str, Any]]:
+    """Load performance metrics of the last ``hours`` from the log index."""
     try:
-        with open('logs/performance_metrics.log', 'r') as f:
-            return [json.loads(line) for line in f.readlines()]
+        return performance_index.since(datetime.now() - timedelta(hours=hours))
     except Exception:
         return []
 
-def load_trade_history() -> List[Dict[str, Any]]:
-    """Load trade history from CSV file."""
+def load_trade_history(store_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load trade history from the spread store, falling back to the legacy CSV file."""
     try:
+        store = SpreadStore(store_path or trade_store_path)
+        if store.exists():
+            return store.scan(columns=TRADE_HISTORY_COLUMNS).to_pylist()
+        import pandas as pd
+
         return pd.read_csv('calendar_spreads.csv').to_dict('records')
     except Exception:
         return []
@@ -35,77 +67,250 @@ def index():
     """Render the main dashboard."""
     return render_template('index.html')
 
+def parse_history_params() -> Dict[str, Any]:
+    """
+    Parse the paging and range query parameters shared by the history endpoints.
+
+    ``start``/``end`` are ISO timestamps, ``limit`` the page size, ``cursor``
+    the ``next_cursor`` of the previous page and ``bucket`` a downsampling
+    width in seconds.
+
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    args = request.args
+    start = args.get('start')
+    end = args.get('end')
+    cursor = args.get('cursor')
+    limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    bucket = args.get('bucket')
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    if bucket is not None and int(bucket) <= 0:
+        raise ValueError("bucket must be a positive number of seconds")
+    return {
+        'start': datetime.fromisoformat(start) if start else None,
+        'end': datetime.fromisoformat(end) if end else None,
+        'cursor': decode_cursor(cursor) if cursor else None,
+        'limit': limit,
+        'bucket': int(bucket) if bucket else None,
+    }
+
+def metrics_response(index: MetricsLogIndex) -> Response:
+    """
+    Stream a page of (optionally downsampled) metrics, defaulting to the last 24 hours.
+
+    Without any range or paging parameters, the 24 hours are downsampled into
+    buckets just wide enough to fit one page, so the newest samples are never
+    cut off by the page size.
+    """
+    try:
+        params = parse_history_params()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not request.args:
+        # A window of N seconds spans at most ceil(N / width) + 1 aligned buckets
+        params['bucket'] = math.ceil(DEFAULT_HISTORY.total_seconds() / max(params['limit'] - 1, 1))
+    start = params['start'] or datetime.now() - DEFAULT_HISTORY
+    if params['cursor']:
+        # Records at the cursor's own timestamp are needed to skip past them
+        start = max(start, datetime.fromisoformat(params['cursor'][0]) - timedelta(microseconds=1))
+    records = index.iter_range(start, params['end'])
+    if params['bucket']:
+        records = downsample(records, params['bucket'], lambda r: datetime.fromisoformat(r['timestamp']))
+    page = Page(records, key=lambda r: r['timestamp'], limit=params['limit'], cursor=params['cursor'])
+    return Response(stream_with_context(stream_json(page)), mimetype='application/json')
+
+def iter_trade_history(start=None, end=None, store_path: Optional[str] = None):
+    """Trade history in scan date order, one record batch at a time."""
+    store = SpreadStore(store_path or trade_store_path)
+    if not store.exists():
+        yield from load_trade_history(store_path)
+        return
+    for batch in store.iter_batches(columns=TRADE_HISTORY_COLUMNS, start=start, end=end, sort_by='ticker'):
+        yield from batch.to_pylist()
+
+def trade_key(trade: Dict[str, Any]) -> str:
+    return str(trade.get('scan_date') or trade.get('Earnings DateTime', ''))
+
 @app.route('/api/health')
 def health_metrics():
     """Get health metrics."""
-    metrics = load_health_metrics()
-    # Get last 24 hours of data
-    cutoff = datetime.now() - timedelta(hours=24)
-    recent_metrics = [
-        m for m in metrics 
-        if datetime.fromisoformat(m['timestamp']) > cutoff
-    ]
-    return jsonify(recent_metrics)
+    return metrics_response(health_index)
 
 @app.route('/api/performance')
 def performance_metrics():
     """Get performance metrics."""
-    metrics = load_performance_metrics()
-    # Get last 24 hours of data
-    cutoff = datetime.now() - timedelta(hours=24)
-    recent_metrics = [
-        m for m in metrics 
-        if datetime.fromisoformat(m['timestamp']) > cutoff
-    ]
-    return jsonify(recent_metrics)
+    return metrics_response(performance_index)
 
 @app.route('/api/trades')
 def trades():
     """Get trade history."""
-    trades = load_trade_history()
-    return jsonify(trades)
+    try:
+        params = parse_history_params()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    start = params['start'].date() if params['start'] else None
+    if params['cursor']:
+        cursor_date = datetime.fromisoformat(params['cursor'][0]).date()
+        start = max(start, cursor_date) if start else cursor_date
+    end = params['end'].date() if params['end'] else None
+    page = Page(iter_trade_history(start, end), key=trade_key, limit=params['limit'], cursor=params['cursor'])
+    return Response(stream_with_context(stream_json(page)), mimetype='application/json')
 
 @app.route('/api/summary')
 def summary():
-    """Get summary statistics."""
-    trades = load_trade_history()
-    performance = load_performance_metrics()
-    health = load_health_metrics()
-
-    if not trades:
-        return jsonify({
-            'total_trades': 0,
-            'win_rate': 0,
-            'total_pnl': 0,
-            'system_health': 'Unknown'
-        })
-
-    # Calculate trade statistics
-    total_trades = len(trades)
-    winning_trades = sum(1 for t in trades if t.get('pnl', 0) > 0)
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-    total_pnl = sum(t.get('pnl', 0) for t in trades)
-
-    # Get latest system health
-    latest_health = health[-1] if health else {}
-    system_health = 'Healthy'
-    if latest_health:
-        if (latest_health.get('cpu_usage', 0) > 80 or 
-            latest_health.get('memory_usage', 0) > 80 or 
-            latest_health.get('disk_usage', 0) > 80):
-            system_health = 'Warning'
-        if (latest_health.get('cpu_usage', 0) > 90 or 
-            latest_health.get('memory_usage', 0) > 90 or 
-            latest_health.get('disk_usage', 0) > 90):
-            system_health = 'Critical'
-
-    return jsonify({
-        'total_trades': total_trades,
-        'win_rate': win_rate,
-        'total_pnl': total_pnl,
-        'system_health': system_health
-    })
+    """Get summary statistics, answering 304 while they are unchanged."""
+    data, etag, last_modified = summary_aggregator.snapshot()
+    response = jsonify(data)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    response = response.make_conditional(request)
+    CACHE_REQUESTS.inc(cache="summary", result="hit" if response.status_code == 304 else "miss")
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Expose in-process metrics in the Prometheus text format."""
+    return Response(registry.render(), mimetype=CONTENT_TYPE)
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize a bus event as a server-sent event."""
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+@app.route('/api/stream')
+def stream():
+    """
+    Push trader events as server-sent events.
+
+    ``topics`` selects a comma-separated subset of health, fill, order_status,
+    position and circuit_breaker. Reconnecting clients resume after ``Last-Event-ID``.
+    """
+    topics = [t for t in request.args.get('topics', '').split(',') if t] or None
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    subscription = events.bus.subscribe(topics, after_id=last_id)
+
+    def generate():
+        with subscription:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = subscription.get(timeout=STREAM_KEEPALIVE)
+                yield format_sse(event) if event else ': keep-alive\n\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+class StoreEventFeed:
+    """
+    Publish the trader's events on this process's bus from the shared stores.
+
+    In the split modes the trader runs in another process, so its in-process
+    events never reach a web worker's ``/api/stream``. The feed polls the
+    health log index and the ledger's change marker instead, publishing each
+    new health sample and a fill event for every order or close recorded since
+    the last poll. Records that already exist when the feed starts are not
+    replayed.
+    """
+
+    def __init__(self, health_index: MetricsLogIndex, ledger_path: str = DEFAULT_LEDGER_PATH,
+                 poll_interval: float = 5.0):
+        self.health_index = health_index
+        self.ledger_path = ledger_path
+        self.poll_interval = poll_interval
+        self._health_at: Optional[datetime] = None
+        self._marker: Optional[tuple] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Poll the stores on a daemon thread every ``poll_interval`` seconds."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.poll()
+        self._thread = threading.Thread(target=self._run, name='store-event-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Failed to publish store events: {str(e)}")
+
+    def poll(self) -> int:
+        """
+        Publish events for records added since the last poll.
+
+        Returns:
+            Number of events published
+        """
+        return self._poll_health() + self._poll_ledger()
+
+    def _poll_health(self) -> int:
+        latest = self.health_index.latest()
+        if latest is None:
+            return 0
+        if self._health_at is None:
+            self._health_at = datetime.fromisoformat(latest['timestamp'])
+            return 0
+        samples = self.health_index.since(self._health_at)
+        for sample in samples:
+            events.publish(events.HEALTH, sample)
+        if samples:
+            self._health_at = datetime.fromisoformat(samples[-1]['timestamp'])
+        return len(samples)
+
+    def _poll_ledger(self) -> int:
+        if not os.path.exists(self.ledger_path):
+            # Everything in a ledger created later is new
+            self._marker = (0, 0)
+            return 0
+        ledger = get_ledger(self.ledger_path)
+        marker = ledger.last_ids()
+        previous, self._marker = self._marker, marker
+        if previous is None or marker == previous:
+            return 0
+        count = 0
+        for order in ledger.orders_since(previous[0]):
+            events.publish(events.FILL, order)
+            count += 1
+        for close in ledger.closes_since(previous[1]):
+            events.publish(events.FILL, close)
+            count += 1
+        return count
+
+store_feed = StoreEventFeed(health_index, DEFAULT_LEDGER_PATH)
+
+def configure(ledger_path: Optional[str] = None, store_path: Optional[str] = None) -> None:
+    """
+    Read the trader's ledger and spread store instead of the default paths.
+
+    Call before serving; forked web workers inherit the configuration.
+
+    Args:
+        ledger_path: The trader's ``ledger.path``
+        store_path: The trader's ``spread_store.path``
+    """
+    global summary_aggregator, trade_store_path
+    ledger_path = ledger_path or DEFAULT_LEDGER_PATH
+    summary_aggregator = SummaryAggregator(ledger_path, health_index)
+    store_feed.ledger_path = ledger_path
+    trade_store_path = store_path or DEFAULT_STORE_PATH
 
 def run_web_interface(host: str = '0.0.0.0', port: int = 5000) -> None:
     """Run the web interface."""
-    app.run(host=host, port=port) 
\ No newline at end of file
+    health_index.start()
+    performance_index.start()
+    app.run(host=host, port=port, threaded=True) 
\ No newline at end of file
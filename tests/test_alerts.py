@@ -0,0 +1,127 @@
+import threading
+import unittest
+from trading_bot.alerts import ALERTS, AlertDispatcher, DROP_NEWEST, MAX_MESSAGE_LENGTH, digests
+from trading_bot.monitoring import Monitoring
+
+
+class FakeSender:
+    """Records messages instead of sending them; can be held to simulate a slow network."""
+
+    def __init__(self):
+        self.messages = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, text):
+        self.release.wait(5)
+        self.messages.append(text)
+        return True
+
+
+class TestAlertDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.sender = FakeSender()
+
+    def make(self, **kwargs):
+        dispatcher = AlertDispatcher(self.sender, **kwargs)
+        self.addCleanup(dispatcher.stop, 5)
+        return dispatcher
+
+    def test_burst_is_coalesced_into_one_digest(self):
+        """Test alerts raised together are sent as one message."""
+        dispatcher = self.make(batch_seconds=60)
+        for i in range(3):
+            self.assertTrue(dispatcher.submit(f"alert {i}"))
+        self.assertTrue(dispatcher.flush(5))
+        self.assertEqual(len(self.sender.messages), 1)
+        self.assertIn("3 alerts", self.sender.messages[0])
+        self.assertIn("alert 2", self.sender.messages[0])
+
+    def test_repeats_are_suppressed_and_counted(self):
+        """Test repeated keys within the window are deduplicated."""
+        now = [0.0]
+        dispatcher = self.make(batch_seconds=0, dedup_seconds=60, clock=lambda: now[0])
+        self.assertTrue(dispatcher.submit("API down", key="api"))
+        self.assertFalse(dispatcher.submit("API down", key="api"))
+        self.assertFalse(dispatcher.submit("API down", key="api"))
+        now[0] = 61.0
+        self.assertTrue(dispatcher.submit("API down", key="api"))
+        dispatcher.flush(5)
+        self.assertEqual(dispatcher.suppressed, 2)
+        self.assertIn("Repeated 2 more times", "".join(self.sender.messages))
+
+    def test_full_queue_drop_policies(self):
+        """Test a full queue drops the oldest alert, or the new one under drop_newest."""
+        self.sender.release.clear()
+        oldest = self.make(maxsize=2, batch_seconds=60)
+        for i in range(4):
+            oldest.submit(f"alert {i}")
+        self.assertEqual(list(oldest._queue)[-2:], ["alert 2", "alert 3"])
+
+        newest = self.make(maxsize=2, batch_seconds=60, drop_policy=DROP_NEWEST)
+        results = [newest.submit(f"alert {i}") for i in range(3)]
+        self.assertFalse(results[-1])
+        self.assertEqual(newest.dropped, 1)
+        self.sender.release.set()
+
+    def test_submit_does_not_wait_for_sender(self):
+        """Test raising an alert returns while the sender is blocked."""
+        self.sender.release.clear()
+        dispatcher = self.make(batch_seconds=0)
+        dispatcher.submit("first")
+        finished = threading.Event()
+        threading.Thread(target=lambda: (dispatcher.submit("second"), finished.set())).start()
+        self.assertTrue(finished.wait(1))
+        self.sender.release.set()
+        self.assertTrue(dispatcher.flush(5))
+
+    def test_digests_split_at_alert_boundaries(self):
+        """Test long batches become several messages within the limit, each alert whole."""
+        alerts = [f"<b>alert {i}</b> " + "x" * 900 for i in range(10)]
+        messages = digests(alerts)
+        self.assertGreater(len(messages), 1)
+        self.assertEqual(sum(count for _, count in messages), 10)
+        for text, _ in messages:
+            self.assertLessEqual(len(text), MAX_MESSAGE_LENGTH)
+            self.assertEqual(text.count("<b>"), text.count("</b>"))
+
+        (text, count), = digests(["<i>" + "y &amp; " * 1000 + "</i>"])
+        self.assertEqual(count, 1)
+        self.assertLessEqual(len(text), MAX_MESSAGE_LENGTH)
+        self.assertNotIn("<i>", text)
+        self.assertRegex(text, r"(&amp;|[^&])…$")
+
+    def test_only_delivered_alerts_count_as_sent(self):
+        """Test a rejected part of a batch is counted as failed."""
+        results = iter([True, False, False])
+        sent = []
+        dispatcher = AlertDispatcher(lambda text: sent.append(text) or next(results), batch_seconds=60)
+        self.addCleanup(dispatcher.stop, 5)
+        before = {r: ALERTS.value(result=r) for r in ("sent", "failed")}
+        for i in range(6):
+            dispatcher.submit(f"alert {i} " + "x" * 1500)
+        self.assertTrue(dispatcher.flush(5))
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(ALERTS.value(result="sent") - before["sent"], 2)
+        self.assertEqual(ALERTS.value(result="failed") - before["failed"], 4)
+
+
+class TestMonitoringAlerts(unittest.TestCase):
+    def test_alerts_go_through_the_sender(self):
+        """Test Monitoring queues alerts on the swappable sender."""
+        sender = FakeSender()
+        monitoring = Monitoring({"monitoring": {"alert_batch_seconds": 0}}, sender=sender)
+        monitoring.alert_error("Order rejected")
+        monitoring.alert_error("Order rejected")
+        monitoring.dispatcher.flush(5)
+        monitoring.close()
+        self.assertEqual(len(sender.messages), 1)
+        self.assertIn("Order rejected", sender.messages[0])
+
+    def test_disabled_without_telegram(self):
+        """Test alerts are not queued when no sender is configured."""
+        self.assertFalse(Monitoring({}).send_telegram_message("hello"))
+
+
+if __name__ == "__main__":
+    unittest.main()
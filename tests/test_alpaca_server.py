@@ -0,0 +1,173 @@
+import datetime as dt
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from trading_bot.api_client import AlpacaAPIClient
+from trading_bot.orders import InFlightOrders, client_order_id, submit_order
+from trading_bot.sandbox.alpaca_server import AlpacaSandboxServer, FaultProfile, SandboxFixtures
+
+TODAY = dt.date(2025, 1, 6)
+LONG = 'AAPL250221C00150000'
+SHORT = 'AAPL250117C00150000'
+
+
+def spread_payload(limit_price, order_id='cs-test', qty=2):
+    return {
+        'client_order_id': order_id,
+        'type': 'limit',
+        'limit_price': f'{limit_price:.2f}',
+        'time_in_force': 'day',
+        'order_class': 'mleg',
+        'qty': str(qty),
+        'legs': [
+            {'side': 'buy', 'position_intent': 'buy_to_open', 'symbol': LONG, 'ratio_qty': '1'},
+            {'side': 'sell', 'position_intent': 'sell_to_open', 'symbol': SHORT, 'ratio_qty': '1'},
+        ],
+    }
+
+
+class TestSandboxFixtures(unittest.TestCase):
+    def test_same_seed_same_data(self):
+        """Test generated prices, contracts and quotes depend only on the seed."""
+        first = SandboxFixtures(seed=7, today_fn=lambda: TODAY)
+        second = SandboxFixtures(seed=7, today_fn=lambda: TODAY)
+        self.assertEqual(first.stock_price('MSFT'), second.stock_price('MSFT'))
+        self.assertEqual(first.contracts('MSFT'), second.contracts('MSFT'))
+        symbol = first.contracts('MSFT', dt.date(2025, 1, 17), 'call')[0]['symbol']
+        self.assertEqual(first.option_quote(symbol), second.option_quote(symbol))
+        self.assertNotEqual(first.stock_price('MSFT'), SandboxFixtures(seed=8).stock_price('MSFT'))
+
+    def test_quotes_and_calendar(self):
+        """Test later expiries price higher, pinned quotes win and holidays are closed."""
+        fixtures = SandboxFixtures(
+            prices={'AAPL': 150.0}, quotes={'X250117C00010000': {'bid': 1, 'ask': 1.2}},
+            holidays=['2025-01-20'], today_fn=lambda: TODAY,
+        )
+        near, far = fixtures.option_quote(SHORT), fixtures.option_quote(LONG)
+        self.assertLess(near['bid'], near['ask'])
+        self.assertGreater(far['bid'], near['ask'])
+        self.assertEqual(fixtures.option_quote('X250117C00010000'), {'bid': 1.0, 'ask': 1.2})
+        self.assertIsNone(fixtures.option_quote('AAPL'))
+        days = [session['date'] for session in fixtures.calendar(dt.date(2025, 1, 17), dt.date(2025, 1, 21))]
+        self.assertEqual(days, ['2025-01-17', '2025-01-21'])
+
+    def test_fault_profile_is_seeded(self):
+        """Test the same seed injects the same failures and the rate limit window applies."""
+        def failures(profile):
+            return [profile.decide()[1] for _ in range(50)]
+
+        self.assertEqual(
+            failures(FaultProfile(error_rate=0.2, rate_limit_rate=0.1, seed=3)),
+            failures(FaultProfile(error_rate=0.2, rate_limit_rate=0.1, seed=3)),
+        )
+        self.assertEqual(set(failures(FaultProfile(error_rate=0.2, rate_limit_rate=0.1, seed=3))), {None, 429, 500})
+        limited = FaultProfile(requests_per_minute=3)
+        self.assertEqual(failures(limited)[:5], [None, None, None, 429, 429])
+
+
+class TestAlpacaSandboxServer(unittest.TestCase):
+    def setUp(self):
+        fixtures = SandboxFixtures(seed=1, prices={'AAPL': 150.0}, today_fn=lambda: TODAY)
+        self.server = AlpacaSandboxServer(fixtures, api_key='test_key')
+        self.server.start()
+        self.client = AlpacaAPIClient(self.server.url, 'test_key', 'test_secret', data_url=self.server.url)
+        backoff = patch('trading_bot.api_client.exponential_backoff', return_value=0)
+        backoff.start()
+        self.addCleanup(backoff.stop)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def spread_mid(self):
+        long_quote = self.server.fixtures.option_quote(LONG)
+        short_quote = self.server.fixtures.option_quote(SHORT)
+        return (long_quote['bid'] + long_quote['ask'] - short_quote['bid'] - short_quote['ask']) / 2
+
+    def test_market_data_endpoints(self):
+        """Test the client's market data, contract and calendar requests are served."""
+        trades = self.client.get('stocks/trades/latest', params={'symbols': 'AAPL'}, base='data')
+        self.assertEqual(trades['trades']['AAPL']['p'], 150.0)
+        contracts = self.client.get(
+            '/options/contracts',
+            params={'underlying_symbols': 'AAPL', 'expiration_date': '2025-01-17', 'type': 'call'},
+        )['option_contracts']
+        self.assertIn(SHORT, [contract['symbol'] for contract in contracts])
+        quotes = self.client.get('/options/quotes/latest', params={'symbols': SHORT}, base='data')
+        self.assertEqual(quotes['quotes'][SHORT]['bid'], self.server.fixtures.option_quote(SHORT)['bid'])
+        calendar = self.client.get('calendar', params={'start': '2025-01-06', 'end': '2025-01-12'})
+        self.assertEqual(len(calendar), 5)
+
+    def test_rejects_unknown_key(self):
+        """Test requests with another API key are unauthorized."""
+        response = requests.get(f'{self.server.url}/v2/positions', headers={'APCA-API-KEY-ID': 'other'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_order_walks_to_fill_and_closes(self):
+        """Test a limit below mid works, a replace at mid fills and positions follow the fills."""
+        order = self.client.post('/orders', payload=spread_payload(self.spread_mid() - 0.5), retries=1)
+        self.assertEqual(order['status'], 'new')
+        self.assertEqual(self.client.get('orders', params={'status': 'open'})[0]['id'], order['id'])
+
+        replacement = self.client.patch(
+            f"/orders/{order['id']}", payload={'limit_price': f'{self.spread_mid() + 0.01:.2f}'}, retries=1
+        )
+        self.assertEqual(replacement['status'], 'filled')
+        self.assertAlmostEqual(float(replacement['filled_avg_price']), self.spread_mid(), places=3)
+        original = self.client.get(f"orders/{order['id']}")
+        self.assertEqual((original['status'], original['replaced_by']), ('replaced', replacement['id']))
+
+        positions = {position['symbol']: position['qty'] for position in self.client.get('positions')}
+        self.assertEqual(positions, {LONG: '2', SHORT: '-2'})
+        fills = self.client.get('account/activities/FILL', params={'direction': 'asc', 'page_size': 1})
+        self.assertEqual(len(fills), 1)
+        rest = self.client.get('account/activities/FILL', params={'direction': 'asc', 'page_token': fills[0]['id']})
+        self.assertEqual([fill['symbol'] for fill in fills + rest], [LONG, SHORT])
+
+        self.assertEqual(self.client.delete(f'/positions/{LONG}')['status'], 'filled')
+        self.assertEqual([position['symbol'] for position in self.client.get('positions')], [SHORT])
+
+    def test_client_order_ids_are_unique(self):
+        """Test a resubmitted client order id is rejected and found by lookup instead."""
+        cycle_id = client_order_id(TODAY, 'AAPL', [(LONG, 'buy'), (SHORT, 'sell')])
+        placed = self.client.post('/orders', payload=spread_payload(1.0, cycle_id), retries=1)
+        self.assertIsNone(self.client.post('/orders', payload=spread_payload(1.0, cycle_id), retries=1))
+        self.assertEqual(self.server.request_counts['POST /orders 422'], 1)
+
+        # A restarted process that may have placed the order recovers it without posting again
+        in_flight = InFlightOrders()
+        in_flight.may_exist(cycle_id)
+        recovered = submit_order(self.client, spread_payload(1.0, cycle_id), in_flight)
+        self.assertEqual(recovered['id'], placed['id'])
+        self.assertEqual(len(self.server.orders()), 1)
+
+    def test_injected_failures_are_retried(self):
+        """Test the client retries through injected 500s and 429s."""
+        self.server.faults = FaultProfile(error_rate=0.3, rate_limit_rate=0.2, seed=5)
+        for _ in range(20):
+            self.assertIsNotNone(self.client.get('positions', retries=10))
+        counts = self.server.request_counts
+        self.assertGreater(counts.get('GET /positions 500', 0) + counts.get('GET /positions 429', 0), 0)
+        self.assertEqual(counts['GET /positions 200'], 20)
+        self.assertGreater(self.client.stats.summary()['GET /positions']['retries'], 0)
+
+    def test_latency_and_concurrency(self):
+        """Test injected latency delays responses and concurrent requests are served in parallel."""
+        self.server.faults = FaultProfile(latency=0.2)
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self.client.get, args=('positions',)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 8 * 0.2)
+        self.assertGreater(self.server.max_concurrency, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
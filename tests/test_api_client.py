@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+from unittest.mock import Mock, patch
+import requests
+from trading_bot.api_client import AlpacaAPIClient
+from trading_bot.latency import LatencyHistogram, RequestStats, normalize_endpoint
+from trading_bot.monitoring import APIMonitor
+
+
+def response(status, body=b'{"ok": true}'):
+    mock = Mock(status_code=status, content=body)
+    mock.json.return_value = {"ok": True}
+    if status >= 400:
+        mock.raise_for_status.side_effect = requests.HTTPError(f"{status} error")
+    return mock
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_error(self):
+        """Test percentiles are accurate to the bucket resolution."""
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+        percentiles = histogram.percentiles()
+        self.assertAlmostEqual(percentiles["p50"], 0.5, delta=0.5 * 0.04)
+        self.assertAlmostEqual(percentiles["p99"], 0.99, delta=0.99 * 0.04)
+        self.assertEqual(LatencyHistogram().percentiles()["p95"], None)
+
+    def test_normalize_endpoint(self):
+        """Test ids and option symbols are collapsed in labels."""
+        self.assertEqual(
+            normalize_endpoint("GET", "orders/61e69015-8549-4bfd-b9c3-01e75843f47d"), "GET /orders/{id}"
+        )
+        self.assertEqual(normalize_endpoint("DELETE", "/positions/AAPL240419C00100000"), "DELETE /positions/{id}")
+        self.assertEqual(normalize_endpoint("GET", "account/activities/FILL"), "GET /account/activities/FILL")
+
+    def test_thread_shards_are_merged(self):
+        """Test stats recorded from many threads add up."""
+        stats = RequestStats()
+
+        def work():
+            for _ in range(100):
+                shard = stats.shard("GET /orders")
+                shard.calls += 1
+                shard.latency.record(0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.summary()["GET /orders"]["calls"], 400)
+
+    def test_exited_threads_are_retired(self):
+        """Test a new thread pool per batch does not grow the shard list."""
+        stats = RequestStats()
+
+        def work():
+            stats.shard("GET /orders").calls += 1
+
+        for _ in range(10):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                for _ in range(8):
+                    pool.submit(work)
+        work()
+        self.assertEqual(stats.summary()["GET /orders"]["calls"], 81)
+        self.assertEqual(len(stats._shards), 1)
+
+
+class TestClientInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.client = AlpacaAPIClient("https://paper-api.example", "key", "secret")
+        self.monitor = APIMonitor(self.client)
+
+    def test_records_retries_status_codes_and_backoff(self):
+        """Test a call that succeeds on retry is fully accounted for."""
+        with patch("trading_bot.api_client.requests.request", side_effect=[response(429), response(200)]), \
+             patch("trading_bot.api_client.time.sleep") as sleep, \
+             patch("trading_bot.api_client.exponential_backoff", return_value=1.5):
+            self.assertEqual(self.client.post("/orders", payload={"qty": "1"}), {"ok": True})
+
+        sleep.assert_called_once_with(1.5)
+        stats = self.monitor.get_endpoint_stats()["POST /orders"]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["attempts"], 2)
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["status_codes"], {429: 1, 200: 1})
+        self.assertEqual(stats["backoff_seconds"], 1.5)
+        self.assertEqual(stats["bytes_sent"], 2 * len('{"qty": "1"}'))
+        self.assertEqual(stats["bytes_received"], 2 * len(b'{"ok": true}'))
+        self.assertIsNotNone(stats["p99"])
+
+    def test_monitor_receives_every_attempt(self):
+        """Test APIMonitor is fed by the client."""
+        with patch("trading_bot.api_client.requests.request", return_value=response(200)):
+            self.client.get("orders/abc")
+            self.client.get("orders/abc")
+        self.assertEqual(self.monitor.get_api_health()["total_requests"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import datetime as dt
+import os
+import tempfile
+import threading
+import unittest
+
+from trading_bot.checkpoint import CANDIDATES, CLOSED, EXECUTED, CheckpointStore
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(os.path.join(self.tmp_dir.name, 'checkpoints'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_update_merges_and_persists(self):
+        """Test updates merge into the day's checkpoint and survive a new store."""
+        day = dt.date(2024, 11, 29)
+        self.store.update(day, stage=CANDIDATES, spreads=[{'ticker': 'AAPL'}])
+        self.store.record_order(day, 'AAPL', {'order_id': 'o1'})
+        self.store.update(day, stage=EXECUTED, pending_closes=['o1'])
+
+        checkpoint = CheckpointStore(self.store.directory).load(day)
+        self.assertEqual(checkpoint['stage'], EXECUTED)
+        self.assertEqual(checkpoint['spreads'], [{'ticker': 'AAPL'}])
+        self.assertEqual(checkpoint['orders'], {'AAPL': {'order_id': 'o1'}})
+        self.assertEqual(os.listdir(self.store.directory), ['cycle_20241129.json'])
+
+    def test_latest_skips_closed_cycles(self):
+        """Test only an unfinished most recent cycle is returned."""
+        self.store.update(dt.date(2024, 11, 27), stage=EXECUTED)
+        self.store.update(dt.date(2024, 11, 29), stage=CANDIDATES)
+        self.assertEqual(self.store.latest()['day'], '2024-11-29')
+
+        self.store.update(dt.date(2024, 11, 29), stage=CLOSED)
+        self.assertIsNone(self.store.latest())
+
+    def test_concurrent_orders_are_all_kept(self):
+        """Test orders recorded from several threads all land in the checkpoint."""
+        day = dt.date(2024, 11, 29)
+        threads = [
+            threading.Thread(target=self.store.record_order, args=(day, f'T{i}', {'order_id': str(i)}))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.store.load(day)['orders']), 20)
+
+    def test_prune_keeps_most_recent(self):
+        """Test pruning deletes the oldest checkpoints."""
+        for day in range(1, 6):
+            self.store.update(dt.date(2024, 11, day), stage=CLOSED)
+        self.assertEqual(self.store.prune(keep=2), 3)
+        self.assertEqual(sorted(os.listdir(self.store.directory)), ['cycle_20241104.json', 'cycle_20241105.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
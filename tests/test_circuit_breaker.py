@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import Mock, patch
+import requests
+from trading_bot.api_client import AlpacaAPIClient
+from trading_bot.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, CircuitState, endpoint_class
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ValueError("boom")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=3, failure_rate_threshold=0.5, window_seconds=10, bucket_seconds=1,
+            recovery_timeout=30, half_open_max_calls=2, clock=self.clock,
+        )
+
+    def fail_times(self, n):
+        for _ in range(n):
+            with self.assertRaises(ValueError):
+                self.breaker.execute(fail)
+
+    def test_opens_on_failure_rate(self):
+        """Test the breaker trips on failure rate, not consecutive failures."""
+        for _ in range(4):
+            self.breaker.execute(lambda: None)
+        self.fail_times(3)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)  # 3 of 7 failed
+        self.fail_times(1)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.execute(lambda: None)
+
+    def test_old_failures_leave_the_window(self):
+        """Test failures older than the window no longer count."""
+        self.fail_times(2)
+        self.clock.now += 11
+        self.fail_times(2)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+        self.assertEqual(self.breaker.failure_count, 2)
+
+    def test_half_open_bounded_probes(self):
+        """Test half-open lets a bounded number of probes through and closes when they succeed."""
+        self.fail_times(3)
+        self.clock.now += 31
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        self.breaker.record_success()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        """Test a failed probe re-opens the breaker."""
+        self.fail_times(3)
+        self.clock.now += 31
+        self.fail_times(1)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_concurrent_outcomes_are_counted(self):
+        """Test outcomes recorded from many threads are not lost."""
+        breaker = CircuitBreaker(failure_threshold=10_000, clock=self.clock)
+
+        def work():
+            for _ in range(500):
+                breaker.record_failure()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(breaker.failure_count, 2000)
+
+    def test_execute_async(self):
+        """Test coroutines run under the breaker."""
+        async def fetch():
+            return 42
+
+        self.assertEqual(asyncio.run(self.breaker.execute_async(fetch)), 42)
+
+
+class TestRegistry(unittest.TestCase):
+    def test_breakers_are_isolated_per_endpoint_class(self):
+        """Test market data failures do not block orders."""
+        registry = CircuitBreakerRegistry(failure_threshold=1, overrides={"orders": {"failure_threshold": 5}})
+        transitions = []
+        registry.add_listener(lambda name, previous, state, *_: transitions.append((name, state)))
+        registry.get("market_data").record_failure()
+        self.assertEqual(registry.states(), {"market_data": "OPEN"})
+        self.assertTrue(registry.get("orders").allow())
+        self.assertEqual(registry.get("orders").failure_threshold, 5)
+        self.assertEqual(transitions, [("market_data", CircuitState.OPEN)])
+
+    def test_endpoint_class(self):
+        """Test endpoints map to their breaker's class."""
+        self.assertEqual(endpoint_class("/orders"), "orders")
+        self.assertEqual(endpoint_class("orders/abc"), "orders")
+        self.assertEqual(endpoint_class("/positions/AAPL"), "positions")
+        self.assertEqual(endpoint_class("options/contracts"), "contracts")
+        self.assertEqual(endpoint_class("/options/quotes/latest", base="data"), "market_data")
+
+
+class TestClientBreakers(unittest.TestCase):
+    def test_open_breaker_short_circuits_requests(self):
+        """Test the client stops calling an endpoint class whose breaker is open."""
+        registry = CircuitBreakerRegistry(failure_threshold=1)
+        client = AlpacaAPIClient("https://paper-api.example", "key", "secret", breakers=registry)
+        error = Mock(status_code=503, content=b"")
+        error.raise_for_status.side_effect = requests.HTTPError("503")
+        with patch("trading_bot.api_client.requests.request", return_value=error) as request, \
+             patch("trading_bot.api_client.time.sleep"):
+            self.assertIsNone(client.get("options/quotes/latest", base="data", retries=1))
+            self.assertIsNone(client.get("options/quotes/latest", base="data", retries=1))
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(registry.states()["market_data"], "OPEN")
+        self.assertTrue(registry.get("orders").allow())
+
+    def test_client_errors_do_not_trip(self):
+        """Test 4xx responses other than 429 do not count against the breaker."""
+        registry = CircuitBreakerRegistry(failure_threshold=1)
+        client = AlpacaAPIClient("https://paper-api.example", "key", "secret", breakers=registry)
+        rejected = Mock(status_code=422, content=b"")
+        rejected.raise_for_status.side_effect = requests.HTTPError("422", response=rejected)
+        with patch("trading_bot.api_client.requests.request", return_value=rejected), \
+             patch("trading_bot.api_client.time.sleep"):
+            self.assertIsNone(client.post("/orders", payload={}, retries=1))
+        self.assertEqual(registry.states()["orders"], "CLOSED")
+
+    def test_unexpected_exception_releases_probe(self):
+        """Test a half-open probe that raises is settled as a failure instead of leaking its slot."""
+        clock = Clock()
+        registry = CircuitBreakerRegistry(failure_threshold=1, recovery_timeout=30, half_open_max_calls=1, clock=clock)
+        client = AlpacaAPIClient("https://paper-api.example", "key", "secret", breakers=registry)
+        breaker = registry.get("positions")
+        breaker.record_failure()
+        clock.now += 31
+        with patch("trading_bot.api_client.requests.request", side_effect=KeyError("bad")):
+            with self.assertRaises(KeyError):
+                client.get("positions")
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        clock.now += 31
+        ok = Mock(status_code=200, content=b"[]")
+        ok.json.return_value = []
+        with patch("trading_bot.api_client.requests.request", return_value=ok):
+            self.assertEqual(client.get("positions"), [])
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from trading_bot.context import AppContext, ConfigError, LazyProxy, load_config
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def run_python(code, cwd):
+    env = {**os.environ, "PYTHONPATH": SRC}
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, timeout=60)
+
+
+class TestConfig(unittest.TestCase):
+    def test_config_errors(self):
+        """Test missing, malformed and incomplete configs raise ConfigError."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "config.json")
+            with self.assertRaises(ConfigError):
+                load_config(path)
+            with open(path, "w") as f:
+                f.write("{")
+            with self.assertRaises(ConfigError):
+                load_config(path)
+            with open(path, "w") as f:
+                json.dump({"api_key": "key"}, f)
+            with self.assertRaisesRegex(ConfigError, "api_secret"):
+                load_config(path)
+
+
+class TestAppContext(unittest.TestCase):
+    def test_builds_clients_from_config(self):
+        """Test the context wires the client to its circuit breakers."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            context = AppContext({
+                "api_key": "key",
+                "api_secret": "secret",
+                "base_url": "https://paper-api.example",
+                "ledger": {"path": os.path.join(tmp_dir, "ledger.db")},
+                "spread_store": {"path": os.path.join(tmp_dir, "spreads")},
+                "warmup": {"lead_minutes": 120},
+            })
+            self.assertIs(context.api_client.breakers, context.circuit_breaker)
+            self.assertEqual(context.warmup_config["lead_minutes"], 120)
+            context.trade_ledger.close()
+
+
+class TestLazyProxy(unittest.TestCase):
+    def test_created_on_first_use(self):
+        """Test the proxied object is only built when used, and forwards access."""
+        built = []
+
+        def factory():
+            if not built:
+                built.append({"a": 1})
+            return built[0]
+
+        proxy = LazyProxy(factory)
+        self.assertEqual(built, [])
+        self.assertEqual(proxy["a"], 1)
+        self.assertEqual(proxy.get("b", 2), 2)
+        self.assertIn("a", proxy)
+        with patch.dict(proxy, {"b": 3}):
+            self.assertEqual(built[0]["b"], 3)
+        self.assertNotIn("b", built[0])
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_without_config(self):
+        """Test importing the trader neither reads config.json nor exits."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = run_python("import trading_bot.trader, sys; print('ok')", tmp_dir)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "ok")
+
+    def test_web_interface_skips_heavy_imports(self):
+        """Test the web interface and trader import without pandas, pyarrow, yfinance or scipy."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = run_python(
+                "import sys, trading_bot.web_interface, trading_bot.trader; "
+                "print(sorted(m for m in ('pandas', 'pyarrow', 'yfinance', 'scipy') if m in sys.modules))",
+                tmp_dir,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
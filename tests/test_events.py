@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from trading_bot import events, web_interface
+from trading_bot.circuit_breaker import CircuitBreaker
+from trading_bot.events import EventBus
+from trading_bot.ledger import TradeLedger
+from trading_bot.log_index import MetricsLogIndex
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.bus = EventBus(history=10)
+
+    def test_topic_filtering(self):
+        """Test subscribers only receive their topics."""
+        with self.bus.subscribe([events.FILL]) as fills, self.bus.subscribe() as everything:
+            self.bus.publish(events.HEALTH, {"cpu_usage": 10})
+            self.bus.publish(events.FILL, {"ticker": "TEST"})
+            self.assertEqual(fills.get(timeout=0)["data"], {"ticker": "TEST"})
+            self.assertIsNone(fills.get(timeout=0))
+            self.assertEqual(everything.get(timeout=0)["topic"], events.HEALTH)
+
+    def test_full_queue_drops_oldest(self):
+        """Test slow subscribers lose the oldest events, not the newest."""
+        subscription = self.bus.subscribe(maxsize=2)
+        for i in range(5):
+            self.bus.publish(events.HEALTH, {"i": i})
+        self.assertEqual(subscription.dropped, 3)
+        self.assertEqual([subscription.get(timeout=0)["data"]["i"] for _ in range(2)], [3, 4])
+
+    def test_resume_after_last_event_id(self):
+        """Test retained events after a given id are replayed."""
+        first = self.bus.publish(events.FILL, {"n": 1})
+        self.bus.publish(events.FILL, {"n": 2})
+        with self.bus.subscribe(after_id=first["id"]) as subscription:
+            self.assertEqual(subscription.get(timeout=0)["data"], {"n": 2})
+            self.assertIsNone(subscription.get(timeout=0))
+
+    def test_circuit_breaker_transitions_are_published(self):
+        """Test circuit breaker state changes reach the bus."""
+        with patch.object(events, "bus", self.bus), self.bus.subscribe([events.CIRCUIT_BREAKER]) as subscription:
+            breaker = CircuitBreaker(failure_threshold=1)
+            with self.assertRaises(ValueError):
+                breaker.execute(lambda: (_ for _ in ()).throw(ValueError("boom")))
+            self.assertEqual(subscription.get(timeout=0)["data"]["to"], "OPEN")
+
+
+class TestStreamEndpoint(unittest.TestCase):
+    def test_streams_events(self):
+        """Test the SSE endpoint pushes published events."""
+        bus = EventBus()
+        with patch.object(events, "bus", bus):
+            response = web_interface.app.test_client().get("/api/stream?topics=fill")
+            self.assertEqual(response.mimetype, "text/event-stream")
+            chunks = iter(response.response)
+            self.assertTrue(next(chunks).startswith(b"retry:"))
+            bus.publish(events.FILL, {"ticker": "TEST"})
+            chunk = next(chunks).decode()
+            response.close()
+        lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+        self.assertEqual(lines["event"], "fill")
+        self.assertEqual(json.loads(lines["data"]), {"ticker": "TEST"})
+
+
+class TestStoreEventFeed(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp_dir.name, "health_metrics.log")
+        self.ledger_path = os.path.join(self.tmp_dir.name, "ledger.db")
+        self.write_sample("2024-04-18T12:00:00")
+        self.index = MetricsLogIndex(self.log_path, now_fn=lambda: web_interface.datetime(2024, 4, 18, 12, 5))
+        self.feed = web_interface.StoreEventFeed(self.index, self.ledger_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_sample(self, timestamp):
+        with open(self.log_path, "a") as f:
+            f.write(json.dumps({"timestamp": timestamp, "cpu_usage": 10}) + "\n")
+
+    def test_publishes_records_from_another_process(self):
+        """Test new health samples and ledger records written elsewhere reach the bus."""
+        bus = EventBus()
+        with patch.object(events, "bus", bus), bus.subscribe() as subscription:
+            self.assertEqual(self.feed.poll(), 0)
+            self.write_sample("2024-04-18T12:01:00")
+            ledger = TradeLedger(self.ledger_path)
+            ledger.record_trades([{"order_id": "o1", "ticker": "TEST", "qty": 1, "legs": []}])
+            self.assertEqual(self.feed.poll(), 2)
+            ledger.record_closes([{"order_id": "o1", "pnl": 5.0}])
+            self.assertEqual(self.feed.poll(), 1)
+            ledger.close()
+            self.assertEqual(self.feed.poll(), 0)
+
+            health = subscription.get(timeout=0)
+            self.assertEqual((health["topic"], health["data"]["timestamp"]), (events.HEALTH, "2024-04-18T12:01:00"))
+            order = subscription.get(timeout=0)
+            self.assertEqual((order["topic"], order["data"]["order_id"], order["data"]["qty"]), (events.FILL, "o1", 1))
+            close = subscription.get(timeout=0)
+            self.assertEqual((close["topic"], close["data"]["order_id"]), (events.FILL, "o1"))
+            self.assertIsNone(subscription.get(timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
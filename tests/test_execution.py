@@ -0,0 +1,136 @@
+import unittest
+from unittest.mock import Mock
+from trading_bot.execution import ExecutionEngine, summarize_executions
+
+CONFIG = {
+    "execution": {
+        "step": 0.05,
+        "step_interval": 0.0,
+        "poll_interval": 0.0,
+        "max_slippage": 0.10,
+    }
+}
+
+SPREAD = {"ticker": "TEST", "long_symbol": "TEST1", "short_symbol": "TEST2", "qty": 1}
+
+
+class TestExecutionEngine(unittest.TestCase):
+    def setUp(self):
+        self.api_client = Mock()
+        self.submit = Mock(return_value={"id": "order-0", "status": "new"})
+        self.quotes = Mock(return_value={"mid": 1.00, "natural": 1.30})
+
+    def engine(self):
+        return ExecutionEngine(self.api_client, self.submit, self.quotes, CONFIG)
+
+    def test_fills_at_mid(self):
+        """Test an order that fills without walking."""
+        self.api_client.get.return_value = {"id": "order-0", "status": "filled"}
+        result = self.engine().walk(SPREAD)
+
+        self.assertTrue(result["filled"])
+        self.assertEqual(result["steps"], 0)
+        self.assertEqual(self.submit.call_args[1]["limit_price"], 1.00)
+        self.api_client.patch.assert_not_called()
+
+    def test_walks_toward_natural(self):
+        """Test the limit is stepped up until the order fills."""
+        self.api_client.get.side_effect = [
+            {"id": "order-0", "status": "new"},
+            {"id": "order-1", "status": "filled"},
+        ]
+        self.api_client.patch.return_value = {"id": "order-1", "status": "new"}
+        result = self.engine().walk(SPREAD)
+
+        self.assertTrue(result["filled"])
+        self.assertEqual(result["steps"], 1)
+        self.assertAlmostEqual(result["limit_price"], 1.05)
+        self.api_client.patch.assert_called_once_with(
+            "/orders/order-0", payload={"limit_price": "1.05"}, retries=1
+        )
+
+    def test_cancels_at_slippage_bound(self):
+        """Test the walk stops and cancels at mid + max_slippage."""
+        self.api_client.get.return_value = {"id": "order-0", "status": "new"}
+        self.api_client.patch.side_effect = lambda endpoint, payload, retries: {
+            "id": "order-0",
+            "status": "new",
+        }
+        result = self.engine().walk(SPREAD)
+
+        self.assertFalse(result["filled"])
+        self.assertAlmostEqual(result["limit_price"], 1.10)
+        self.assertEqual(result["steps"], 2)
+        self.api_client.delete.assert_called_once_with("/orders/order-0", retries=1)
+
+    def test_follows_replacement_after_failed_replace(self):
+        """Test a replace that timed out but was accepted is followed instead of re-patching the old order."""
+        self.api_client.get.side_effect = [
+            {"id": "order-0", "status": "new", "limit_price": "1.00"},
+            {"id": "order-0", "status": "replaced", "replaced_by": "order-1"},
+            {"id": "order-1", "status": "new", "limit_price": "1.05"},
+            {"id": "order-1", "status": "filled", "limit_price": "1.05"},
+        ]
+        self.api_client.patch.return_value = None
+        result = self.engine().walk(SPREAD)
+
+        self.assertTrue(result["filled"])
+        self.assertEqual(result["order"]["id"], "order-1")
+        self.assertAlmostEqual(result["limit_price"], 1.05)
+        self.api_client.patch.assert_called_once()
+
+    def test_failed_replaces_are_capped(self):
+        """Test the walk cancels after repeated failed replaces instead of looping forever."""
+        self.api_client.get.return_value = {"id": "order-0", "status": "pending_replace"}
+        self.api_client.patch.return_value = None
+        result = self.engine().walk(SPREAD)
+
+        self.assertFalse(result["filled"])
+        self.assertEqual(self.api_client.patch.call_count, 3)
+        self.api_client.delete.assert_called_once_with("/orders/order-0", retries=1)
+
+    def test_partial_fill_before_cancel(self):
+        """Test the quantity filled before a cancel is reported."""
+        self.api_client.get.side_effect = [
+            {"id": "order-0", "status": "partially_filled", "filled_qty": "1"},
+            {"id": "order-0", "status": "partially_filled", "filled_qty": "1"},
+            {"id": "order-0", "status": "partially_filled", "filled_qty": "1"},
+            {"id": "order-0", "status": "canceled", "filled_qty": "1"},
+        ]
+        self.api_client.patch.side_effect = lambda endpoint, payload, retries: {"id": "order-0", "status": "new"}
+        result = self.engine().walk({**SPREAD, "qty": 3})
+
+        self.assertFalse(result["filled"])
+        self.assertEqual(result["filled_qty"], 1)
+
+    def test_on_submit_sees_accepted_order(self):
+        """Test the submit callback runs once the order is accepted, before the walk."""
+        self.api_client.get.return_value = {"id": "order-0", "status": "filled"}
+        on_submit = Mock(side_effect=RuntimeError("disk full"))
+        engine = ExecutionEngine(self.api_client, self.submit, self.quotes, CONFIG, on_submit=on_submit)
+        result = engine.walk(SPREAD)
+
+        on_submit.assert_called_once_with(SPREAD, {"id": "order-0", "status": "new"})
+        self.assertTrue(result["filled"])
+
+    def test_no_quotes_skips_submission(self):
+        """Test spreads without quotes are not submitted."""
+        self.quotes.return_value = None
+        result = self.engine().walk(SPREAD)
+
+        self.assertIsNone(result["order"])
+        self.submit.assert_not_called()
+
+    def test_execute_batch_kpis(self):
+        """Test batch execution and KPI summary."""
+        self.api_client.get.return_value = {"id": "order-0", "status": "filled"}
+        results = self.engine().execute_batch([SPREAD, {**SPREAD, "ticker": "OTHER"}])
+        kpis = summarize_executions(results)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(kpis["submitted"], 2)
+        self.assertEqual(kpis["fill_rate"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
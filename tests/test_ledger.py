@@ -0,0 +1,103 @@
+import csv
+import os
+import tempfile
+import unittest
+from trading_bot.ledger import TradeLedger, CSV_COLUMNS
+from trading_bot.utils import log_trade, update_log
+
+
+def spread(order_id, ticker="TEST"):
+    return {
+        "order_id": order_id,
+        "client_order_id": f"client-{order_id}",
+        "ticker": ticker,
+        "qty": 2,
+        "recommendation": "Recommended",
+        "legs": [
+            {"leg": "long", "symbol": f"{ticker}_LONG", "side": "buy", "expiry": "2024-05-17", "strike": "100", "price": "3.00"},
+            {"leg": "short", "symbol": f"{ticker}_SHORT", "side": "sell", "expiry": "2024-04-19", "strike": "100", "price": "2.00"},
+        ],
+    }
+
+
+class TestTradeLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ledger = TradeLedger(os.path.join(self.tmp_dir.name, "ledger.db"))
+
+    def tearDown(self):
+        self.ledger.close()
+        self.tmp_dir.cleanup()
+
+    def test_wal_mode(self):
+        """Test the database runs in WAL mode."""
+        mode = self.ledger._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_batched_insert_and_open_orders(self):
+        """Test batched inserts and reading open orders with legs."""
+        self.assertEqual(self.ledger.record_trades([spread("o1"), spread("o2", "OTHER")]), 2)
+        orders = self.ledger.open_orders()
+
+        self.assertEqual([o["order_id"] for o in orders], ["o1", "o2"])
+        self.assertEqual(len(orders[0]["legs"]), 2)
+
+    def test_orders_since(self):
+        """Test orders recorded after a rowid are returned oldest first."""
+        self.ledger.record_trades([spread("o1"), spread("o2", "OTHER")])
+        order_id, _ = self.ledger.last_ids()
+        self.ledger.record_trades([spread("o3")])
+
+        self.assertEqual([o["order_id"] for o in self.ledger.orders_since()], ["o1", "o2", "o3"])
+        self.assertEqual([o["order_id"] for o in self.ledger.orders_since(order_id)], ["o3"])
+
+    def test_close_computes_pnl(self):
+        """Test closes update only the targeted order and compute pnl."""
+        self.ledger.record_trades([spread("o1"), spread("o2")])
+        self.ledger.record_closes([{"order_id": "o1", "long_price": 3.50, "short_price": 1.00}])
+
+        closed = self.ledger.get_order("o1")
+        self.assertEqual(closed["status"], "Closed")
+        self.assertAlmostEqual(closed["pnl"], ((3.50 - 3.00) - (1.00 - 2.00)) * 2 * 100)
+        self.assertEqual(self.ledger.get_order("o2")["status"], "Opened")
+
+    def test_update_order_rejects_unknown_fields(self):
+        """Test only whitelisted columns can be updated."""
+        self.ledger.record_trades([spread("o1")])
+        self.assertTrue(self.ledger.update_order("o1", status="Filled"))
+        self.assertFalse(self.ledger.update_order("missing", status="Filled"))
+        with self.assertRaises(ValueError):
+            self.ledger.update_order("o1", ticker="NOPE")
+
+    def test_export_csv_layout(self):
+        """Test CSV export keeps the legacy trade_log.csv columns."""
+        self.ledger.record_trades([spread("o1")])
+        path = os.path.join(self.tmp_dir.name, "trade_log.csv")
+        self.assertEqual(self.ledger.export_csv(path), 1)
+
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0].keys()), CSV_COLUMNS)
+        self.assertEqual(rows[0]["short_symbol"], "TEST_SHORT")
+        self.assertEqual(rows[0]["long_price"], "3.0")
+
+    def test_log_trade_and_update_log(self):
+        """Test the utils helpers write through the ledger."""
+        log_trade(
+            ticker="TEST",
+            qty=1,
+            short_symbol="TEST_SHORT",
+            short_call={"expiry": "2024-04-19", "strike": 100, "price": 2.0},
+            long_symbol="TEST_LONG",
+            long_call={"expiry": "2024-05-17", "strike": 100, "price": 3.0},
+            recommendation="Consider",
+            order_id="o1",
+            ledger=self.ledger,
+        )
+        update_log("o1", short_closed={"price": 1.5}, long_closed={"price": 3.0}, ledger=self.ledger)
+
+        self.assertAlmostEqual(self.ledger.get_order("o1")["pnl"], 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import datetime as dt
+import json
+import os
+import tempfile
+import unittest
+from trading_bot.log_index import MetricsLogIndex
+
+NOW = dt.datetime(2024, 4, 18, 12, 0)
+
+
+def write_points(path, minutes, mode="a"):
+    with open(path, mode) as f:
+        for minute in minutes:
+            timestamp = NOW - dt.timedelta(minutes=minute)
+            f.write(json.dumps({"cpu_usage": minute, "timestamp": timestamp.isoformat()}) + "\n")
+
+
+class TestMetricsLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "health_metrics.log")
+        self.index = MetricsLogIndex(self.path, window=dt.timedelta(hours=1), now_fn=lambda: NOW)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_initial_load_skips_old_lines(self):
+        """Test only the window is loaded into memory on first refresh."""
+        write_points(self.path, range(180, -1, -10))
+        self.assertEqual(self.index.refresh(), 7)
+        self.assertEqual(self.index.latest()["cpu_usage"], 0)
+
+    def test_tails_new_lines_incrementally(self):
+        """Test only appended complete lines are parsed."""
+        write_points(self.path, [30, 20])
+        self.index.refresh()
+        write_points(self.path, [10])
+        with open(self.path, "a") as f:
+            f.write('{"cpu_usage": 5, "timest')
+        self.assertEqual(self.index.refresh(), 1)
+        with open(self.path, "a") as f:
+            f.write('amp": "%s"}\n' % (NOW - dt.timedelta(minutes=5)).isoformat())
+        self.assertEqual(self.index.refresh(), 1)
+        recent = self.index.since(NOW - dt.timedelta(minutes=15))
+        self.assertEqual([r["cpu_usage"] for r in recent], [10, 5])
+
+    def test_older_queries_binary_search_the_file(self):
+        """Test ranges beyond the ring are read from the file."""
+        write_points(self.path, range(300, -1, -1))
+        self.index.refresh()
+        expected = sum(len(self._line(minute)) for minute in range(300, 250, -1))
+        self.assertEqual(self.index.find_offset(NOW - dt.timedelta(minutes=250)), expected)
+        older = self.index.since(NOW - dt.timedelta(minutes=200), NOW - dt.timedelta(minutes=190))
+        self.assertEqual([r["cpu_usage"] for r in older], list(range(199, 189, -1)))
+
+    def test_truncated_file_is_reindexed(self):
+        """Test a rotated log is indexed from scratch."""
+        write_points(self.path, [30, 20, 10])
+        self.index.refresh()
+        write_points(self.path, [1], mode="w")
+        self.index.refresh()
+        self.assertEqual([r["cpu_usage"] for r in self.index.since(NOW - dt.timedelta(hours=1))], [1])
+
+    def _line(self, minute):
+        timestamp = NOW - dt.timedelta(minutes=minute)
+        return json.dumps({"cpu_usage": minute, "timestamp": timestamp.isoformat()}) + "\n"
+
+
+if __name__ == "__main__":
+    unittest.main()
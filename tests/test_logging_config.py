@@ -0,0 +1,50 @@
+import json
+import logging
+import queue
+import threading
+import unittest
+from trading_bot.logging_config import ContextFilter, ContextQueueHandler, JsonFormatter, RUN_ID, log_context
+
+
+class TestStructuredLogging(unittest.TestCase):
+    def setUp(self):
+        self.queue = queue.SimpleQueue()
+        self.handler = ContextQueueHandler(self.queue)
+        self.handler.addFilter(ContextFilter())
+        self.logger = logging.getLogger("trading_bot.test_logging_config")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def test_context_fields_are_captured_on_the_calling_thread(self):
+        """Test records carry the run, cycle and ticker context where they were logged."""
+        with log_context(cycle="trade_execution:20240301T1545"):
+            worker = threading.Thread(target=lambda: self.logger.info("no context"))
+            with log_context(ticker="AAPL"):
+                self.logger.info("walking %s", "AAPL")
+            worker.start()
+            worker.join()
+        walking, other = self.queue.get_nowait(), self.queue.get_nowait()
+        self.assertEqual(walking.getMessage(), "walking AAPL")
+        self.assertEqual((walking.run_id, walking.cycle, walking.ticker), (RUN_ID, "trade_execution:20240301T1545", "AAPL"))
+        self.assertEqual((other.cycle, other.ticker), (None, None))
+
+    def test_json_output(self):
+        """Test records are rendered as JSON with context, extra fields and the traceback."""
+        with log_context(ticker="MSFT"):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                self.logger.exception("order failed", extra={"order_id": "abc"})
+        entry = json.loads(JsonFormatter().format(self.queue.get_nowait()))
+        self.assertEqual(entry["message"], "order failed")
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["ticker"], "MSFT")
+        self.assertEqual(entry["order_id"], "abc")
+        self.assertIn("ValueError: boom", entry["exception"])
+        self.assertNotIn("cycle", entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
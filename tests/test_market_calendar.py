@@ -0,0 +1,77 @@
+import datetime as dt
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from trading_bot.market_calendar import MarketCalendar, eastern
+
+SESSIONS = [
+    {'date': '2024-12-23', 'open': '09:30', 'close': '16:00'},
+    {'date': '2024-12-24', 'open': '09:30', 'close': '13:00'},
+    {'date': '2024-12-26', 'open': '09:30', 'close': '16:00'},
+    {'date': '2024-12-27', 'open': '09:30', 'close': '16:00'},
+]
+
+
+class TestMarketCalendar(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'calendar.json')
+        self.client = Mock()
+        self.client.get.return_value = SESSIONS
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def calendar(self, client=None):
+        return MarketCalendar(
+            client or self.client, path=self.path, horizon_days=10, today_fn=lambda: dt.date(2024, 12, 23)
+        )
+
+    def test_sessions_from_one_bulk_fetch(self):
+        """Test holidays, half-days and next sessions are answered from one fetch."""
+        calendar = self.calendar()
+        self.assertFalse(calendar.is_trading_day(dt.date(2024, 12, 25)))
+        self.assertEqual(
+            calendar.session(dt.date(2024, 12, 24)),
+            (eastern.localize(dt.datetime(2024, 12, 24, 9, 30)), eastern.localize(dt.datetime(2024, 12, 24, 13, 0))),
+        )
+        self.assertEqual(calendar.next_session(dt.date(2024, 12, 24))[0].date(), dt.date(2024, 12, 26))
+        self.assertEqual(
+            [market_open.date() for market_open, _ in calendar.sessions_from(dt.date(2024, 12, 25), 2)],
+            [dt.date(2024, 12, 26), dt.date(2024, 12, 27)],
+        )
+        self.client.get.assert_called_once_with('calendar', params={'start': '2024-12-16', 'end': '2025-01-04'})
+
+    def test_restart_reads_persisted_calendar(self):
+        """Test a new calendar loads the persisted sessions without calling the API."""
+        self.calendar().refresh()
+        client = Mock()
+        calendar = self.calendar(client)
+        self.assertTrue(calendar.is_trading_day(dt.date(2024, 12, 26)))
+        client.get.assert_not_called()
+
+    def test_stale_calendar_is_refetched(self):
+        """Test a persisted calendar older than max_age_hours is refreshed on load."""
+        self.calendar().refresh()
+        calendar = self.calendar()
+        calendar.max_age = dt.timedelta(0)
+        calendar.session(dt.date(2024, 12, 26))
+        self.assertEqual(self.client.get.call_count, 2)
+
+    def test_unavailable_calendar_assumes_regular_hours(self):
+        """Test weekdays trade regular hours when the calendar cannot be fetched."""
+        self.client.get.return_value = None
+        calendar = self.calendar()
+        self.assertEqual(
+            calendar.session(dt.date(2024, 12, 24)),
+            (eastern.localize(dt.datetime(2024, 12, 24, 9, 30)), eastern.localize(dt.datetime(2024, 12, 24, 16, 0))),
+        )
+        self.assertIsNone(calendar.session(dt.date(2024, 12, 28)))
+        # Failed fetches are not retried on every lookup
+        self.assertEqual(self.client.get.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from trading_bot.metrics import MetricsRegistry
+from trading_bot.monitoring import APIMonitor
+from trading_bot.web_interface import app
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        """Test labelled counters and gauges render in the text format."""
+        requests = self.registry.counter("requests_total", "Requests.", ["outcome"])
+        requests.inc(outcome="ok")
+        requests.inc(2, outcome="ok")
+        usage = self.registry.gauge("usage_percent", "Usage.")
+        usage.set(42.5)
+        self.assertEqual(requests.value(outcome="ok"), 3)
+        text = self.registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{outcome="ok"} 3.0', text)
+        self.assertIn("usage_percent 42.5", text)
+        with self.assertRaises(ValueError):
+            requests.inc(-1, outcome="ok")
+        with self.assertRaises(ValueError):
+            requests.inc(stage="scan")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        latency = self.registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            latency.observe(value)
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 3', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("latency_seconds_sum 6.05", text)
+        self.assertIn("latency_seconds_count 4", text)
+
+    def test_registration_is_idempotent(self):
+        """Test re-declaring a metric returns the same family."""
+        first = self.registry.counter("jobs_total", "Jobs.")
+        self.assertIs(self.registry.counter("jobs_total", "Jobs."), first)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("jobs_total", "Jobs.")
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def test_exposes_monitor_metrics(self):
+        """Test monitors feed the shared registry served at /metrics."""
+        APIMonitor(api_client=None).track_request("GET /orders", success=True, response_time=0.2)
+        response = app.test_client().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        body = response.get_data(as_text=True)
+        self.assertIn('trading_bot_api_requests_total{endpoint="GET /orders",outcome="success"}', body)
+        self.assertIn("trading_bot_pipeline_stage_seconds", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
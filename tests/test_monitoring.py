@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from trading_bot.monitoring import APIMonitor, HealthSampler, Monitoring, RingBuffer, TradeMonitor
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_wraps_and_evicts_oldest(self):
+        """Test the buffer keeps the newest records in a fixed capacity."""
+        ring = RingBuffer(3, {"value": np.int64})
+        evicted = [ring.append(value=i) for i in range(5)]
+        self.assertEqual(evicted, [None, None, None, {"value": 0}, {"value": 1}])
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.column("value").tolist(), [2, 3, 4])
+        self.assertEqual(ring.last(2)["value"].tolist(), [3, 4])
+
+
+class TestAPIMonitor(unittest.TestCase):
+    def test_rolling_error_rate_and_percentiles(self):
+        """Test window statistics track only the most recent requests."""
+        monitor = APIMonitor(api_client=None, capacity=50, window=10)
+        for i in range(10):
+            monitor.track_request("orders", success=False, response_time=1.0)
+        self.assertEqual(monitor.get_api_health()["error_rate"], 1.0)
+
+        for i in range(100):
+            monitor.track_request("orders", success=i % 10 != 0, response_time=float(i % 10))
+        health = monitor.get_api_health()
+        self.assertAlmostEqual(health["error_rate"], 0.1)
+        self.assertEqual(health["total_requests"], 110)
+        self.assertEqual(len(monitor.request_history), 50)
+        self.assertAlmostEqual(health["latency_p50"], 4.5)
+        self.assertEqual(health["status"], "degraded")
+
+
+class TestTradeMonitor(unittest.TestCase):
+    def test_bounded_history(self):
+        """Test trade history and recent trades are bounded."""
+        monitor = TradeMonitor(capacity=5, recent=2)
+        for i in range(8):
+            monitor.track_trade({"order_id": str(i), "success": True, "profit_loss": 10.0})
+        metrics = monitor.get_trade_metrics()
+        self.assertEqual(metrics["total_trades"], 8)
+        self.assertEqual(metrics["profit_loss"], 80.0)
+        self.assertEqual([t["order_id"] for t in metrics["recent_trades"]], ["6", "7"])
+        self.assertEqual(len(monitor.trade_history), 5)
+
+
+class TestHealthSampler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "health_metrics.log")
+
+    def lines(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return f.read().splitlines()
+
+    def test_samples_are_flushed_in_batches(self):
+        """Test samples are buffered and written once the batch is full."""
+        sampler = HealthSampler(log_path=self.path, flush_size=3)
+        for _ in range(2):
+            sampler.record(sampler.sample())
+        self.assertEqual(self.lines(), [])
+        sampler.record(sampler.sample())
+        self.assertEqual(len(self.lines()), 3)
+        self.assertEqual(len(sampler.series), 3)
+        self.assertGreater(sampler.series.column("process_rss")[-1], 0)
+
+    def test_background_sampling(self):
+        """Test the sampler thread collects on its cadence and flushes on stop."""
+        sampler = HealthSampler(interval=0.01, log_path=self.path, flush_size=1000)
+        sampler.start()
+        deadline = time.monotonic() + 5
+        while len(sampler.series) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sampler.stop(5)
+        self.assertFalse(sampler.running)
+        self.assertGreaterEqual(len(self.lines()), 3)
+        self.assertEqual(
+            set(sampler.latest()),
+            {"cpu_usage", "memory_usage", "disk_usage", "process_rss", "process_threads", "open_fds", "timestamp"},
+        )
+
+    def test_health_check_does_not_block(self):
+        """Test a health check returns without waiting on a CPU measurement interval."""
+        monitoring = Monitoring({})
+        monitoring.sampler.log_path = self.path
+        started = time.monotonic()
+        health = monitoring.check_system_health()
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertIn("open_fds", health)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import time
+import unittest
+from unittest.mock import Mock
+
+from trading_bot.order_book import OrderBook
+from trading_bot.sandbox.trade_server import TradeUpdateServer
+from trading_bot.streaming import TradeUpdateStream, trade_stream_url
+
+LONG = 'AAPL241220C00200000'
+SHORT = 'AAPL241129C00200000'
+
+
+def spread_order(filled_qty, status='partially_filled', long_price='5.00', short_price='3.00'):
+    """A multi-leg calendar spread order with both legs filled ``filled_qty`` contracts."""
+    return {
+        'id': 'o1',
+        'status': status,
+        'legs': [
+            {'id': 'o1-long', 'symbol': LONG, 'side': 'buy', 'filled_qty': str(filled_qty),
+             'filled_avg_price': long_price},
+            {'id': 'o1-short', 'symbol': SHORT, 'side': 'sell', 'filled_qty': str(filled_qty),
+             'filled_avg_price': short_price},
+        ],
+    }
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.api_client = Mock()
+        self.api_client.get.side_effect = lambda endpoint, params=None: {
+            'positions': [{'symbol': 'MSFT', 'qty': '2', 'avg_entry_price': '1.00', 'current_price': '1.50'}],
+            'orders': [],
+        }[endpoint]
+        self.book = OrderBook(self.api_client)
+        self.assertTrue(self.book.seed())
+
+    def test_fills_update_positions(self):
+        """Test partial and full fills of a spread build both legs' positions."""
+        self.book.apply({'event': 'partial_fill', 'order': spread_order(4)})
+        self.book.apply({'event': 'fill', 'order': spread_order(10, 'filled', long_price='5.30')})
+
+        long_position = self.book.position(LONG)
+        self.assertEqual(long_position['qty'], '10')
+        self.assertEqual(long_position['side'], 'long')
+        self.assertAlmostEqual(float(long_position['avg_entry_price']), 5.30)
+        self.assertEqual(self.book.position(SHORT)['qty'], '-10')
+        self.assertEqual(self.book.open_orders(), [])
+
+    def test_duplicate_updates_counted_once(self):
+        """Test replaying the same update does not double the position."""
+        update = {'event': 'fill', 'order': spread_order(10, 'filled')}
+        self.book.apply(update)
+        self.book.apply(update)
+        self.assertEqual(self.book.position(LONG)['qty'], '10')
+
+    def test_closing_fill_removes_position(self):
+        """Test selling out a position removes it from the book."""
+        self.book.apply({'event': 'fill', 'order': {
+            'id': 'o2', 'status': 'filled', 'symbol': 'MSFT', 'side': 'sell', 'filled_qty': '2',
+            'filled_avg_price': '1.40',
+        }})
+        self.assertIsNone(self.book.position('MSFT'))
+
+    def test_position_qty_corrects_seed_race(self):
+        """Test a fill already counted in seeded orders but not positions is restored from position_qty."""
+        self.api_client.get.side_effect = lambda endpoint, params=None: {
+            'positions': [],
+            # The order filled between the positions and the orders request
+            'orders': [{'id': 'o3', 'status': 'filled', 'symbol': 'MSFT', 'side': 'buy', 'filled_qty': '2',
+                        'filled_avg_price': '1.00'}],
+        }[endpoint]
+        self.assertTrue(self.book.seed())
+        self.assertIsNone(self.book.position('MSFT'))
+        self.book.apply({'event': 'fill', 'price': '1.00', 'position_qty': '2', 'order': {
+            'id': 'o3', 'status': 'filled', 'symbol': 'MSFT', 'side': 'buy', 'filled_qty': '2',
+            'filled_avg_price': '1.00',
+        }})
+        self.assertEqual(self.book.position('MSFT')['qty'], '2')
+
+    def test_unrealized_pl(self):
+        """Test unrealized P&L uses live prices, falling back to the seeded price."""
+        self.assertAlmostEqual(self.book.unrealized_pl(lambda symbol: None), 100.0)
+        self.assertAlmostEqual(self.book.unrealized_pl(lambda symbol: 2.0), 200.0)
+
+
+class TestTradeUpdateStream(unittest.TestCase):
+    def test_stream_keeps_book_current(self):
+        """Test the book is seeded on connect and follows updates from the stand-in server."""
+        server = TradeUpdateServer(api_key='test_key')
+        server.start()
+        api_client = Mock()
+        api_client.get.return_value = []
+        book = OrderBook(api_client)
+        stream = TradeUpdateStream(
+            server.url, 'test_key', 'test_secret', on_update=book.apply, on_connected=book.seed,
+            on_disconnected=book.invalidate, reconnect_delay=0.1,
+        )
+        try:
+            stream.start()
+            self.assertTrue(wait_for(book.seeded.is_set))
+            self.assertTrue(wait_for(lambda: server.listeners))
+            server.fill(spread_order(10, 'filled'))
+            self.assertTrue(wait_for(lambda: book.position(LONG) is not None))
+            self.assertEqual(book.position(SHORT)['qty'], '-10')
+
+            # A dropped connection marks the book stale until it is reseeded
+            server.stop()
+            self.assertTrue(wait_for(lambda: not book.seeded.is_set()))
+        finally:
+            stream.stop()
+            server.stop()
+
+    def test_trade_stream_url(self):
+        """Test the trading stream URL is derived from the API base URL."""
+        self.assertEqual(
+            trade_stream_url('https://paper-api.alpaca.markets'), 'wss://paper-api.alpaca.markets/stream'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import datetime as dt
+import threading
+import unittest
+from unittest.mock import Mock
+
+from trading_bot.orders import InFlightOrders, client_order_id, submit_order
+
+LEGS = [('AAPL241220C00200000', 'buy'), ('AAPL241129C00200000', 'sell')]
+
+
+class TestClientOrderId(unittest.TestCase):
+    def test_deterministic(self):
+        """Test the id depends only on cycle, ticker, legs and attempt."""
+        cycle = dt.date(2024, 11, 29)
+        first = client_order_id(cycle, 'AAPL', LEGS)
+        self.assertEqual(first, client_order_id(cycle, 'AAPL', list(reversed(LEGS))))
+        self.assertTrue(first.startswith('cs-20241129-AAPL-'))
+        self.assertNotEqual(first, client_order_id(cycle + dt.timedelta(days=1), 'AAPL', LEGS))
+        self.assertNotEqual(first, client_order_id(cycle, 'AAPL', LEGS, attempt=1))
+        self.assertLessEqual(len(client_order_id(cycle, 'X' * 200, LEGS)), 128)
+
+
+class TestSubmitOrder(unittest.TestCase):
+    def setUp(self):
+        self.api_client = Mock()
+        self.in_flight = InFlightOrders()
+        self.payload = {'client_order_id': 'cs-1', 'type': 'limit'}
+
+    def test_submits_once(self):
+        """Test a successful submission posts once and never looks the order up."""
+        self.api_client.post.return_value = {'id': 'o1'}
+        self.assertEqual(submit_order(self.api_client, self.payload, self.in_flight), {'id': 'o1'})
+        self.api_client.get.assert_not_called()
+        self.assertEqual(self.in_flight.get('cs-1'), {'id': 'o1'})
+
+    def test_resubmitting_returns_known_order(self):
+        """Test submitting an already accepted id returns the order without a request."""
+        self.api_client.post.return_value = {'id': 'o1'}
+        submit_order(self.api_client, self.payload, self.in_flight)
+        self.assertEqual(submit_order(self.api_client, self.payload, self.in_flight), {'id': 'o1'})
+        self.api_client.post.assert_called_once()
+
+    def test_lookup_before_retry(self):
+        """Test a failed post is followed by a lookup that finds the accepted order."""
+        self.api_client.post.return_value = None
+        self.api_client.get.side_effect = [None, {'id': 'o1'}]
+        self.assertEqual(submit_order(self.api_client, self.payload, self.in_flight, attempts=3), {'id': 'o1'})
+        self.assertEqual(self.api_client.post.call_count, 2)
+
+    def test_failed_submission_is_looked_up_next_time(self):
+        """Test an unanswered id is looked up before it is posted again."""
+        self.api_client.post.return_value = None
+        self.api_client.get.return_value = None
+        self.assertIsNone(submit_order(self.api_client, self.payload, self.in_flight, attempts=1))
+        self.assertTrue(self.in_flight.is_uncertain('cs-1'))
+
+        self.api_client.get.reset_mock()
+        self.api_client.get.return_value = {'id': 'o1'}
+        self.assertEqual(submit_order(self.api_client, self.payload, self.in_flight), {'id': 'o1'})
+        self.assertEqual(self.api_client.post.call_count, 1)
+
+    def test_concurrent_submissions_post_once(self):
+        """Test only one of several threads submitting the same id posts it."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def post(**kwargs):
+            started.set()
+            release.wait(2)
+            return {'id': 'o1'}
+
+        self.api_client.post.side_effect = post
+        results = []
+        first = threading.Thread(target=lambda: results.append(submit_order(self.api_client, self.payload, self.in_flight)))
+        first.start()
+        started.wait(2)
+        self.assertIsNone(submit_order(self.api_client, self.payload, self.in_flight))
+        release.set()
+        first.join(2)
+        self.assertEqual(results, [{'id': 'o1'}])
+        self.api_client.post.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import datetime as dt
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from trading_bot import web_interface
+from trading_bot.log_index import MetricsLogIndex
+from trading_bot.pagination import Page, decode_cursor, downsample, stream_json
+
+
+def collect(records, limit, cursor=None):
+    page = Page(records, key=lambda r: r["k"], limit=limit, cursor=decode_cursor(cursor) if cursor else None)
+    return [r["n"] for r in page], page.next_cursor
+
+
+class TestPage(unittest.TestCase):
+    def test_pages_split_equal_keys(self):
+        """Test records sharing a key are neither repeated nor skipped across pages."""
+        records = [{"k": k, "n": n} for n, k in enumerate("aabbbbc")]
+        seen, cursor = [], None
+        while True:
+            page, cursor = collect(records, 3, cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(range(7)))
+
+    def test_last_page_has_no_cursor(self):
+        """Test an exactly full final page has no next cursor."""
+        self.assertEqual(collect([{"k": "a", "n": 0}, {"k": "b", "n": 1}], 2), ([0, 1], None))
+
+    def test_stream_json(self):
+        """Test the streamed envelope is valid JSON."""
+        page = Page([{"k": "a"}, {"k": "b"}], key=lambda r: r["k"], limit=1)
+        body = json.loads("".join(stream_json(page)))
+        self.assertEqual(body["data"], [{"k": "a"}])
+        self.assertIsNotNone(body["next_cursor"])
+
+    def test_invalid_cursor(self):
+        """Test malformed cursors are rejected."""
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestDownsample(unittest.TestCase):
+    def test_min_max_mean_per_bucket(self):
+        """Test numeric fields are reduced per bucket."""
+        start = dt.datetime(2024, 4, 18, 12, 0)
+        records = [
+            {"timestamp": (start + dt.timedelta(minutes=m)).isoformat(), "cpu_usage": m, "host": "x"}
+            for m in range(120)
+        ]
+        buckets = list(downsample(records, 3600, lambda r: dt.datetime.fromisoformat(r["timestamp"])))
+        self.assertEqual(len(buckets), 2)
+        self.assertEqual(buckets[0]["count"], 60)
+        self.assertEqual(buckets[1]["cpu_usage"], {"min": 60, "max": 119, "mean": 89.5})
+        self.assertNotIn("host", buckets[0])
+
+
+class TestHistoryEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, "health_metrics.log")
+        now = dt.datetime.now()
+        with open(path, "w") as f:
+            for minute in range(100, 0, -1):
+                timestamp = (now - dt.timedelta(minutes=minute)).isoformat()
+                f.write(json.dumps({"cpu_usage": minute, "timestamp": timestamp}) + "\n")
+        self.index = MetricsLogIndex(path)
+        self.client = web_interface.app.test_client()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cursor_pagination(self):
+        """Test walking /api/health with cursors returns every sample once."""
+        seen, url = [], "/api/health?limit=30"
+        with patch.object(web_interface, "health_index", self.index):
+            while url:
+                body = self.client.get(url).get_json()
+                seen.extend(r["cpu_usage"] for r in body["data"])
+                url = f"/api/health?limit=30&cursor={body['next_cursor']}" if body["next_cursor"] else None
+        self.assertEqual(seen, list(range(100, 0, -1)))
+
+    def test_downsampled_range(self):
+        """Test bucketed health metrics over a time range."""
+        start = (dt.datetime.now() - dt.timedelta(minutes=50)).isoformat()
+        with patch.object(web_interface, "health_index", self.index):
+            body = self.client.get(f"/api/health?start={start}&bucket=600").get_json()
+        self.assertEqual(sum(bucket["count"] for bucket in body["data"]), 49)
+        self.assertLessEqual(len(body["data"]), 6)
+
+    def test_default_fits_newest_samples(self):
+        """Test a bare request downsamples the last 24 hours into one page ending with the newest sample."""
+        with patch.object(web_interface, "health_index", self.index):
+            body = self.client.get("/api/health").get_json()
+        self.assertIsNone(body["next_cursor"])
+        self.assertEqual(sum(bucket["count"] for bucket in body["data"]), 100)
+        self.assertEqual(body["data"][-1]["cpu_usage"]["min"], 1)
+
+    def test_bad_parameters(self):
+        """Test malformed parameters are rejected with 400."""
+        self.assertEqual(self.client.get("/api/health?limit=0").status_code, 400)
+        self.assertEqual(self.client.get("/api/trades?start=yesterday").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
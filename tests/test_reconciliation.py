@@ -0,0 +1,129 @@
+import datetime as dt
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from trading_bot.ledger import TradeLedger
+from trading_bot.monitoring import TradeMonitor
+from trading_bot.reconciliation import ReconciliationEngine
+
+
+def fill(fill_id, order_id, symbol, side, qty, price, time="2024-03-21T13:45:00Z"):
+    return {
+        "id": fill_id,
+        "activity_type": "FILL",
+        "order_id": order_id,
+        "symbol": symbol,
+        "side": side,
+        "qty": str(qty),
+        "price": str(price),
+        "transaction_time": time,
+    }
+
+
+class TestReconciliationEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ledger = TradeLedger(os.path.join(self.tmp_dir.name, "ledger.db"))
+        for order_id, ticker in (("spread-1", "AAA"), ("spread-2", "BBB")):
+            self.ledger.record_trades([{
+                "order_id": order_id,
+                "ticker": ticker,
+                "qty": 2,
+                "legs": [
+                    {"leg": "long", "symbol": f"{ticker}_LONG", "price": 3.0},
+                    {"leg": "short", "symbol": f"{ticker}_SHORT", "price": 2.0},
+                ],
+            }])
+        self.api_client = Mock()
+        self.monitor = TradeMonitor()
+        self.engine = ReconciliationEngine(self.api_client, self.ledger, self.monitor)
+
+    def tearDown(self):
+        self.ledger.close()
+        self.tmp_dir.cleanup()
+
+    def respond(self, fills, orders):
+        self.api_client.get.side_effect = lambda endpoint, params: (
+            fills if endpoint.startswith("account/activities") else orders
+        )
+
+    def test_realized_pnl_per_spread(self):
+        """Test opening fills override ledger prices and closing fills realize P&L."""
+        self.respond(
+            fills=[
+                # Opening fills on the spread's leg orders
+                fill("f1", "leg-1a", "AAA_LONG", "buy", 2, 3.10),
+                fill("f2", "leg-1b", "AAA_SHORT", "sell", 2, 2.00),
+                # Closing fills from the position close orders
+                fill("f3", "close-1", "AAA_LONG", "sell", 1, 3.50),
+                fill("f4", "close-2", "AAA_LONG", "sell", 1, 3.70),
+                fill("f5", "close-3", "AAA_SHORT", "buy", 2, 1.00),
+                # spread-2 only closed one leg
+                fill("f6", "close-4", "BBB_LONG", "sell", 2, 4.00),
+            ],
+            orders=[{"id": "spread-1", "submitted_at": "2024-03-20T19:45:00Z",
+                     "legs": [{"id": "leg-1a"}, {"id": "leg-1b"}]}],
+        )
+        realized = self.engine.reconcile(dt.datetime(2024, 3, 20, tzinfo=dt.timezone.utc))
+
+        self.assertEqual(realized.index.tolist(), ["spread-1"])
+        expected = ((3.60 - 3.10) - (1.00 - 2.00)) * 2 * 100
+        self.assertAlmostEqual(realized.loc["spread-1", "pnl"], expected)
+        self.assertAlmostEqual(realized.loc["spread-1", "long_price"], 3.60)
+
+        self.assertEqual(self.ledger.get_order("spread-1")["status"], "Closed")
+        self.assertAlmostEqual(self.ledger.get_order("spread-1")["pnl"], expected)
+        self.assertEqual(self.ledger.get_order("spread-2")["status"], "Opened")
+        self.assertAlmostEqual(self.monitor.profit_loss, expected)
+
+    def test_opening_fills_never_close(self):
+        """Test opening fills without their leg order mapping are not taken for closes."""
+        self.respond(
+            fills=[
+                fill("f1", "leg-1a", "AAA_LONG", "buy", 2, 3.10),
+                fill("f2", "leg-1b", "AAA_SHORT", "sell", 2, 2.00),
+            ],
+            orders=[],
+        )
+        realized = self.engine.reconcile(dt.datetime(2024, 3, 20, tzinfo=dt.timezone.utc))
+        self.assertTrue(realized.empty)
+        self.assertEqual(self.ledger.get_order("spread-1")["status"], "Opened")
+
+    def test_shared_legs_close_oldest_first(self):
+        """Test closes of a contract held by two spreads are split between them, oldest first."""
+        for order_id, opened_at in (("spread-3", "2024-03-19T19:45:00Z"), ("spread-4", "2024-03-20T19:45:00Z")):
+            self.ledger.record_trades([{
+                "order_id": order_id,
+                "ticker": "CCC",
+                "qty": 2,
+                "opened_at": opened_at,
+                "legs": [
+                    {"leg": "long", "symbol": "CCC_LONG", "price": 3.0},
+                    {"leg": "short", "symbol": "CCC_SHORT", "price": 2.0},
+                ],
+            }])
+        self.respond(
+            fills=[
+                fill("f1", "close-1", "CCC_LONG", "sell", 3, 3.50),
+                fill("f2", "close-2", "CCC_SHORT", "buy", 2, 1.00),
+                fill("f3", "close-3", "CCC_LONG", "sell", 1, 3.90, time="2024-03-21T14:00:00Z"),
+            ],
+            orders=[],
+        )
+        realized = self.engine.reconcile(dt.datetime(2024, 3, 20, tzinfo=dt.timezone.utc))
+
+        self.assertEqual(realized.index.tolist(), ["spread-3"])
+        self.assertAlmostEqual(realized.loc["spread-3", "pnl"], ((3.50 - 3.0) - (1.00 - 2.0)) * 2 * 100)
+        self.assertEqual(self.ledger.get_order("spread-4")["status"], "Opened")
+
+    def test_no_fills(self):
+        """Test reconciliation with no fills closes nothing."""
+        self.respond(fills=[], orders=[])
+        realized = self.engine.reconcile(dt.datetime(2024, 3, 20, tzinfo=dt.timezone.utc))
+        self.assertTrue(realized.empty)
+        self.assertEqual(len(self.ledger.open_orders()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+from trading_bot import run
+from trading_bot.run import HealthServer, load_serving_config
+
+
+class TestServingConfig(unittest.TestCase):
+    def test_defaults_and_overrides(self):
+        """Test the serving section overrides defaults."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "config.json")
+            with open(path, "w") as f:
+                json.dump({"serving": {"workers": 2}}, f)
+            settings = load_serving_config(path)
+        self.assertEqual(settings["workers"], 2)
+        self.assertEqual(settings["port"], 5000)
+        self.assertEqual(load_serving_config("missing.json")["workers"], 4)
+
+    def test_mode_dispatch(self):
+        """Test each mode runs its entry point."""
+        with patch.object(run, "run_trader") as run_trader, patch.object(run, "serve") as serve:
+            run.main(["--mode", "trader", "--config", "missing.json"])
+            run.main(["--mode", "serve", "--config", "missing.json"])
+        run_trader.assert_called_once()
+        serve.assert_called_once_with(run.DEFAULT_SERVING, "missing.json")
+
+    def test_web_reads_trader_paths(self):
+        """Test the web interface uses the ledger and spread store paths of the config."""
+        from trading_bot import web_interface
+
+        self.addCleanup(web_interface.configure)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "config.json")
+            with open(path, "w") as f:
+                json.dump({"ledger": {"path": "data/ledger.db"}, "spread_store": {"path": "data/spreads"}}, f)
+            run._configure_web(path)
+        self.assertEqual(web_interface.summary_aggregator.ledger_path, "data/ledger.db")
+        self.assertEqual(web_interface.store_feed.ledger_path, "data/ledger.db")
+        self.assertEqual(web_interface.trade_store_path, "data/spreads")
+
+
+class TestHealthServer(unittest.TestCase):
+    def setUp(self):
+        self.status = {"status": "ok", "jobs": {}}
+        self.server = HealthServer(lambda: self.status, port=0)
+        self.server.start()
+        self.url = f"http://127.0.0.1:{self.server.port}"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_healthy(self):
+        """Test a running trader reports 200 with its status."""
+        with urllib.request.urlopen(f"{self.url}/healthz") as response:
+            self.assertEqual(response.status, 200)
+            self.assertEqual(json.load(response), self.status)
+
+    def test_unhealthy(self):
+        """Test a trader that is not running reports 503."""
+        self.status = {"status": "starting"}
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{self.url}/healthz")
+        self.assertEqual(error.exception.code, 503)
+
+    def test_metrics(self):
+        """Test the trader's metrics are served next to its health check."""
+        with urllib.request.urlopen(f"{self.url}/metrics") as response:
+            self.assertEqual(response.status, 200)
+            self.assertIn("trading_bot_pipeline_stage_seconds", response.read().decode())
+
+    def test_unknown_path(self):
+        """Test other paths are not found."""
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{self.url}/")
+        self.assertEqual(error.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import datetime as dt
+import threading
+import time
+import unittest
+from trading_bot.scheduler import Scheduler, eastern
+
+
+def every(seconds):
+    """next_run function firing every ``seconds`` of wall-clock time."""
+    return lambda after: after + dt.timedelta(seconds=seconds)
+
+
+def once(seconds):
+    """next_run function firing a single time, ``seconds`` from scheduling."""
+    planned = []
+
+    def next_run(after):
+        if planned:
+            return None
+        planned.append(after)
+        return after + dt.timedelta(seconds=seconds)
+    return next_run
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler(max_workers=2, resync_interval=0.05)
+        self.thread = threading.Thread(target=self.scheduler.run, daemon=True)
+
+    def tearDown(self):
+        self.scheduler.stop()
+        if self.thread.is_alive():
+            self.thread.join(2)
+
+    def test_jobs_run_in_deadline_order(self):
+        """Test jobs are dispatched by due time, not insertion order."""
+        ran = []
+        done = threading.Event()
+
+        def record(name):
+            ran.append(name)
+            if len(ran) == 2:
+                done.set()
+
+        self.scheduler.schedule("late", lambda: record("late"), once(0.2))
+        self.scheduler.schedule("early", lambda: record("early"), once(0.05))
+        self.thread.start()
+
+        self.assertTrue(done.wait(2))
+        self.assertEqual(ran, ["early", "late"])
+
+    def test_recurring_job_is_rescheduled(self):
+        """Test a job is planned again after each run."""
+        runs = []
+        self.scheduler.schedule("tick", lambda: runs.append(time.monotonic()), every(0.05))
+        self.thread.start()
+        time.sleep(0.4)
+
+        self.assertGreaterEqual(len(runs), 3)
+        self.assertIsNotNone(self.scheduler.next_runs()["tick"])
+
+    def test_failing_job_keeps_schedule(self):
+        """Test an exception in a job does not stop the scheduler."""
+        runs = []
+
+        def fail():
+            runs.append(1)
+            raise RuntimeError("boom")
+
+        self.scheduler.schedule("fail", fail, every(0.05))
+        self.thread.start()
+        time.sleep(0.3)
+        self.assertGreaterEqual(len(runs), 2)
+
+    def test_run_once_survives_resync(self):
+        """Test a one-off job is kept across a resync and runs exactly once."""
+        runs = []
+        self.scheduler.run_once("resume", lambda: runs.append(1))
+        self.scheduler.resync()
+        self.thread.start()
+        time.sleep(0.3)
+        self.scheduler.resync()
+
+        self.assertEqual(runs, [1])
+        self.assertIsNone(self.scheduler.next_runs()["resume"])
+
+    def test_resync_survives_failing_next_run(self):
+        """Test a job whose next run cannot be computed does not stop a resync of the others."""
+        calls = []
+
+        def broken(after):
+            calls.append(after)
+            if len(calls) > 1:
+                raise RuntimeError("calendar unavailable")
+            return after + dt.timedelta(hours=1)
+
+        self.scheduler.schedule("broken", lambda: None, broken)
+        self.scheduler.schedule("tick", lambda: None, every(3600))
+        self.scheduler.resync()
+
+        next_runs = self.scheduler.next_runs()
+        self.assertIsNone(next_runs["broken"])
+        self.assertIsNotNone(next_runs["tick"])
+
+    def test_resync_after_wall_clock_jump(self):
+        """Test deadlines are recomputed when the wall clock jumps ahead."""
+        offset = [dt.timedelta(0)]
+        scheduler = Scheduler(resync_interval=0.05, now_fn=lambda: dt.datetime.now(eastern) + offset[0])
+        ran = threading.Event()
+        target = dt.datetime.now(eastern) + dt.timedelta(hours=1)
+        scheduler.schedule("later", ran.set, lambda after: target if after < target else None)
+
+        thread = threading.Thread(target=scheduler.run, daemon=True)
+        thread.start()
+        try:
+            self.assertFalse(ran.wait(0.1))
+            offset[0] = dt.timedelta(hours=2)  # e.g. the machine was suspended
+            self.assertTrue(ran.wait(2))
+        finally:
+            scheduler.stop()
+            thread.join(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
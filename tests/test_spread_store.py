@@ -0,0 +1,102 @@
+import datetime as dt
+import os
+import tempfile
+import unittest
+import pandas as pd
+from trading_bot.spread_store import SpreadStore
+
+
+def contract(symbol, expiry, strike="100"):
+    return {
+        "id": f"id-{symbol}",
+        "symbol": symbol,
+        "status": "active",
+        "tradable": True,
+        "expiration_date": expiry,
+        "underlying_symbol": "TEST",
+        "type": "call",
+        "strike_price": strike,
+        "multiplier": "100",
+        "open_interest": "1234",
+        "close_price": "2.5",
+    }
+
+
+def candidates(ticker="TEST"):
+    return pd.DataFrame([{
+        "Ticker": ticker,
+        "Earnings DateTime": "2024-04-18 20:00:00+00:00",
+        "Recommendation": "Recommended",
+        "Expected Move": "5.4%",
+        "Short Leg": contract(f"{ticker}_SHORT", "2024-04-19"),
+        "Long Leg": contract(f"{ticker}_LONG", "2024-05-17"),
+    }])
+
+
+class TestSpreadStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = SpreadStore(os.path.join(self.tmp_dir.name, "spreads"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_empty_store(self):
+        """Test reading before anything was written."""
+        self.assertFalse(self.store.exists())
+        self.assertEqual(self.store.scan(columns=["ticker"]).num_rows, 0)
+
+    def test_write_flattens_and_types_legs(self):
+        """Test leg dicts are stored as typed columns."""
+        self.assertEqual(self.store.write(candidates(), dt.date(2024, 4, 18)), 1)
+        row = self.store.scan().to_pylist()[0]
+        self.assertEqual(row["short_symbol"], "TEST_SHORT")
+        self.assertEqual(row["long_expiration_date"], dt.date(2024, 5, 17))
+        self.assertEqual(row["short_strike_price"], 100.0)
+        self.assertEqual(row["long_open_interest"], 1234)
+        self.assertEqual(row["expected_move"], 5.4)
+        self.assertEqual(row["scan_date"], dt.date(2024, 4, 18))
+
+    def test_projection_and_date_range(self):
+        """Test column projection and scan-date predicate pushdown."""
+        self.store.write(candidates("AAA"), dt.date(2024, 4, 17))
+        self.store.write(candidates("BBB"), dt.date(2024, 4, 18))
+        self.store.write(candidates("CCC"), dt.date(2024, 4, 19))
+
+        table = self.store.scan(columns=["ticker"], start=dt.date(2024, 4, 18))
+        self.assertEqual(table.column_names, ["ticker"])
+        self.assertEqual(sorted(table.column("ticker").to_pylist()), ["BBB", "CCC"])
+
+        frame = self.store.read(columns=["ticker"], start=dt.date(2024, 4, 17), end=dt.date(2024, 4, 17))
+        self.assertEqual(frame["ticker"].tolist(), ["AAA"])
+        self.assertEqual(sum(batch.num_rows for batch in self.store.iter_batches(columns=["ticker"])), 3)
+
+    def test_ordered_batches(self):
+        """Test ordered iteration visits partitions by scan date and sorts each day's rows."""
+        self.store.write(candidates("ZZZ"), dt.date(2024, 4, 19))
+        self.store.write(candidates("BBB"), dt.date(2024, 4, 17))
+        self.store.write(candidates("AAA"), dt.date(2024, 4, 19))
+        rows = [
+            (row["scan_date"], row["ticker"])
+            for batch in self.store.iter_batches(columns=["ticker", "scan_date"], sort_by="ticker")
+            for row in batch.to_pylist()
+        ]
+        self.assertEqual(rows, [
+            (dt.date(2024, 4, 17), "BBB"), (dt.date(2024, 4, 19), "AAA"), (dt.date(2024, 4, 19), "ZZZ"),
+        ])
+        self.assertEqual(self.store.scan_dates(start=dt.date(2024, 4, 18)), [dt.date(2024, 4, 19)])
+
+    def test_import_legacy_csv(self):
+        """Test migrating a calendar_spreads.csv with stringified leg dicts."""
+        path = os.path.join(self.tmp_dir.name, "calendar_spreads.csv")
+        legacy = candidates()
+        legacy["Expected Move"] = 5.4
+        legacy.to_csv(path, index=False)
+
+        self.assertEqual(self.store.import_csv(path), 1)
+        row = self.store.scan(columns=["ticker", "short_symbol", "scan_date"]).to_pylist()[0]
+        self.assertEqual(row, {"ticker": "TEST", "short_symbol": "TEST_SHORT", "scan_date": dt.date(2024, 4, 18)})
+
+
+if __name__ == "__main__":
+    unittest.main()
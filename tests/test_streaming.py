@@ -0,0 +1,65 @@
+import time
+import unittest
+from trading_bot.streaming import QuoteStream, headers_keyword
+from trading_bot.sandbox.quote_server import QuoteReplayServer
+
+RECORDED_QUOTES = [
+    {"T": "q", "S": "AAPL", "bp": 189.10, "ap": 189.14, "bs": 2, "as": 3, "t": "2024-03-20T15:45:00Z"},
+    {"T": "q", "S": "MSFT", "bp": 420.00, "ap": 420.10, "bs": 1, "as": 1, "t": "2024-03-20T15:45:00Z"},
+    {"T": "q", "S": "AAPL", "bp": 189.12, "ap": 189.16, "bs": 4, "as": 1, "t": "2024-03-20T15:45:01Z"},
+]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestQuoteStream(unittest.TestCase):
+    def setUp(self):
+        self.server = QuoteReplayServer(RECORDED_QUOTES, api_key="test_key")
+        self.server.start()
+        self.stream = QuoteStream(self.server.url, "test_key", "test_secret", reconnect_delay=0.1)
+
+    def tearDown(self):
+        self.stream.stop()
+        self.server.stop()
+
+    def test_latest_quote_table(self):
+        """Test subscribed symbols keep only their latest quote."""
+        self.stream.subscribe(["AAPL"])
+        self.stream.start()
+
+        self.assertTrue(wait_for(lambda: (self.stream.get_quote("AAPL") or {}).get("bid") == 189.12))
+        quote = self.stream.get_quote("AAPL")
+        self.assertEqual(quote["ask"], 189.16)
+        self.assertIsNone(self.stream.get_quote("MSFT"))
+
+    def test_subscribe_after_connect(self):
+        """Test symbols added while connected are subscribed immediately."""
+        self.stream.start()
+        self.assertTrue(self.stream.connected.wait(5))
+        self.stream.subscribe(["MSFT"])
+
+        self.assertTrue(wait_for(lambda: self.stream.get_quote("MSFT") is not None))
+        self.assertEqual(self.stream.get_quote("MSFT")["bid"], 420.00)
+
+    def test_stale_quotes_ignored(self):
+        """Test max_age filters out old quotes."""
+        self.stream.quotes["AAPL"] = {"bid": 1.0, "ask": 1.1, "received": time.monotonic() - 60}
+        self.assertIsNone(self.stream.get_quote("AAPL", max_age=5))
+        self.assertIsNotNone(self.stream.get_quote("AAPL"))
+
+    def test_headers_keyword_follows_websockets_version(self):
+        """Test request headers use the keyword the installed websockets accepts."""
+        self.assertEqual(headers_keyword("10.4"), "extra_headers")
+        self.assertEqual(headers_keyword("13.1"), "extra_headers")
+        self.assertEqual(headers_keyword("14.0"), "additional_headers")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from trading_bot.ledger import TradeLedger
+from trading_bot.summary import SummaryAggregator, system_health
+from trading_bot import web_interface
+
+
+def spread(order_id):
+    return {
+        "order_id": order_id,
+        "ticker": "TEST",
+        "qty": 1,
+        "legs": [
+            {"leg": "long", "symbol": "TEST_LONG", "price": "3.00"},
+            {"leg": "short", "symbol": "TEST_SHORT", "price": "2.00"},
+        ],
+    }
+
+
+class TestSummaryAggregator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "ledger.db")
+        self.ledger = TradeLedger(self.path)
+        self.health = Mock()
+        self.health.latest.return_value = {"cpu_usage": 85, "timestamp": "2024-04-18T12:00:00"}
+        self.aggregator = SummaryAggregator(self.path, self.health)
+
+    def tearDown(self):
+        self.ledger.close()
+        self.tmp_dir.cleanup()
+
+    def test_missing_ledger(self):
+        """Test an empty summary without creating the ledger."""
+        aggregator = SummaryAggregator(os.path.join(self.tmp_dir.name, "missing.db"))
+        summary, _, _ = aggregator.snapshot()
+        self.assertEqual(summary, {"total_trades": 0, "win_rate": 0, "total_pnl": 0.0, "system_health": "Unknown"})
+        self.assertFalse(os.path.exists(aggregator.ledger_path))
+
+    def test_running_totals(self):
+        """Test closes are folded in incrementally and the ETag tracks changes."""
+        with patch("trading_bot.summary.get_ledger", return_value=self.ledger):
+            self.ledger.record_trades([spread("o1"), spread("o2")])
+            self.ledger.record_closes([{"order_id": "o1", "pnl": 50.0}])
+            summary, etag, _ = self.aggregator.snapshot()
+            self.assertEqual(summary["total_trades"], 2)
+            self.assertEqual(summary["win_rate"], 100)
+            self.assertEqual(summary["system_health"], "Warning")
+
+            self.assertEqual(self.aggregator.snapshot()[1], etag)
+
+            with patch.object(self.ledger, "closes_since", wraps=self.ledger.closes_since) as closes_since:
+                self.ledger.record_closes([{"order_id": "o2", "pnl": -20.0}])
+                summary, new_etag, _ = self.aggregator.snapshot()
+                closes_since.assert_called_once_with(1)
+            self.assertNotEqual(new_etag, etag)
+            self.assertEqual(summary["win_rate"], 50)
+            self.assertEqual(summary["total_pnl"], 30.0)
+
+    def test_system_health(self):
+        """Test health classification thresholds."""
+        self.assertEqual(system_health({"cpu_usage": 10, "disk_usage": 95}), "Critical")
+        self.assertEqual(system_health({"memory_usage": 50}), "Healthy")
+        self.assertEqual(system_health(None), "Unknown")
+
+
+class TestSummaryEndpoint(unittest.TestCase):
+    def test_not_modified(self):
+        """Test an unchanged summary is answered with 304."""
+        aggregator = SummaryAggregator("missing.db")
+        with patch.object(web_interface, "summary_aggregator", aggregator):
+            client = web_interface.app.test_client()
+            response = client.get("/api/summary")
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNotNone(response.last_modified)
+            cached = client.get("/api/summary", headers={"If-None-Match": response.headers["ETag"]})
+            self.assertEqual(cached.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,10 +7,25 @@ from trading_bot.trader import (
     close_positions,
     get_todays_trades,
     add_retry_logic,
-    validate_trade_params
+    validate_trade_params,
+    next_trade_execution,
+    next_position_close,
+    refresh_candidates,
+    save_candidates,
+    load_candidates,
+    warm_up,
+    execute_trades,
+    finish_execution,
+    resume_cycle,
+    eastern
 )
+import tempfile
 import json
 from unittest.mock import mock_open
+import os
+from trading_bot.market_calendar import MarketCalendar
+from trading_bot.checkpoint import CANDIDATES, CLOSED, EXECUTED, CheckpointStore
+from trading_bot.orders import InFlightOrders
 
 class TestTrader(unittest.TestCase):
     def setUp(self):
@@ -70,6 +85,7 @@ class TestTrader(unittest.TestCase):
 
         # Mock both the API client and circuit breaker
         with patch('trading_bot.trader.api_client', mock_instance) as mock_client, \
+             patch('trading_bot.trader.in_flight_orders', InFlightOrders()), \
              patch('trading_bot.trader.circuit_breaker') as mock_circuit_breaker, \
              patch('builtins.open', mock_open(read_data=json.dumps(mock_config))):
 
@@ -89,17 +105,37 @@ class TestTrader(unittest.TestCase):
             self.assertEqual(call_args['endpoint'], '/orders')
             self.assertEqual(call_args['payload']['type'], 'limit')
             self.assertIn('limit_price', call_args['payload'])
+            self.assertTrue(call_args['payload']['client_order_id'].startswith('cs-'))
 
     def test_trade_calendar_spread_failure(self):
         """Test failed calendar spread trade."""
         self.mock_api_client.post.return_value = None
-        result = trade_calendar_spread(
-            long_symbol='TEST1',
-            short_symbol='TEST2',
-            qty=10
-        )
+        self.mock_api_client.get.return_value = None
+        with patch('trading_bot.trader.api_client', self.mock_api_client), \
+             patch('trading_bot.trader.in_flight_orders', InFlightOrders()):
+            result = trade_calendar_spread(
+                long_symbol='TEST1',
+                short_symbol='TEST2',
+                qty=10,
+                limit_price=1.0
+            )
         self.assertIsNone(result)
 
+    def test_trade_calendar_spread_recovers_accepted_order(self):
+        """Test a retry after a lost response finds the accepted order instead of posting again."""
+        mock_client = Mock()
+        mock_client.post.return_value = None
+        mock_client.get.return_value = {'id': 'accepted', 'client_order_id': 'cs-test'}
+        with patch('trading_bot.trader.api_client', mock_client), \
+             patch('trading_bot.trader.in_flight_orders', InFlightOrders()):
+            result = trade_calendar_spread('TEST1', 'TEST2', 10, limit_price=1.0, client_order_id='cs-test')
+
+        self.assertEqual(result['id'], 'accepted')
+        mock_client.post.assert_called_once()
+        mock_client.get.assert_called_once_with(
+            'orders:by_client_order_id', params={'client_order_id': 'cs-test'}, retries=1
+        )
+
     def test_close_positions_success(self):
         """Test successful position closing."""
         result = close_positions(positions=[
@@ -113,6 +149,23 @@ class TestTrader(unittest.TestCase):
         result = close_positions(positions=None)
         self.assertIsNone(result)
 
+    def test_close_positions_reads_live_order_book(self):
+        """Test positions to close come from the live order book instead of the API."""
+        mock_client = Mock()
+        mock_book = Mock()
+        mock_book.positions.return_value = [{'symbol': 'TEST1'}]
+        with patch('trading_bot.trader.api_client', mock_client), \
+             patch('trading_bot.trader.order_book', mock_book), \
+             patch('trading_bot.trader.trade_updates') as mock_stream, \
+             patch('trading_bot.trader.circuit_breaker') as mock_circuit_breaker:
+            mock_circuit_breaker.execute.side_effect = lambda func, *args, **kwargs: func(*args, **kwargs)
+            mock_book.seeded.is_set.return_value = True
+            mock_stream.connected.is_set.return_value = True
+            close_positions()
+
+        mock_client.get.assert_not_called()
+        mock_client.delete.assert_called_once_with('/positions/TEST1')
+
     def test_close_positions_invalid_data(self):
         """Test closing positions with invalid data."""
         result = close_positions(positions=[{'invalid': 'data'}])
@@ -154,6 +207,16 @@ class TestTrader(unittest.TestCase):
             self.assertIsInstance(result, pd.DataFrame)
             self.assertTrue(result.empty)
 
+    def test_failed_warm_up_saves_nothing(self):
+        """Test a scan error leaves no candidate set, so the execution job runs the full scan."""
+        with patch('trading_bot.trader.get_upcoming_earnings', side_effect=RuntimeError('earnings down')), \
+             patch('trading_bot.trader.next_trade_execution', return_value=dt.datetime.now(eastern)), \
+             patch('trading_bot.trader.overnight_days', return_value=1), \
+             patch('trading_bot.trader.save_candidates') as mock_save:
+            self.assertIsNone(get_todays_trades())
+            warm_up()
+            mock_save.assert_not_called()
+
     def test_retry_logic(self):
         """Test retry logic for rate-limited calls."""
         call_count = 0
@@ -170,5 +233,172 @@ class TestTrader(unittest.TestCase):
         self.assertEqual(result, "Success")
         self.assertEqual(call_count, 3)  # Should have been called 3 times
 
+    def test_next_session_times_use_market_calendar(self):
+        """Test job times skip closed days and honour early closes."""
+        mock_client = Mock()
+        mock_client.get.return_value = [
+            {'date': '2024-11-27', 'open': '09:30', 'close': '16:00'},
+            {'date': '2024-11-29', 'open': '09:30', 'close': '13:00'},
+            {'date': '2024-12-02', 'open': '09:30', 'close': '16:00'},
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            calendar = MarketCalendar(
+                mock_client,
+                path=os.path.join(tmp_dir, 'calendar.json'),
+                horizon_days=30,
+                today_fn=lambda: dt.date(2024, 11, 28),
+            )
+            with patch('trading_bot.trader.market_calendar', calendar):
+                friday_morning = eastern.localize(dt.datetime(2024, 11, 29, 8, 0))
+                self.assertEqual(
+                    next_trade_execution(friday_morning),
+                    eastern.localize(dt.datetime(2024, 11, 29, 12, 45))
+                )
+                friday_evening = eastern.localize(dt.datetime(2024, 11, 29, 17, 0))
+                self.assertEqual(
+                    next_position_close(friday_evening),
+                    eastern.localize(dt.datetime(2024, 12, 2, 9, 45))
+                )
+        # One bulk fetch serves every lookup
+        mock_client.get.assert_called_once()
+
+    def test_execute_trades_resumes_from_checkpoint(self):
+        """Test a restarted execution settles submitted orders and walks only the rest."""
+        today = dt.datetime.now(eastern).date()
+        spreads = [
+            {'cycle': today.isoformat(), 'ticker': ticker, 'long_symbol': f'{ticker}_FAR',
+             'short_symbol': f'{ticker}_NEAR', 'long_contract': {}, 'short_contract': {},
+             'qty': 1, 'recommendation': 'Recommended'}
+            for ticker in ('DONE', 'TODO')
+        ]
+        mock_client = Mock()
+        mock_client.get.return_value = {'id': 'o1', 'status': 'filled', 'limit_price': '1.05', 'legs': []}
+        mock_engine = Mock()
+        mock_engine.execute_batch.return_value = []
+        mock_ledger = Mock()
+        mock_ledger.get_order.return_value = None
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CheckpointStore(tmp_dir)
+            store.update(today, stage=CANDIDATES, spreads=spreads)
+            store.record_order(today, 'DONE', {'order_id': 'o1'})
+            with patch('trading_bot.trader.checkpoints', store), \
+                 patch('trading_bot.trader.market_calendar') as mock_calendar, \
+                 patch('trading_bot.trader.api_client', mock_client), \
+                 patch('trading_bot.trader.execution_engine', mock_engine), \
+                 patch('trading_bot.trader.trade_ledger', mock_ledger), \
+                 patch('trading_bot.trader.monitoring'), \
+                 patch('trading_bot.trader.api_monitor'), \
+                 patch('trading_bot.trader.select_spreads') as mock_select:
+                mock_calendar.is_trading_day.return_value = True
+                execute_trades()
+
+                mock_select.assert_not_called()
+                self.assertEqual([s['ticker'] for s in mock_engine.execute_batch.call_args[0][0]], ['TODO'])
+                mock_ledger.record_trades.assert_called_once()
+                checkpoint = store.load(today)
+                self.assertEqual(checkpoint['stage'], EXECUTED)
+                self.assertEqual(checkpoint['pending_closes'], ['o1'])
+
+                # A second run the same day does not execute again
+                execute_trades()
+                mock_engine.execute_batch.assert_called_once()
+
+    def test_partial_fill_is_recorded(self):
+        """Test a spread cancelled after a partial fill is ledgered and checkpointed with its filled quantity."""
+        today = dt.datetime.now(eastern).date()
+        result = {
+            'ticker': 'PART', 'long_symbol': 'PART_FAR', 'short_symbol': 'PART_NEAR', 'long_contract': {},
+            'short_contract': {}, 'qty': 3, 'recommendation': 'Recommended', 'filled': False, 'filled_qty': 1,
+            'order': {'id': 'o2', 'status': 'canceled', 'legs': []}, 'limit_price': 1.10,
+        }
+        mock_ledger = Mock()
+        mock_ledger.get_order.return_value = None
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CheckpointStore(tmp_dir)
+            with patch('trading_bot.trader.checkpoints', store), \
+                 patch('trading_bot.trader.trade_ledger', mock_ledger), \
+                 patch('trading_bot.trader.monitoring') as mock_monitoring, \
+                 patch('trading_bot.trader.api_monitor'):
+                finish_execution(today, [result])
+            self.assertEqual(store.load(today)['pending_closes'], ['o2'])
+        self.assertEqual(mock_ledger.record_trades.call_args[0][0][0]['qty'], 1)
+        self.assertIn('partially filled (1 of 3)', mock_monitoring.alert_error.call_args[0][0])
+
+    def test_resume_closes_missed_positions(self):
+        """Test fills whose close was missed while down are closed on startup during market hours."""
+        now = dt.datetime.now(eastern)
+        yesterday = now.date() - dt.timedelta(days=1)
+        sessions = {
+            yesterday: (now - dt.timedelta(days=1, hours=6), now - dt.timedelta(days=1, hours=1)),
+            now.date(): (now - dt.timedelta(hours=1), now + dt.timedelta(hours=5)),
+        }
+        mock_calendar = Mock()
+        mock_calendar.session.side_effect = sessions.get
+        mock_calendar.sessions_from.side_effect = lambda day, count: [
+            session for session_day, session in sorted(sessions.items()) if session_day >= day
+        ][:count]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CheckpointStore(tmp_dir)
+            store.update(yesterday, stage=EXECUTED, pending_closes=['o1'])
+            with patch('trading_bot.trader.checkpoints', store), \
+                 patch('trading_bot.trader.market_calendar', mock_calendar), \
+                 patch('trading_bot.trader.close_positions') as mock_close:
+                resume_cycle()
+
+            mock_close.assert_called_once_with()
+            self.assertEqual(store.load(yesterday)['stage'], CLOSED)
+
+    def test_refresh_candidates_rechecks_gates(self):
+        """Test warm-up candidates are re-gated on fresh leg IVs."""
+        today = dt.datetime.now(eastern).date()
+        near_expiry = (today + dt.timedelta(days=7)).isoformat()
+        far_expiry = (today + dt.timedelta(days=37)).isoformat()
+        candidates = pd.DataFrame({
+            'Ticker': ['KEEP', 'DROP'],
+            'Recommendation': ['Consider', 'Recommended'],
+            'Avg Volume': [2000000.0, 2000000.0],
+            'RV30': [0.2, 0.2],
+            'Short Leg': [
+                {'symbol': 'KEEP_NEAR', 'expiration_date': near_expiry},
+                {'symbol': 'DROP_NEAR', 'expiration_date': near_expiry},
+            ],
+            'Long Leg': [
+                {'symbol': 'KEEP_FAR', 'expiration_date': far_expiry},
+                {'symbol': 'DROP_FAR', 'expiration_date': far_expiry},
+            ],
+        })
+        mock_client = Mock()
+        mock_client.get.return_value = {'snapshots': {
+            'KEEP_NEAR': {'impliedVolatility': 0.8},
+            'KEEP_FAR': {'impliedVolatility': 0.4},
+            'DROP_NEAR': {'impliedVolatility': 0.4},
+            'DROP_FAR': {'impliedVolatility': 0.45},
+        }}
+
+        with patch('trading_bot.trader.api_client', mock_client):
+            result = refresh_candidates(candidates)
+
+        mock_client.get.assert_called_once()
+        self.assertEqual(result['Ticker'].tolist(), ['KEEP'])
+        self.assertEqual(result.iloc[0]['Recommendation'], 'Recommended')
+
+    def test_candidates_round_trip(self):
+        """Test persisted warm-up candidates load back for the same day."""
+        day = dt.date(2024, 3, 20)
+        candidates = pd.DataFrame({
+            'Ticker': ['TEST'],
+            'Short Leg': [{'symbol': 'TEST1'}],
+            'Long Leg': [{'symbol': 'TEST2'}],
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch.dict('trading_bot.trader.warmup_config', {'candidates_dir': tmp_dir}):
+            self.assertIsNone(load_candidates(day))
+            save_candidates(candidates, day)
+            loaded = load_candidates(day)
+
+        self.assertEqual(loaded.iloc[0]['Short Leg'], {'symbol': 'TEST1'})
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file